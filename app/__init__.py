@@ -44,10 +44,13 @@ def create_app(config_class=Config):
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
 
+    # Cached slim principal; the full User row is only loaded when a route needs it
+    from app.services.user_cache import UserCache
+    UserCache.init_app(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import User
-        return User.query.get(int(user_id))
+        return UserCache.load(int(user_id))
 
     # Register Jinja filters
     @app.template_filter('nl2br')
@@ -65,6 +68,18 @@ def create_app(config_class=Config):
     # Configure logging
     configure_logging(app)
 
+    # Register profiling middleware first so captures cover the other hooks
+    from app.middleware.profiling import configure_profiling
+    configure_profiling(app)
+
+    # Count SQL per request (Server-Timing header, slow-query log)
+    from app.middleware.query_stats import configure_query_stats
+    configure_query_stats(app)
+
+    # Request metrics and Prometheus /metrics endpoint
+    from app.middleware.metrics import configure_metrics
+    configure_metrics(app)
+
     # Register security middleware
     from app.middleware.security import configure_security
     configure_security(app)
@@ -77,6 +92,38 @@ def create_app(config_class=Config):
     from app.middleware.analytics_middleware import configure_analytics
     configure_analytics(app)
 
+    # Start buffered view/download counter flusher
+    from app.services.counter_service import CounterService
+    CounterService.init_app(app)
+
+    # Size the search/listing response cache
+    from app.services.search_cache import SearchCache
+    SearchCache.init_app(app)
+
+    # Admin dashboard counts snapshot
+    from app.services.admin_stats_service import AdminStatsService
+    AdminStatsService.init_app(app)
+
+    # Related categories refresh settings
+    from app.services.stats_service import StatsService
+    StatsService.init_app(app)
+
+    # Leaderboard rank tables refresh interval
+    from app.services.leaderboard_service import LeaderboardService
+    LeaderboardService.init_app(app)
+
+    # Start the bounded password hashing pool
+    from app.services.password_service import PasswordService
+    PasswordService.init_app(app)
+
+    # Start classroom photo thumbnail worker pool
+    from app.services.image_service import ImageService
+    ImageService.init_app(app)
+
+    # Register CLI commands (flask worker, ...)
+    from app.cli import register_cli
+    register_cli(app)
+
     # Register error handlers
     from app.middleware.error_handlers import register_error_handlers
     register_error_handlers(app)
@@ -8,13 +8,15 @@ Provides admin-only functionality for:
 - System settings
 """
 
-from flask import render_template, redirect, url_for, flash, request, jsonify, abort
+from flask import render_template, redirect, url_for, flash, request, jsonify, abort, current_app, send_file
 from flask_login import login_required, current_user
 from functools import wraps
-from app.models import db, User, Review, Favorite, Activity, Follow, TeachingJourneyEvent, ClassroomPhoto, FavoriteLesson
+from app.models import db, User, Activity
+from app.services.admin_stats_service import AdminStatsService
 from sqlalchemy import func, desc, or_
 from datetime import datetime, timedelta
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -47,68 +49,59 @@ def register_admin_routes(bp):
     def admin_dashboard():
         """Main admin dashboard with overview metrics."""
         try:
-            # User statistics
-            total_users = User.query.count()
-            verified_teachers = User.query.filter_by(is_verified_teacher=True).count()
-            moderators = User.query.filter_by(is_moderator=True).count()
-
-            # New users in last 7 days
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            new_users_week = User.query.filter(User.created_at >= week_ago).count()
-
-            # New users in last 30 days
-            month_ago = datetime.utcnow() - timedelta(days=30)
-            new_users_month = User.query.filter(User.created_at >= month_ago).count()
-
-            # Content statistics
-            total_reviews = Review.query.count()
-            total_favorites = Favorite.query.count()
-            total_timeline_events = TeachingJourneyEvent.query.count()
-            total_photos = ClassroomPhoto.query.count()
-            total_lessons = FavoriteLesson.query.count()
-
-            # Recent activity
-            recent_reviews_week = Review.query.filter(Review.created_at >= week_ago).count()
-            recent_activities_week = Activity.query.filter(Activity.created_at >= week_ago).count()
-
-            # Follow statistics
-            total_follows = Follow.query.count()
+            # Counts come from the materialized admin_stats snapshot
+            snapshot = AdminStatsService.get_snapshot()
 
             # Most active users (by reputation)
-            top_users = User.query.order_by(User.reputation_score.desc()).limit(10).all()
+            top_users = User.query.options(User.card_options()).order_by(User.reputation_score.desc()).limit(10).all()
 
             # Recent users (last 20)
-            recent_users = User.query.order_by(User.created_at.desc()).limit(20).all()
+            recent_users = User.query.options(User.card_options()).order_by(User.created_at.desc()).limit(20).all()
 
             # Users needing verification (profile_public but not verified)
-            pending_verification = User.query.filter(
+            pending_verification = User.query.options(User.card_options()).filter(
                 User.profile_public == True,
                 User.is_verified_teacher == False
             ).order_by(User.created_at.desc()).limit(10).all()
 
             return render_template('admin/dashboard.html',
-                                 total_users=total_users,
-                                 verified_teachers=verified_teachers,
-                                 moderators=moderators,
-                                 new_users_week=new_users_week,
-                                 new_users_month=new_users_month,
-                                 total_reviews=total_reviews,
-                                 total_favorites=total_favorites,
-                                 total_timeline_events=total_timeline_events,
-                                 total_photos=total_photos,
-                                 total_lessons=total_lessons,
-                                 recent_reviews_week=recent_reviews_week,
-                                 recent_activities_week=recent_activities_week,
-                                 total_follows=total_follows,
+                                 stats_computed_at=snapshot['computed_at'],
+                                 stats_age=AdminStatsService.describe_age(snapshot['age_seconds']),
+                                 stats_compute_ms=snapshot['compute_ms'],
+                                 stats_refreshing=snapshot['refreshing'],
                                  top_users=top_users,
                                  recent_users=recent_users,
-                                 pending_verification=pending_verification)
+                                 pending_verification=pending_verification,
+                                 **snapshot['stats'])
 
         except Exception as e:
             logger.error(f"Error loading admin dashboard: {e}", exc_info=True)
             flash('Error loading dashboard. Please try again.', 'danger')
             return redirect(url_for('main.index'))
 
+    @bp.route('/admin/stats/refresh', methods=['POST'])
+    @login_required
+    @admin_required
+    def admin_refresh_stats():
+        """Recompute the dashboard counts now."""
+        try:
+            snapshot = AdminStatsService.refresh()
+            logger.info(f"Admin {current_user.username} refreshed dashboard stats ({snapshot.compute_ms}ms)")
+
+            if request.is_json:
+                return jsonify({'success': True, 'compute_ms': snapshot.compute_ms})
+
+            flash(f'Statistics refreshed in {snapshot.compute_ms} ms.', 'success')
+        except Exception as e:
+            logger.error(f"Error refreshing admin stats: {e}", exc_info=True)
+
+            if request.is_json:
+                return jsonify({'success': False, 'error': str(e)}), 500
+
+            flash('Error refreshing statistics. Please try again.', 'danger')
+
+        return redirect(url_for('main.admin_dashboard'))
+
     @bp.route('/admin/users')
     @login_required
     @admin_required
@@ -121,7 +114,7 @@ def register_admin_routes(bp):
             sort_by = request.args.get('sort', 'newest')  # newest, oldest, active, reputation
 
             # Base query
-            query = User.query
+            query = User.query.options(User.card_options())
 
             # Apply search
             if search:
@@ -445,3 +438,60 @@ def register_admin_routes(bp):
             logger.error(f"Error loading analytics: {e}", exc_info=True)
             flash('Error loading analytics. Please try again.', 'danger')
             return redirect(url_for('main.admin_dashboard'))
+
+    @bp.route('/admin/profiles')
+    @login_required
+    @admin_required
+    def admin_profiles():
+        """Slowest sampled request profiles, grouped by route."""
+        from app.middleware.profiling import list_profiles
+
+        try:
+            profiles = list_profiles(current_app)
+
+            # Per-route summary (profiles are already sorted slowest first)
+            routes = {}
+            for profile in profiles:
+                route = routes.setdefault(profile['endpoint'], {
+                    'endpoint': profile['endpoint'],
+                    'count': 0,
+                    'durations': [],
+                    'slowest': profile
+                })
+                route['count'] += 1
+                route['durations'].append(profile['duration_ms'])
+
+            route_summary = []
+            for route in routes.values():
+                durations = sorted(route.pop('durations'))
+                route['median_ms'] = durations[len(durations) // 2]
+                route['max_ms'] = durations[-1]
+                route_summary.append(route)
+            route_summary.sort(key=lambda r: r['max_ms'], reverse=True)
+
+            for profile in profiles:
+                profile['captured'] = datetime.utcfromtimestamp(profile['captured_at'] / 1000)
+
+            return render_template('admin/profiles.html',
+                                 routes=route_summary,
+                                 profiles=profiles[:50],
+                                 total_profiles=len(profiles),
+                                 sample_rate=current_app.config.get('PROFILING_SAMPLE_RATE', 0))
+
+        except Exception as e:
+            logger.error(f"Error loading request profiles: {e}", exc_info=True)
+            flash('Error loading profiles. Please try again.', 'danger')
+            return redirect(url_for('main.admin_dashboard'))
+
+    @bp.route('/admin/profiles/<filename>')
+    @login_required
+    @admin_required
+    def admin_download_profile(filename):
+        """Download a captured profile in folded-stack format."""
+        from app.middleware.profiling import profile_path
+
+        path = profile_path(current_app, filename)
+        if not path or not os.path.exists(path):
+            abort(404)
+
+        return send_file(path, mimetype='text/plain', as_attachment=True, download_name=filename)
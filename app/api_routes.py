@@ -7,6 +7,9 @@ from flask import jsonify, request, send_file, Response, current_app
 from flask_login import login_required, current_user
 from app.models import db, User, Favorite
 from app.services.resource_service import ResourceService
+from app.services.search_service import SearchService
+from app.services.search_cache import SearchCache, normalize_params
+from app.services.analytics_service import AnalyticsService
 from datetime import datetime
 from xml.etree.ElementTree import Element, SubElement, tostring
 import logging
@@ -38,42 +41,33 @@ def register_api_routes(bp):
         - offset: Skip first N results (default: 0)
         """
         try:
-            resource_service = ResourceService()
-            all_resources = resource_service.get_all_resources_flat()
-
-            # Apply filters
-            category_filter = request.args.get('category')
-            grade_filter = request.args.get('grade')
-            subject_filter = request.args.get('subject')
-            cost_filter = request.args.get('cost')
-            search_query = request.args.get('search', '').lower()
-
-            filtered = all_resources
-
-            if category_filter:
-                filtered = [r for r in filtered if r.get('category') == category_filter]
+            # Filters are case-insensitive except category, which is an exact name
+            params = normalize_params(request.args, text_params=('grade', 'subject', 'cost', 'search'))
 
-            if grade_filter:
-                filtered = [r for r in filtered if grade_filter.lower() in r.get('grades', '').lower()]
-
-            if subject_filter:
-                filtered = [r for r in filtered if subject_filter.lower() in r.get('subject', '').lower()]
+            resource_service = ResourceService()
+            cache_key = SearchCache.make_key('api_get_resources', resource_service.get_catalog_version(), params)
+            cached = SearchCache.get(cache_key)
+            if cached is not None:
+                return Response(cached, mimetype='application/json')
 
-            if cost_filter:
-                filtered = [r for r in filtered if cost_filter.lower() in r.get('cost', '').lower()]
+            all_resources = resource_service.get_all_resources_flat()
 
-            if search_query:
-                filtered = [r for r in filtered if
-                           search_query in r.get('name', '').lower() or
-                           search_query in r.get('description', '').lower()]
+            filtered = SearchService.filter_resources(
+                all_resources,
+                category=params.get('category'),
+                grade=params.get('grade'),
+                subject=params.get('subject'),
+                cost=params.get('cost'),
+                search=params.get('search', '')
+            )
 
             # Pagination
-            limit = int(request.args.get('limit', len(filtered)))
-            offset = int(request.args.get('offset', 0))
+            limit = int(params.get('limit', len(filtered)))
+            offset = int(params.get('offset', 0))
 
             paginated = filtered[offset:offset + limit]
 
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'total': len(filtered),
                 'count': len(paginated),
@@ -81,6 +75,8 @@ def register_api_routes(bp):
                 'limit': limit,
                 'resources': paginated
             })
+            SearchCache.put(cache_key, response.get_data())
+            return response
 
         except Exception as e:
             logger.error(f'API error: {e}', exc_info=True)
@@ -140,19 +136,19 @@ def register_api_routes(bp):
 
     @bp.route('/api/v1/resources/<resource_id>', methods=['GET'])
     def api_get_resource(resource_id):
-        """Get a specific resource by ID."""
+        """Get a specific resource by ID (resources are identified by name, as in favorites)."""
         try:
             resource_service = ResourceService()
             all_resources = resource_service.get_all_resources_flat()
 
-            resource = next((r for r in all_resources if r['id'] == resource_id), None)
+            resource = next((r for r in all_resources if r['name'] == resource_id), None)
 
             if not resource:
                 return jsonify({'success': False, 'error': 'Resource not found'}), 404
 
             # Add favorite count if available
-            favorite_count = Favorite.query.filter_by(resource_id=resource_id).count()
-            resource['favorite_count'] = favorite_count
+            resource = resource.copy()
+            resource['favorite_count'] = Favorite.query.filter_by(resource_name=resource_id).count()
 
             return jsonify({
                 'success': True,
@@ -169,7 +165,7 @@ def register_api_routes(bp):
         try:
             resource_service = ResourceService()
             categories = resource_service.get_all_categories()
-            all_resources = resource_service.get_all_resources()
+            all_resources = resource_service.get_all_resources_flat()
 
             # Calculate stats
             total_resources = len(all_resources)
@@ -188,15 +184,16 @@ def register_api_routes(bp):
             # Most favorited resources
             from sqlalchemy import func
             most_favorited = db.session.query(
-                Favorite.resource_id,
+                Favorite.resource_name,
                 func.count(Favorite.id).label('count')
-            ).group_by(Favorite.resource_id).order_by(
+            ).group_by(Favorite.resource_name).order_by(
                 func.count(Favorite.id).desc()
             ).limit(10).all()
 
+            resources_by_name = {r['name']: r for r in all_resources}
             most_favorited_resources = []
             for fav in most_favorited:
-                resource = next((r for r in all_resources if r['id'] == fav.resource_id), None)
+                resource = resources_by_name.get(fav.resource_name)
                 if resource:
                     most_favorited_resources.append({
                         'resource': resource,
@@ -228,48 +225,104 @@ def register_api_routes(bp):
         - q: Search query (required)
         - fields: Comma-separated fields to search (name,description,tags)
         - limit: Max results (default: 50)
+        - operator: and|or between words not joined by an explicit AND/OR (default: and)
+        - sort: relevance|popularity (default: relevance)
+        - fuzzy: 1 for typo-tolerant matching on names, tags and categories
+        - threshold: Minimum fuzzy similarity 0-1 (default: SEARCH_FUZZY_THRESHOLD)
         """
         try:
-            query = request.args.get('q', '').lower()
+            params = normalize_params(request.args, text_params=('q', 'fuzzy', 'operator', 'sort'),
+                                      list_params=('fields',))
+            query = params.get('q', '')
             if not query:
                 return jsonify({'success': False, 'error': 'Query parameter "q" required'}), 400
 
-            fields = request.args.get('fields', 'name,description,tags').split(',')
-            limit = int(request.args.get('limit', 50))
+            fields = params.get('fields', 'name,description,tags').split(',')
+            limit = int(params.get('limit', 50))
+            fuzzy = params.get('fuzzy', '0') in ('1', 'true', 'yes')
+            operator = params.get('operator', 'and')
+            sort = params.get('sort', 'relevance')
+            if operator not in ('and', 'or'):
+                return jsonify({'success': False, 'error': 'operator must be "and" or "or"'}), 400
+            if sort not in ('relevance', 'popularity'):
+                return jsonify({'success': False, 'error': 'sort must be "relevance" or "popularity"'}), 400
 
             resource_service = ResourceService()
-            all_resources = resource_service.get_all_resources()
+            catalog_version = resource_service.get_catalog_version()
+            cache_key = SearchCache.make_key('api_search', catalog_version, params)
+            cached = SearchCache.get(cache_key)
+            if cached is not None:
+                return Response(cached, mimetype='application/json')
 
-            results = []
-            for resource in all_resources:
-                score = 0
+            all_resources = resource_service.get_all_resources_flat()
 
-                if 'name' in fields and query in resource.get('name', '').lower():
-                    score += 3
+            if fuzzy:
+                threshold = float(params.get('threshold', current_app.config.get('SEARCH_FUZZY_THRESHOLD', 0.3)))
+                if not 0 < threshold <= 1:
+                    return jsonify({'success': False, 'error': 'threshold must be between 0 and 1'}), 400
+                results = SearchService.fuzzy_search(
+                    all_resources, query.lower(), catalog_version, threshold, limit
+                )
+            else:
+                popularity_weight = current_app.config.get('SEARCH_POPULARITY_WEIGHT', 0.0)
+                view_counts = None
+                if sort == 'popularity' or popularity_weight:
+                    view_counts = SearchService.get_view_counts(
+                        AnalyticsService.get_resource_view_counts,
+                        current_app.config.get('SEARCH_POPULARITY_TTL', 300)
+                    )
+                results = SearchService.bm25_search(
+                    all_resources, query, catalog_version, fields, limit,
+                    default_operator=operator, sort=sort, view_counts=view_counts,
+                    popularity_weight=popularity_weight
+                )
+
+            response = jsonify({
+                'success': True,
+                'query': query,
+                'fuzzy': fuzzy,
+                'sort': sort,
+                'count': len(results),
+                'results': results
+            })
+            SearchCache.put(cache_key, response.get_data())
+            return response
 
-                if 'description' in fields and query in resource.get('description', '').lower():
-                    score += 2
+        except Exception as e:
+            logger.error(f'API error: {e}', exc_info=True)
+            return jsonify({'success': False, 'error': str(e)}), 500
 
-                if 'tags' in fields:
-                    for tag in resource.get('tags', []):
-                        if query in tag.lower():
-                            score += 1
+    @bp.route('/api/v1/suggest', methods=['GET'])
+    def api_suggest():
+        """
+        Autocomplete suggestions for the search box.
 
-                if score > 0:
-                    results.append({
-                        'resource': resource,
-                        'relevance_score': score
-                    })
+        Query parameters:
+        - q: Text typed so far (required)
+        - limit: Max suggestions (default: 8, max: 20)
+        """
+        try:
+            query = request.args.get('q', '').strip()
+            if not query:
+                return jsonify({'success': False, 'error': 'Query parameter "q" required'}), 400
 
-            # Sort by relevance
-            results.sort(key=lambda x: x['relevance_score'], reverse=True)
-            results = results[:limit]
+            limit = min(int(request.args.get('limit', 8)), 20)
+
+            resource_service = ResourceService()
+            # The catalog is only flattened when the suggest index has to be built
+            suggestions = SearchService.suggest(
+                resource_service.get_all_resources_flat,
+                query,
+                resource_service.get_catalog_version(),
+                limit,
+                view_counts_loader=AnalyticsService.get_resource_view_counts,
+                popularity_ttl=current_app.config.get('SEARCH_POPULARITY_TTL', 300)
+            )
 
             return jsonify({
                 'success': True,
                 'query': query,
-                'count': len(results),
-                'results': results
+                'suggestions': suggestions
             })
 
         except Exception as e:
@@ -286,19 +339,19 @@ def register_api_routes(bp):
         """Get current user's favorites."""
         try:
             favorites = Favorite.query.filter_by(user_id=current_user.id).order_by(
-                Favorite.added_at.desc()
+                Favorite.created_at.desc()
             ).all()
 
             resource_service = ResourceService()
-            all_resources = resource_service.get_all_resources()
-            resources_dict = {r['id']: r for r in all_resources}
+            all_resources = resource_service.get_all_resources_flat()
+            resources_dict = {r['name']: r for r in all_resources}
 
             favorite_list = []
             for fav in favorites:
-                if fav.resource_id in resources_dict:
-                    resource = resources_dict[fav.resource_id].copy()
-                    resource['favorited_at'] = fav.added_at.isoformat()
-                    resource['user_note'] = fav.notes
+                if fav.resource_name in resources_dict:
+                    resource = resources_dict[fav.resource_name].copy()
+                    resource['favorited_at'] = fav.created_at.isoformat()
+                    resource['user_note'] = fav.personal_note
                     favorite_list.append(resource)
 
             return jsonify({
@@ -324,19 +377,19 @@ def register_api_routes(bp):
             export_format = request.args.get('format', 'json').lower()
 
             favorites = Favorite.query.filter_by(user_id=current_user.id).order_by(
-                Favorite.added_at.desc()
+                Favorite.created_at.desc()
             ).all()
 
             resource_service = ResourceService()
-            all_resources = resource_service.get_all_resources()
-            resources_dict = {r['id']: r for r in all_resources}
+            all_resources = resource_service.get_all_resources_flat()
+            resources_dict = {r['name']: r for r in all_resources}
 
             favorite_list = []
             for fav in favorites:
-                if fav.resource_id in resources_dict:
-                    resource = resources_dict[fav.resource_id].copy()
-                    resource['favorited_at'] = fav.added_at.isoformat()
-                    resource['user_note'] = fav.notes
+                if fav.resource_name in resources_dict:
+                    resource = resources_dict[fav.resource_name].copy()
+                    resource['favorited_at'] = fav.created_at.isoformat()
+                    resource['user_note'] = fav.personal_note
                     favorite_list.append(resource)
 
             if export_format == 'json':
@@ -485,12 +538,12 @@ def register_api_routes(bp):
         """iCal/Calendar export of user's favorited resources."""
         try:
             favorites = Favorite.query.filter_by(user_id=current_user.id).order_by(
-                Favorite.added_at.desc()
+                Favorite.created_at.desc()
             ).all()
 
             resource_service = ResourceService()
-            all_resources = resource_service.get_all_resources()
-            resources_dict = {r['id']: r for r in all_resources}
+            all_resources = resource_service.get_all_resources_flat()
+            resources_dict = {r['name']: r for r in all_resources}
 
             # Build iCal format
             ical_lines = [
@@ -505,12 +558,12 @@ def register_api_routes(bp):
             ]
 
             for fav in favorites:
-                if fav.resource_id in resources_dict:
-                    resource = resources_dict[fav.resource_id]
+                if fav.resource_name in resources_dict:
+                    resource = resources_dict[fav.resource_name]
 
                     # Create a VTODO (to-do item) for each resource
-                    dtstart = fav.added_at.strftime('%Y%m%dT%H%M%SZ')
-                    uid = f'{fav.resource_id}@teachinghub.local'
+                    dtstart = fav.created_at.strftime('%Y%m%dT%H%M%SZ')
+                    uid = f'favorite-{fav.id}@teachinghub.local'
 
                     ical_lines.extend([
                         'BEGIN:VTODO',
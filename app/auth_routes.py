@@ -6,6 +6,7 @@ from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, current_user, login_required
 from urllib.parse import urlparse
 from app.models import db, User
+from app.services.password_service import PasswordService, HashingBusy
 from datetime import datetime
 import logging
 
@@ -89,6 +90,14 @@ def register_auth_routes(bp):
             ).first()
 
             if user and user.check_password(password):
+                # Upgrade hashes made with old PASSWORD_HASH_METHOD settings
+                if PasswordService.needs_rehash(user.password_hash):
+                    try:
+                        user.set_password(password)
+                        logger.info(f'Rehashed password for {user.username}')
+                    except HashingBusy:
+                        pass  # Try again on a later login
+
                 # Update last login
                 user.last_login = datetime.utcnow()
                 db.session.commit()
@@ -98,7 +107,7 @@ def register_auth_routes(bp):
 
                 # Redirect to next page or homepage
                 next_page = request.args.get('next')
-                if not next_page or url_parse(next_page).netloc != '':
+                if not next_page or urlparse(next_page).netloc != '':
                     next_page = url_for('main.index')
 
                 flash(f'Welcome back, {user.display_name or user.username}!', 'success')
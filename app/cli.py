@@ -0,0 +1,120 @@
+"""
+Flask CLI commands for operational tasks.
+
+Registered on the app in create_app, so they are available as
+``flask --app run:app <command>``.
+"""
+
+import logging
+import signal
+import click
+
+logger = logging.getLogger(__name__)
+
+
+def register_cli(app):
+    """
+    Register custom CLI commands on the application.
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.cli.command('worker')
+    @click.option('--threads', default=None, type=int, help='Jobs to run concurrently (default: JOB_WORKER_THREADS).')
+    @click.option('--poll-interval', default=None, type=float, help='Seconds to sleep when the queue is empty.')
+    @click.option('--once', is_flag=True, help='Process one batch of due jobs and exit.')
+    def worker_command(threads, poll_interval, once):
+        """Run the background job worker."""
+        from app.services.job_queue import Worker
+
+        worker = Worker(
+            app,
+            threads=threads or app.config.get('JOB_WORKER_THREADS', 4),
+            poll_interval=poll_interval or app.config.get('JOB_POLL_INTERVAL', 2.0)
+        )
+
+        # Finish in-flight jobs on SIGTERM (e.g. during a deploy)
+        signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+
+        click.echo(f"Starting job worker {worker.worker_id} ({worker.threads} threads)")
+        try:
+            worker.run(once=once)
+        except KeyboardInterrupt:
+            worker.stop()
+
+    @app.cli.group('analytics')
+    def analytics_group():
+        """Maintain the raw analytics tables."""
+
+    @analytics_group.command('partition')
+    @click.option('--table', 'tables', multiple=True, help='Table to convert (default: all analytics tables).')
+    @click.option('--months-ahead', default=3, show_default=True, help='Monthly partitions to create ahead.')
+    @click.option('--dry-run', is_flag=True, help='Print the SQL without running it.')
+    def analytics_partition_command(tables, months_ahead, dry_run):
+        """Convert analytics tables to monthly partitions (PostgreSQL only)."""
+        from app.services.retention_service import RetentionService, RETENTION_TABLES
+
+        if not RetentionService.is_postgres():
+            raise click.ClickException('Partitioning needs PostgreSQL; on SQLite `analytics retention` deletes in chunks.')
+
+        for table in tables or RETENTION_TABLES:
+            if table not in RETENTION_TABLES:
+                raise click.BadParameter(f'unknown analytics table {table}', param_hint='--table')
+            statements = []
+            if not RetentionService.is_partitioned(table):
+                statements += RetentionService.convert_to_partitioned(table, dry_run=dry_run)
+            if dry_run and statements:
+                click.echo(f"-- {table}: partitions from the current month on are created after conversion")
+            else:
+                statements += RetentionService.ensure_partitions(table, months_ahead, dry_run=dry_run)
+            for statement in statements:
+                click.echo(f"{statement};")
+            if not statements:
+                click.echo(f"-- {table}: up to date")
+
+    @analytics_group.command('retention')
+    @click.option('--table', 'tables', multiple=True, help='Table to process (default: all analytics tables).')
+    @click.option('--dry-run', is_flag=True, help='Report what would be archived and removed.')
+    def analytics_retention_command(tables, dry_run):
+        """Archive expired analytics rows to NDJSON.gz and remove them."""
+        from app.services.retention_service import RetentionService, RETENTION_TABLES
+
+        for table in tables:
+            if table not in RETENTION_TABLES:
+                raise click.BadParameter(f'unknown analytics table {table}', param_hint='--table')
+
+        actions = RetentionService.apply_retention(app, list(tables) or None, dry_run=dry_run)
+        prefix = '[dry run] would ' if dry_run else ''
+        for action in actions:
+            if action['action'] == 'create partition':
+                click.echo(f"{prefix}{action['target']}")
+                continue
+            archive = f" -> {action['archive']}" if action.get('archive') else ''
+            click.echo(f"{prefix}{action['action']} {action['table']} {action['target']}: {action['rows']} rows{archive}")
+
+    @analytics_group.command('export')
+    @click.option('--table', 'tables', multiple=True, help='Table to export (default: all analytics tables).')
+    @click.option('--format', 'fmt', type=click.Choice(['parquet', 'arrow', 'csv']), default=None,
+                  help='Output format (default: parquet if pyarrow is installed, else csv).')
+    @click.option('--since', type=click.DateTime(), default=None, help='Start of the range (UTC); overrides the watermark.')
+    @click.option('--until', type=click.DateTime(), default=None, help='End of the range (UTC, exclusive).')
+    @click.option('--output', default=None, help='Export directory (default: ANALYTICS_EXPORT_DIR).')
+    def analytics_export_command(tables, fmt, since, until, output):
+        """Export analytics rows added since the last run to columnar files."""
+        from app.services.export_service import ExportService
+        from app.services.retention_service import RETENTION_TABLES
+
+        for table in tables:
+            if table not in RETENTION_TABLES:
+                raise click.BadParameter(f'unknown analytics table {table}', param_hint='--table')
+
+        try:
+            results = ExportService.run(app, list(tables) or None, fmt, since, until, output)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+
+        for result in results:
+            since_label = f"{result['since']:%Y-%m-%d %H:%M}" if result['since'] else 'start'
+            click.echo(f"{result['table']}: {result['rows']} rows [{since_label} .. {result['until']:%Y-%m-%d %H:%M}) "
+                       f"in {len(result['files'])} file(s)")
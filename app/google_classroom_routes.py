@@ -7,12 +7,12 @@ from flask import redirect, url_for, request, flash, jsonify, session, current_a
 from flask_login import login_required, current_user
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
 from datetime import datetime, timedelta
 import logging
 import json
 
 from app.models import db
+from app.services.classroom_client import ClassroomClient
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +28,7 @@ def register_google_classroom_routes(bp):
                     "client_id": current_app.config['GOOGLE_CLIENT_ID'],
                     "client_secret": current_app.config['GOOGLE_CLIENT_SECRET'],
                     "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
+                    "token_uri": current_app.config['GOOGLE_TOKEN_URI'],
                     "redirect_uris": [url_for('main.google_callback', _external=True)]
                 }
             },
@@ -37,25 +37,6 @@ def register_google_classroom_routes(bp):
         flow.redirect_uri = url_for('main.google_callback', _external=True)
         return flow
 
-    def get_google_credentials():
-        """Get Google credentials for the current user."""
-        if not current_user.google_access_token:
-            return None
-
-        creds_data = {
-            'token': current_user.google_access_token,
-            'refresh_token': current_user.google_refresh_token,
-            'token_uri': 'https://oauth2.googleapis.com/token',
-            'client_id': current_app.config['GOOGLE_CLIENT_ID'],
-            'client_secret': current_app.config['GOOGLE_CLIENT_SECRET'],
-            'scopes': current_app.config['GOOGLE_SCOPES']
-        }
-
-        if current_user.google_token_expiry:
-            creds_data['expiry'] = current_user.google_token_expiry.isoformat()
-
-        return Credentials(**creds_data)
-
     @bp.route('/google/connect')
     @login_required
     def google_connect():
@@ -105,6 +86,7 @@ def register_google_classroom_routes(bp):
             current_user.google_refresh_token = credentials.refresh_token
             current_user.google_token_expiry = credentials.expiry
             current_user.google_connected = True
+            ClassroomClient.invalidate(current_user.id)
 
             # Get Google user info
             try:
@@ -137,6 +119,7 @@ def register_google_classroom_routes(bp):
             current_user.google_connected = False
 
             db.session.commit()
+            ClassroomClient.invalidate(current_user.id)
 
             logger.info(f'User {current_user.username} disconnected Google Classroom')
             flash('Google Classroom disconnected.', 'info')
@@ -155,13 +138,11 @@ def register_google_classroom_routes(bp):
             if not current_user.google_connected:
                 return jsonify({'success': False, 'error': 'Google Classroom not connected'}), 400
 
-            creds = get_google_credentials()
-            if not creds:
+            # Cached Classroom service (static discovery doc, pooled HTTP, cached credentials)
+            service = ClassroomClient.for_user(current_user)
+            if not service:
                 return jsonify({'success': False, 'error': 'Invalid credentials'}), 400
 
-            # Build Classroom API service
-            service = build('classroom', 'v1', credentials=creds)
-
             # Get list of courses where user is a teacher
             results = service.courses().list(teacherId='me', courseStates=['ACTIVE']).execute()
             courses = results.get('courses', [])
@@ -201,13 +182,11 @@ def register_google_classroom_routes(bp):
             if not all([course_id, resource_name, resource_url]):
                 return jsonify({'success': False, 'error': 'Missing required fields'}), 400
 
-            creds = get_google_credentials()
-            if not creds:
+            # Cached Classroom service (static discovery doc, pooled HTTP, cached credentials)
+            service = ClassroomClient.for_user(current_user)
+            if not service:
                 return jsonify({'success': False, 'error': 'Invalid credentials'}), 400
 
-            # Build Classroom API service
-            service = build('classroom', 'v1', credentials=creds)
-
             # Create announcement
             announcement = {
                 'text': f'📚 New Resource: {resource_name}\n\n{resource_description}\n\n🔗 {resource_url}',
@@ -231,6 +210,97 @@ def register_google_classroom_routes(bp):
             logger.error(f'Error sharing to classroom: {e}', exc_info=True)
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @bp.route('/api/google/share-resource/bulk', methods=['POST'])
+    @login_required
+    def api_bulk_share_to_classroom():
+        """
+        Share a resource to several Google Classroom courses at once.
+
+        JSON body:
+        - course_ids: List of course IDs (required)
+        - resource_name, resource_url (required), resource_description
+        - type: 'announcement' (default) or 'material'
+
+        Calls run concurrently from a bounded thread pool, or as Google batch
+        requests when GOOGLE_BULK_SHARE_MODE is 'batch'. Returns one result
+        per course; the request succeeds as long as it could be attempted.
+        """
+        try:
+            if not current_user.google_connected:
+                return jsonify({'success': False, 'error': 'Google Classroom not connected'}), 400
+
+            data = request.get_json() or {}
+            course_ids = data.get('course_ids') or []
+            resource_name = data.get('resource_name')
+            resource_url = data.get('resource_url')
+            resource_description = data.get('resource_description', '')
+            share_type = data.get('type', 'announcement')
+
+            if not isinstance(course_ids, list) or not all([course_ids, resource_name, resource_url]):
+                return jsonify({'success': False, 'error': 'Missing required fields'}), 400
+
+            if share_type not in ('announcement', 'material'):
+                return jsonify({'success': False, 'error': 'Invalid type. Use announcement or material'}), 400
+
+            # De-duplicate while keeping the caller's order
+            course_ids = list(dict.fromkeys(str(c) for c in course_ids))
+            max_courses = current_app.config.get('GOOGLE_BULK_SHARE_MAX_COURSES', 50)
+            if len(course_ids) > max_courses:
+                return jsonify({'success': False, 'error': f'Too many courses (max {max_courses})'}), 400
+
+            if share_type == 'material':
+                body = {
+                    'title': resource_name,
+                    'description': resource_description,
+                    'materials': [{
+                        'link': {
+                            'url': resource_url,
+                            'title': resource_name
+                        }
+                    }],
+                    'state': 'PUBLISHED'
+                }
+            else:
+                body = {
+                    'text': f'📚 New Resource: {resource_name}\n\n{resource_description}\n\n🔗 {resource_url}',
+                    'state': 'PUBLISHED'
+                }
+
+            if current_app.config.get('GOOGLE_BULK_SHARE_MODE') == 'batch':
+                service = ClassroomClient.for_user(current_user)
+                if not service:
+                    return jsonify({'success': False, 'error': 'Invalid credentials'}), 400
+                results = ClassroomClient.batch_create(service, course_ids, share_type, body)
+            else:
+                creds = ClassroomClient.get_credentials(current_user)
+                if not creds:
+                    return jsonify({'success': False, 'error': 'Invalid credentials'}), 400
+                results = ClassroomClient.concurrent_create(
+                    creds, course_ids, share_type, body,
+                    max_workers=current_app.config.get('GOOGLE_BULK_SHARE_WORKERS', 4),
+                    root_url=current_app.config.get('GOOGLE_CLASSROOM_API_ROOT'),
+                    timeout=current_app.config.get('GOOGLE_API_TIMEOUT', 20)
+                )
+
+            course_results = [
+                dict(course_id=course_id, **results.get(course_id, {'success': False, 'error': 'No response'}))
+                for course_id in course_ids
+            ]
+            shared = sum(1 for r in course_results if r['success'])
+
+            logger.info(f'User {current_user.username} bulk-shared resource to {shared}/{len(course_ids)} courses')
+
+            return jsonify({
+                'success': True,
+                'shared': shared,
+                'failed': len(course_ids) - shared,
+                'results': course_results
+            })
+
+        except Exception as e:
+            logger.error(f'Error bulk sharing to classroom: {e}', exc_info=True)
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @bp.route('/api/google/create-material', methods=['POST'])
     @login_required
     def api_create_material():
@@ -249,13 +319,11 @@ def register_google_classroom_routes(bp):
             if not all([course_id, resource_name, resource_url]):
                 return jsonify({'success': False, 'error': 'Missing required fields'}), 400
 
-            creds = get_google_credentials()
-            if not creds:
+            # Cached Classroom service (static discovery doc, pooled HTTP, cached credentials)
+            service = ClassroomClient.for_user(current_user)
+            if not service:
                 return jsonify({'success': False, 'error': 'Invalid credentials'}), 400
 
-            # Build Classroom API service
-            service = build('classroom', 'v1', credentials=creds)
-
             if material_type == 'material':
                 # Create course work material
                 material = {
@@ -1,11 +1,21 @@
 """
 Analytics Middleware - Automatically track page views and performance.
+
+At high traffic, page views can be sampled: ANALYTICS_SAMPLE_RATE (or a
+per-route rate from ANALYTICS_ROUTE_SAMPLE_RATES) keeps a fraction of
+sessions, chosen by hashing the analytics session id so a session's
+views are kept or dropped together. Errors and slow requests are always
+kept. Stored rows carry weight = 1 / rate, which the AnalyticsService
+aggregates sum instead of counting rows.
 """
 
 import time
 import logging
+import zlib
 from flask import request, g
 from app.services.analytics_service import AnalyticsService
+from app.services.bot_filter import BotFilter
+from app.services.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +27,40 @@ def configure_analytics(app):
     Args:
         app: Flask application instance
     """
+    BotFilter.init_app(app)
+
+    default_rate = app.config.get('ANALYTICS_SAMPLE_RATE', 1.0)
+    route_rates = app.config.get('ANALYTICS_ROUTE_SAMPLE_RATES', {})
+    slow_threshold = app.config.get('ANALYTICS_ALWAYS_KEEP_SLOW', 1.0)
+    # Path prefixes, longest first; other keys are endpoint names
+    route_prefixes = sorted((key for key in route_rates if key.startswith('/')), key=len, reverse=True)
+
+    def sample_rate():
+        """Sampling rate for the current request's route."""
+        if request.endpoint in route_rates:
+            return route_rates[request.endpoint]
+        for prefix in route_prefixes:
+            if request.path.startswith(prefix):
+                return route_rates[prefix]
+        return default_rate
+
+    def sample_weight(status_code, response_time):
+        """
+        Weight to store for this page view (None to skip it).
+
+        Returns:
+            (weight, session_id) - session_id is None when it was not needed
+        """
+        rate = sample_rate()
+        if rate >= 1 or status_code >= 400 or response_time >= slow_threshold:
+            return 1.0, None
+
+        session_id = AnalyticsService.get_session_id()
+        if rate > 0 and zlib.crc32(session_id.encode()) / 0x100000000 < rate:
+            return 1.0 / rate, session_id
+
+        metrics.inc('analytics_sampled_out_total')
+        return None, session_id
 
     @app.before_request
     def before_request():
@@ -31,14 +75,24 @@ def configure_analytics(app):
 
         # Only track GET requests to avoid tracking form submissions multiple times
         if request.method == 'GET':
-            # Skip static files and health checks
-            if not request.path.startswith('/static/') and request.path != '/health':
+            # Skip static files, health checks, metrics scrapes and per-keystroke autocomplete
+            if not request.path.startswith('/static/') and request.path not in ('/health', '/metrics', '/api/v1/suggest'):
+                # Crawlers and probes are filtered before any session or DB work
+                kind = BotFilter.filter(request.headers.get('User-Agent', ''))
+                if kind is None:
+                    return response
                 try:
+                    weight, session_id = sample_weight(response.status_code, response_time)
+                    if weight is None:
+                        return response
                     AnalyticsService.track_page_view(
                         path=request.path,
                         method=request.method,
                         status_code=response.status_code,
-                        response_time=response_time
+                        response_time=response_time,
+                        weight=weight,
+                        session_id=session_id,
+                        is_bot=(kind == 'bot')
                     )
                 except Exception as e:
                     # Don't break the request if analytics fails (e.g., tables don't exist yet)
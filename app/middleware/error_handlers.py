@@ -5,7 +5,7 @@ Provides user-friendly error pages instead of default Flask pages.
 """
 
 import logging
-from flask import Flask, render_template
+from flask import Flask, make_response, render_template
 from werkzeug.exceptions import HTTPException
 
 logger = logging.getLogger(__name__)
@@ -37,8 +37,12 @@ def register_error_handlers(app: Flask):
     def service_unavailable_error(error):
         """Handle 503 Service Unavailable errors."""
         logger.error(f"503 error: {error}")
-        return render_template('errors/503.html',
-                             app_name=app.config.get('APP_NAME', 'Teaching Resources Hub')), 503
+        response = make_response(render_template('errors/503.html',
+                                                  app_name=app.config.get('APP_NAME', 'Teaching Resources Hub')), 503)
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after:
+            response.headers['Retry-After'] = str(retry_after)
+        return response
 
     @app.errorhandler(Exception)
     def handle_unexpected_error(error):
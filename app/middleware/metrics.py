@@ -0,0 +1,140 @@
+"""
+Metrics middleware - Request counters, latency histograms and /metrics endpoint.
+
+Records per-endpoint request counts and latencies on the shared registry
+(app.services.metrics), samples DB pool, cache and buffer gauges at scrape
+time, and serves everything in Prometheus text format at /metrics.
+"""
+
+import hmac
+import time
+
+from flask import Response, abort, g, request
+from sqlalchemy import event
+
+from app.models import db
+from app.services.metrics import metrics
+
+
+def _describe_metrics():
+    metrics.describe('http_requests_total', 'counter', 'HTTP requests by endpoint, method and status')
+    metrics.describe('http_request_duration_seconds', 'histogram', 'Request latency by endpoint')
+    metrics.describe('http_db_queries_total', 'counter', 'SQL statements executed while handling requests')
+    metrics.describe('db_pool_checkouts_total', 'counter', 'Connections checked out of the pool')
+    metrics.describe('db_pool_checked_out', 'gauge', 'Connections currently checked out')
+    metrics.describe('db_pool_size', 'gauge', 'Configured pool size')
+    metrics.describe('db_pool_overflow', 'gauge', 'Connections open beyond pool size')
+    metrics.describe('app_cache_requests_total', 'counter', 'Application cache lookups by cache and result')
+    metrics.describe('app_cache_evictions_total', 'counter', 'Entries evicted from application caches to stay within limits')
+    metrics.describe('app_search_cache_entries', 'gauge', 'Responses held in the search result cache')
+    metrics.describe('app_search_cache_bytes', 'gauge', 'Size of responses held in the search result cache')
+    metrics.describe('app_lru_cache_hits', 'gauge', 'Hits on functools.lru_cache caches since start')
+    metrics.describe('app_lru_cache_misses', 'gauge', 'Misses on functools.lru_cache caches since start')
+    metrics.describe('counter_buffer_pending', 'gauge', 'View/download increments waiting to be flushed')
+    metrics.describe('password_hash_in_flight', 'gauge', 'Password hashes running or queued')
+    metrics.describe('analytics_sampled_out_total', 'counter', 'Page views skipped by analytics sampling')
+    metrics.describe('analytics_filtered_total', 'counter', 'Requests not recorded as page views (or sampled) by user-agent kind')
+    metrics.describe('password_hash_rejected_total', 'counter', 'Logins/signups rejected because the hashing pool was full')
+
+
+def _pool_gauges(engine):
+    """Gauge callback for the SQLAlchemy connection pool."""
+    def collect():
+        pool = engine.pool
+        for name, method in (('db_pool_checked_out', 'checkedout'),
+                             ('db_pool_size', 'size'),
+                             ('db_pool_overflow', 'overflow')):
+            if hasattr(pool, method):
+                yield name, {}, getattr(pool, method)()
+    return collect
+
+
+def _app_gauges():
+    """Gauge callback for in-process caches and buffers."""
+    from app.services.counter_service import CounterService
+    from app.services.password_service import PasswordService
+    from app.services.resource_service import ResourceService
+    from app.services.search_cache import SearchCache
+    from app.services.bot_filter import classify_user_agent
+
+    info = ResourceService._load_resources_data.cache_info()
+    yield 'app_lru_cache_hits', {'cache': 'resources'}, info.hits
+    yield 'app_lru_cache_misses', {'cache': 'resources'}, info.misses
+    info = classify_user_agent.cache_info()
+    yield 'app_lru_cache_hits', {'cache': 'user_agents'}, info.hits
+    yield 'app_lru_cache_misses', {'cache': 'user_agents'}, info.misses
+    yield 'counter_buffer_pending', {}, CounterService.pending_count()
+    yield 'password_hash_in_flight', {}, PasswordService.in_flight()
+
+    search_cache = SearchCache.stats()
+    yield 'app_search_cache_entries', {}, search_cache['entries']
+    yield 'app_search_cache_bytes', {}, search_cache['bytes']
+
+
+def configure_metrics(app):
+    """
+    Configure request metrics and the /metrics endpoint.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+
+    token = app.config.get('METRICS_TOKEN')
+    if not token:
+        # Endpoint names and pool/cache internals are not for anonymous visitors
+        app.logger.warning("METRICS_ENABLED is set without METRICS_TOKEN; metrics disabled")
+        return
+
+    _describe_metrics()
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine.pool, 'checkout', lambda *args: metrics.inc('db_pool_checkouts_total'))
+    metrics.register_gauge(_pool_gauges(engine))
+    metrics.register_gauge(_app_gauges)
+
+    multiproc_dir = app.config.get('METRICS_MULTIPROC_DIR')
+    if multiproc_dir:
+        metrics.configure_multiprocess(multiproc_dir, app.config.get('METRICS_FLUSH_INTERVAL', 5))
+
+    @app.before_request
+    def start_request_timer():
+        """Record request start time for the latency histogram."""
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        """Count the request and observe its latency."""
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+
+        endpoint = request.endpoint or 'unmatched'
+        metrics.inc('http_requests_total', {
+            'endpoint': endpoint,
+            'method': request.method,
+            'status': response.status_code
+        })
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - start, {'endpoint': endpoint})
+
+        query_count = g.get('query_count', 0)
+        if query_count:
+            metrics.inc('http_db_queries_total', {'endpoint': endpoint}, query_count)
+
+        return response
+
+    expected = token.encode('utf-8')
+
+    def metrics_endpoint():
+        """Prometheus scrape endpoint."""
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        # Compare bytes: compare_digest rejects non-ASCII str with a TypeError
+        if not hmac.compare_digest(supplied.encode('utf-8'), expected):
+            abort(401)
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
+
+    app.logger.info(f"Metrics configured (multiprocess dir: {multiproc_dir or 'off'})")
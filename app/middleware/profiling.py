@@ -0,0 +1,186 @@
+"""
+Profiling middleware - Sampled statistical profiles of real requests.
+
+A small fraction of requests (1 in PROFILING_SAMPLE_RATE), plus any request
+from an admin carrying the ``X-Profile: 1`` header or ``profile=1`` cookie,
+is run under a stack-sampling profiler. The sampler is a background thread
+that snapshots the request thread's stack every PROFILING_INTERVAL seconds,
+so overhead does not grow with call count the way cProfile's does.
+
+Each capture is written in folded-stack format (``a;b;c 42``), which
+flamegraph.pl, speedscope and inferno read directly, into a rotating
+directory. The admin page /admin/profiles lists the slowest captures by
+route.
+"""
+
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+from flask import request, g
+from flask_login import current_user
+
+logger = logging.getLogger(__name__)
+
+# <epoch_ms>__<duration_ms>__<method>__<endpoint>.folded
+PROFILE_FILENAME = re.compile(r'^(\d+)__(\d+)__([A-Z]+)__(.+)\.folded$')
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                name = getattr(code, 'co_qualname', code.co_name)
+                stack.append(f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+
+    def folded(self) -> str:
+        """Render samples in folded-stack (flamegraph) format."""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + '\n'
+
+
+def _profile_dir(app) -> str:
+    return os.path.join(str(app.config['BASE_DIR']), app.config.get('PROFILING_DIR', 'logs/profiles'))
+
+
+def _should_profile(app) -> bool:
+    """Decide whether to profile the current request."""
+    if request.path.startswith('/static/'):
+        return False
+
+    triggered = request.headers.get('X-Profile') == '1' or request.cookies.get('profile') == '1'
+    if triggered:
+        try:
+            if current_user.is_authenticated and (current_user.is_admin or current_user.is_moderator):
+                return True
+        except Exception:
+            pass
+
+    rate = app.config.get('PROFILING_SAMPLE_RATE', 0)
+    return bool(rate) and random.randrange(rate) == 0
+
+
+def _write_profile(app, sampler: StackSampler, duration: float):
+    """Write a capture and prune the directory to PROFILING_MAX_FILES."""
+    directory = _profile_dir(app)
+    os.makedirs(directory, exist_ok=True)
+
+    endpoint = (request.endpoint or 'unknown').replace('/', '_')
+    filename = f"{int(time.time() * 1000)}__{int(duration * 1000)}__{request.method}__{endpoint}.folded"
+    with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+        f.write(sampler.folded())
+
+    files = sorted(name for name in os.listdir(directory) if PROFILE_FILENAME.match(name))
+    for name in files[:max(0, len(files) - app.config.get('PROFILING_MAX_FILES', 200))]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def list_profiles(app) -> List[Dict]:
+    """
+    List captured profiles, slowest first.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        List of dicts with filename, endpoint, method, duration_ms, captured_at (epoch ms)
+    """
+    directory = _profile_dir(app)
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in os.listdir(directory):
+        match = PROFILE_FILENAME.match(name)
+        if match:
+            captured_at, duration_ms, method, endpoint = match.groups()
+            profiles.append({
+                'filename': name,
+                'endpoint': endpoint,
+                'method': method,
+                'duration_ms': int(duration_ms),
+                'captured_at': int(captured_at)
+            })
+
+    profiles.sort(key=lambda p: p['duration_ms'], reverse=True)
+    return profiles
+
+
+def profile_path(app, filename: str):
+    """Return the absolute path of a capture, or None if the name is not a capture."""
+    if not PROFILE_FILENAME.match(filename) or os.path.basename(filename) != filename:
+        return None
+    return os.path.join(_profile_dir(app), filename)
+
+
+def configure_profiling(app):
+    """
+    Configure sampled request profiling.
+
+    Register before other middleware so the capture covers their hooks too.
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.before_request
+    def start_profiler():
+        """Start sampling this request's thread if it was selected."""
+        if not _should_profile(app):
+            return
+
+        sampler = StackSampler(threading.get_ident(), app.config.get('PROFILING_INTERVAL', 0.005))
+        g.profiler = sampler
+        g.profiler_start = time.perf_counter()
+        sampler.start()
+
+    @app.after_request
+    def stop_profiler(response):
+        """Stop sampling and write the capture."""
+        sampler = g.pop('profiler', None)
+        if sampler is None:
+            return response
+
+        sampler.stop()
+        duration = time.perf_counter() - g.pop('profiler_start')
+        try:
+            _write_profile(app, sampler, duration)
+            response.headers['X-Profile-Captured'] = '1'
+        except Exception as e:
+            logger.warning(f"Could not write request profile: {e}")
+        return response
+
+    app.logger.info(f"Request profiling configured (1 in {app.config.get('PROFILING_SAMPLE_RATE', 0) or 'never'} sampled)")
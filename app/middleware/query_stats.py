@@ -0,0 +1,170 @@
+"""
+Query statistics middleware - Per-request SQL counts, DB time and slow-query log.
+
+SQLAlchemy cursor events count every statement and time spent in the
+database. Per request the totals are exposed on ``g.query_count`` /
+``g.query_time`` and in a ``Server-Timing`` header (visible in browser
+devtools). Requests over SLOW_REQUEST_QUERY_COUNT queries or
+SLOW_REQUEST_DB_TIME seconds are logged with their statements grouped by
+normalized SQL, which makes N+1 patterns obvious.
+
+Tests can enforce a query budget:
+
+    with assert_max_queries(5):
+        client.get('/discover')
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Only keep this many statements per request for the slow-query report
+MAX_RECORDED_STATEMENTS = 1000
+
+_NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+# %(name)s and :name bind parameters; the lookbehind leaves Postgres ::type casts alone
+_BIND_PARAM = re.compile(r'%\(\w+\)s|(?<![:\w]):\w+')
+
+# Counters for query_budget()/assert_max_queries(), per thread
+_local = threading.local()
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape so repeated queries group together.
+
+    Literals become ``?`` and IN lists collapse to ``(?...)``.
+    """
+    sql = _STRING.sub('?', statement)
+    sql = _NUMBER.sub('?', sql)
+    sql = _BIND_PARAM.sub('?', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    return _IN_LIST.sub('(?...)', sql)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, not the connection: after_cursor_execute
+    # never fires for a statement that raises, and a stale start time on
+    # conn.info would then be charged to the next query
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_query_start_time', None)
+    elapsed = time.perf_counter() - start if start is not None else 0.0
+
+    budgets = getattr(_local, 'budgets', None)
+    if budgets:
+        for budget in budgets:
+            budget.append(statement)
+
+    if not has_request_context():
+        return
+
+    g.query_count = g.get('query_count', 0) + 1
+    g.query_time = g.get('query_time', 0.0) + elapsed
+
+    statements = g.setdefault('query_statements', [])
+    if len(statements) < MAX_RECORDED_STATEMENTS:
+        statements.append((statement, elapsed))
+
+
+@contextmanager
+def query_budget():
+    """
+    Record every statement executed on this thread inside the block.
+
+    Yields:
+        List that fills with executed SQL statements
+    """
+    statements = []
+    budgets = getattr(_local, 'budgets', None)
+    if budgets is None:
+        budgets = _local.budgets = []
+    budgets.append(statements)
+    try:
+        yield statements
+    finally:
+        budgets.remove(statements)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail with AssertionError if the block runs more than ``limit`` queries.
+
+    The error message lists the statements grouped by normalized SQL.
+    """
+    with query_budget() as statements:
+        yield statements
+
+    if len(statements) > limit:
+        grouped = defaultdict(int)
+        for statement in statements:
+            grouped[normalize_sql(statement)] += 1
+        report = '\n'.join(f"  {count}x {sql}" for sql, count in sorted(grouped.items(), key=lambda i: -i[1]))
+        raise AssertionError(f"Expected at most {limit} queries, ran {len(statements)}:\n{report}")
+
+
+def _log_slow_request(app, response):
+    """Log a request's statements grouped by normalized SQL."""
+    grouped = defaultdict(lambda: [0, 0.0])
+    for statement, elapsed in g.get('query_statements', []):
+        entry = grouped[normalize_sql(statement)]
+        entry[0] += 1
+        entry[1] += elapsed
+
+    lines = [
+        f"  {count}x {total * 1000:.1f}ms  {sql[:300]}"
+        for sql, (count, total) in sorted(grouped.items(), key=lambda i: -i[1][1])
+    ]
+    logger.warning(
+        f"Slow DB request {request.method} {request.path} -> {response.status_code}: "
+        f"{g.query_count} queries, {g.query_time * 1000:.1f}ms in DB\n" + '\n'.join(lines)
+    )
+
+
+def configure_query_stats(app):
+    """
+    Configure per-request SQL instrumentation.
+
+    Args:
+        app: Flask application instance
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    max_queries = app.config.get('SLOW_REQUEST_QUERY_COUNT', 30)
+    max_db_time = app.config.get('SLOW_REQUEST_DB_TIME', 0.5)
+
+    @app.after_request
+    def report_query_stats(response):
+        """Expose DB stats in Server-Timing and log offending requests."""
+        query_count = g.get('query_count', 0)
+        query_time = g.get('query_time', 0.0)
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={query_time * 1000:.1f};desc="{query_count} queries"'
+        )
+
+        if query_count > max_queries or query_time > max_db_time:
+            _log_slow_request(app, response)
+
+        return response
+
+    app.logger.info("Query statistics configured")
@@ -7,7 +7,7 @@ Includes User, Favorite, and profile customization models.
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import deferred, load_only
 
 db = SQLAlchemy()
 
@@ -17,6 +17,17 @@ class User(UserMixin, db.Model):
 
     __tablename__ = 'users'
 
+    # Long text columns are deferred: 'profile_text' (bio, about me, collaboration,
+    # current unit, achievements) loads together on first access, 'oauth' likewise.
+    # List views use card_options() so rows carry only what the cards render.
+    CARD_COLUMNS = (
+        'id', 'username', 'email', 'display_name', 'profile_picture', 'bio',
+        'grade_level', 'subjects_taught', 'location', 'created_at', 'last_login',
+        'profile_public', 'current_unit_title', 'current_unit_subject',
+        'reputation_score', 'total_reviews', 'total_submissions',
+        'is_admin', 'is_moderator', 'is_verified_teacher', 'is_banned',
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -24,7 +35,7 @@ class User(UserMixin, db.Model):
 
     # Profile Information
     display_name = db.Column(db.String(100))
-    bio = db.Column(db.Text)
+    bio = deferred(db.Column(db.Text), group='profile_text')
     school = db.Column(db.String(200))
     grade_level = db.Column(db.String(50))  # e.g., "Elementary", "Middle School", etc.
     subjects_taught = db.Column(db.String(200))  # Comma-separated subjects
@@ -42,10 +53,10 @@ class User(UserMixin, db.Model):
     favorite_quote = db.Column(db.String(500))
 
     # Custom Sections (like MySpace "About Me", "Who I'd Like to Meet")
-    about_me = db.Column(db.Text)
-    teaching_philosophy = db.Column(db.Text)
-    favorite_lesson = db.Column(db.Text)
-    classroom_setup = db.Column(db.Text)
+    about_me = deferred(db.Column(db.Text), group='profile_text')
+    teaching_philosophy = deferred(db.Column(db.Text), group='profile_text')
+    favorite_lesson = deferred(db.Column(db.Text), group='profile_text')
+    classroom_setup = deferred(db.Column(db.Text), group='profile_text')
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -57,23 +68,23 @@ class User(UserMixin, db.Model):
     show_favorites_public = db.Column(db.Boolean, default=True)
 
     # Collaboration Board (Phase 2)
-    looking_for = db.Column(db.Text)  # What help/collaboration they need
-    can_help_with = db.Column(db.Text)  # What expertise they can offer
+    looking_for = deferred(db.Column(db.Text), group='profile_text')  # What help/collaboration they need
+    can_help_with = deferred(db.Column(db.Text), group='profile_text')  # What expertise they can offer
     open_to_collaboration = db.Column(db.Boolean, default=True)  # Toggle for collaboration requests
 
     # What I'm Teaching Now (Phase 2)
     current_unit_title = db.Column(db.String(200))  # e.g., "The American Revolution"
     current_unit_subject = db.Column(db.String(100))  # e.g., "U.S. History"
-    current_unit_description = db.Column(db.Text)  # Detailed description of current work
+    current_unit_description = deferred(db.Column(db.Text), group='profile_text')  # Detailed description of current work
     current_unit_updated = db.Column(db.DateTime)  # Last time this was updated
 
     # Professional Achievements (Phase 2)
-    achievements = db.Column(db.Text)  # Awards, certifications, publications (formatted text)
+    achievements = deferred(db.Column(db.Text), group='profile_text')  # Awards, certifications, publications (formatted text)
 
     # Google Classroom Integration
     google_id = db.Column(db.String(100), unique=True, nullable=True)  # Google account ID
-    google_access_token = db.Column(db.Text, nullable=True)  # Encrypted access token
-    google_refresh_token = db.Column(db.Text, nullable=True)  # Encrypted refresh token
+    google_access_token = deferred(db.Column(db.Text, nullable=True), group='oauth')  # Encrypted access token
+    google_refresh_token = deferred(db.Column(db.Text, nullable=True), group='oauth')  # Encrypted refresh token
     google_token_expiry = db.Column(db.DateTime, nullable=True)  # Token expiration time
     google_connected = db.Column(db.Boolean, default=False)  # Is Google Classroom connected?
 
@@ -124,13 +135,20 @@ class User(UserMixin, db.Model):
     classroom_photos = db.relationship('ClassroomPhoto', backref='teacher', lazy='dynamic', cascade='all, delete-orphan')
     favorite_lessons = db.relationship('FavoriteLesson', backref='teacher', lazy='dynamic', cascade='all, delete-orphan')
 
+    @classmethod
+    def card_options(cls):
+        """Query options loading only CARD_COLUMNS, for discover/follower/leaderboard/admin lists."""
+        return load_only(*(getattr(cls, name) for name in cls.CARD_COLUMNS))
+
     def set_password(self, password):
-        """Hash and set the user's password."""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set the user's password (on the bounded hashing pool)."""
+        from app.services.password_service import PasswordService
+        self.password_hash = PasswordService.hash_password(password)
 
     def check_password(self, password):
-        """Check if the provided password matches the hash."""
-        return check_password_hash(self.password_hash, password)
+        """Check if the provided password matches the hash (on the bounded hashing pool)."""
+        from app.services.password_service import PasswordService
+        return PasswordService.verify_password(self.password_hash, password)
 
     def get_profile_url(self):
         """Get the URL to this user's profile."""
@@ -438,6 +456,11 @@ class PageView(db.Model):
     referrer = db.Column(db.String(500))
     country = db.Column(db.String(2))  # ISO country code
 
+    # Page views this row stands for (1 / sampling rate; 1.0 when not sampled)
+    weight = db.Column(db.Float, default=1.0, nullable=False)
+    # Crawler hit kept by ANALYTICS_BOT_SAMPLE_RATE; excluded from dashboard aggregates
+    is_bot = db.Column(db.Boolean, default=False, nullable=False)
+
     # Timestamp
     viewed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
@@ -477,6 +500,7 @@ class ClassroomPhoto(db.Model):
     caption = db.Column(db.String(500))  # Optional caption
     photo_type = db.Column(db.String(50))  # e.g., "classroom", "project", "bulletin_board"
     display_order = db.Column(db.Integer, default=0)  # For sorting
+    thumbnail_widths = db.Column(db.String(50))  # Comma-separated widths with generated derivatives
 
     # Metadata
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -484,6 +508,23 @@ class ClassroomPhoto(db.Model):
     def __repr__(self):
         return f'<ClassroomPhoto {self.id} by user {self.user_id}>'
 
+    def get_thumbnail_widths(self):
+        """Widths for which resized derivatives exist (empty until generated)."""
+        if not self.thumbnail_widths:
+            return []
+        return [int(w) for w in self.thumbnail_widths.split(',') if w]
+
+    def thumbnail_url(self, width, fmt='jpeg'):
+        """URL of the resized derivative at the given width and format."""
+        directory, filename = self.photo_path.rsplit('/', 1)
+        stem = filename.rsplit('.', 1)[0]
+        ext = 'webp' if fmt == 'webp' else 'jpg'
+        return f'{directory}/thumbs/{stem}_{width}.{ext}'
+
+    def srcset(self, fmt='jpeg'):
+        """Build an HTML srcset attribute value for the generated derivatives."""
+        return ', '.join(f'{self.thumbnail_url(w, fmt)} {w}w' for w in self.get_thumbnail_widths())
+
 
 class FavoriteLesson(db.Model):
     """Showcase of favorite/best lessons (Phase 2)."""
@@ -640,6 +681,51 @@ class CollectionItem(db.Model):
         return f'<CollectionItem collection={self.collection_id} order={self.display_order}>'
 
 
+class Job(db.Model):
+    """Persistent background job processed by the `flask worker` command."""
+
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Registered task name, e.g. "photos.generate_thumbnails"
+    payload = db.Column(db.Text)  # JSON-encoded keyword arguments
+
+    # Scheduling
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, done, failed
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Earliest time to run (backoff)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=5, nullable=False)
+
+    # Worker bookkeeping
+    locked_by = db.Column(db.String(100))  # Worker id holding the job
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    # Workers poll for due jobs by (status, run_at)
+    __table_args__ = (db.Index('idx_jobs_status_run_at', 'status', 'run_at'),)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} - {self.status}>'
+
+
+class AdminStats(db.Model):
+    """Materialized admin dashboard counts (single row, refreshed in the background)."""
+
+    __tablename__ = 'admin_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    data = db.Column(db.Text, nullable=False)  # JSON-encoded counts
+    computed_at = db.Column(db.DateTime, nullable=False)
+    compute_ms = db.Column(db.Integer)  # How long the refresh took
+
+    def __repr__(self):
+        return f'<AdminStats computed {self.computed_at}>'
+
+
 def init_db(app):
     """Initialize the database with the Flask app."""
     db.init_app(app)
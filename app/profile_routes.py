@@ -5,6 +5,7 @@ MySpace-style customizable teacher "Room" feature.
 
 from flask import render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_required, current_user
+from sqlalchemy.orm import undefer_group
 from app.models import db, User, Favorite, ProfileVisit
 from app.services.resource_service import ResourceService
 from datetime import datetime
@@ -30,8 +31,8 @@ def register_profile_routes(bp):
     def profile(username):
         """Display a user's public profile 'Room'."""
         try:
-            # Get the profile owner
-            user = User.query.filter_by(username=username).first()
+            # Get the profile owner, with the deferred profile text the Room renders
+            user = User.query.options(undefer_group('profile_text')).filter_by(username=username).first()
 
             if not user:
                 flash(f'User {username} not found.', 'error')
@@ -393,6 +394,10 @@ def register_profile_routes(bp):
             db.session.add(photo)
             db.session.commit()
 
+            # Generate responsive thumbnails off the request thread
+            from app.services.image_service import ImageService
+            ImageService.schedule_thumbnails(photo.id)
+
             logger.info(f'User {current_user.username} uploaded classroom photo')
             return jsonify({'success': True, 'photo_id': photo.id, 'photo_url': photo.photo_path})
 
@@ -418,6 +423,9 @@ def register_profile_routes(bp):
                 file_path = os.path.join(current_app.root_path, photo.photo_path.lstrip('/'))
                 if os.path.exists(file_path):
                     os.remove(file_path)
+
+                from app.services.image_service import ImageService
+                ImageService.delete_thumbnails(photo)
             except Exception as file_error:
                 logger.warning(f'Could not delete photo file: {file_error}')
 
@@ -12,7 +12,8 @@ Handles:
 from flask import render_template, redirect, url_for, flash, request, jsonify, send_from_directory, abort
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from app.models import db, UploadedResource, ResourceDownload, ResourceCollection, CollectionItem
+from app.models import db, UploadedResource, ResourceCollection, CollectionItem
+from app.services.counter_service import CounterService
 from datetime import datetime
 import os
 import logging
@@ -146,9 +147,8 @@ def register_resource_upload_routes(bp):
             if not resource.is_public and (not current_user.is_authenticated or current_user.id != resource.user_id):
                 abort(403)
 
-            # Increment view count
-            resource.view_count += 1
-            db.session.commit()
+            # Increment view count (buffered, flushed in the background)
+            CounterService.record_view(resource.id)
 
             # Get uploader info
             from app.models import User
@@ -250,19 +250,14 @@ def register_resource_upload_routes(bp):
             if not resource.is_public and (not current_user.is_authenticated or current_user.id != resource.user_id):
                 abort(403)
 
-            # Track download
-            download = ResourceDownload(
+            # Track download (log row and counter are buffered, flushed in the background)
+            CounterService.record_download(
                 resource_id=resource.id,
                 user_id=current_user.id if current_user.is_authenticated else None,
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent', ''),
                 referrer=request.referrer
             )
-            db.session.add(download)
-
-            # Increment download count
-            resource.download_count += 1
-            db.session.commit()
 
             # Send file
             directory = os.path.dirname(os.path.join('app/static', resource.file_path))
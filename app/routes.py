@@ -145,7 +145,8 @@ def category_detail(category_name):
         related_categories = StatsService.get_related_categories(
             all_categories,
             current_category,
-            count=4
+            count=4,
+            catalog_version=ResourceService.get_catalog_version()
         )
 
         logger.debug(f"Category {category_name}: {stats['total']} resources, {len(related_categories)} related")
@@ -0,0 +1,188 @@
+"""
+Admin Stats Service - Materialized counts for the admin dashboard.
+
+The dashboard used to run about fifteen COUNT queries on every load. The
+counts now live in a single ``admin_stats`` row computed with one
+multi-aggregate query per table. Loading the dashboard reads that row;
+when it is older than ADMIN_STATS_REFRESH_INTERVAL a background thread
+recomputes it while the page shows the previous snapshot and its age.
+Admins can also force a synchronous refresh.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models import (db, AdminStats, User, Review, Favorite, Activity, Follow,
+                        TeachingJourneyEvent, ClassroomPhoto, FavoriteLesson)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 1
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+class AdminStatsService:
+    """Computes, stores and serves the admin dashboard snapshot."""
+
+    _app = None
+    _refresh_interval = 300
+    _lock = threading.Lock()
+    _refreshing = False
+
+    @staticmethod
+    def init_app(app):
+        AdminStatsService._app = app
+        AdminStatsService._refresh_interval = app.config.get('ADMIN_STATS_REFRESH_INTERVAL', 300)
+
+    @staticmethod
+    def compute() -> Dict[str, int]:
+        """Run the aggregate queries and return the dashboard counts."""
+        now = datetime.utcnow()
+        week_ago = now - timedelta(days=7)
+        month_ago = now - timedelta(days=30)
+
+        users = db.session.execute(select(
+            func.count(User.id),
+            _count_if(User.is_verified_teacher == True),
+            _count_if(User.is_moderator == True),
+            _count_if(User.created_at >= week_ago),
+            _count_if(User.created_at >= month_ago),
+        )).one()
+
+        reviews = db.session.execute(select(
+            func.count(Review.id),
+            _count_if(Review.created_at >= week_ago),
+        )).one()
+
+        stats = {
+            'total_users': users[0],
+            'verified_teachers': users[1],
+            'moderators': users[2],
+            'new_users_week': users[3],
+            'new_users_month': users[4],
+            'total_reviews': reviews[0],
+            'recent_reviews_week': reviews[1],
+            # Uses the created_at index instead of scanning the whole table
+            'recent_activities_week': db.session.execute(
+                select(func.count(Activity.id)).where(Activity.created_at >= week_ago)
+            ).scalar(),
+        }
+
+        for key, model in (('total_favorites', Favorite),
+                           ('total_follows', Follow),
+                           ('total_timeline_events', TeachingJourneyEvent),
+                           ('total_photos', ClassroomPhoto),
+                           ('total_lessons', FavoriteLesson)):
+            stats[key] = db.session.execute(select(func.count(model.id))).scalar()
+
+        return {key: int(value or 0) for key, value in stats.items()}
+
+    @staticmethod
+    def refresh() -> AdminStats:
+        """Recompute the snapshot and store it."""
+        started = time.perf_counter()
+        try:
+            data = AdminStatsService.compute()
+            elapsed_ms = int((time.perf_counter() - started) * 1000)
+
+            values = {'data': json.dumps(data), 'computed_at': datetime.utcnow(), 'compute_ms': elapsed_ms}
+            snapshot = db.session.get(AdminStats, SNAPSHOT_ID)
+            if snapshot is None:
+                try:
+                    snapshot = AdminStats(id=SNAPSHOT_ID, **values)
+                    db.session.add(snapshot)
+                    db.session.commit()
+                except IntegrityError:
+                    # Another process created the first snapshot at the same time; update theirs
+                    db.session.rollback()
+                    snapshot = db.session.get(AdminStats, SNAPSHOT_ID)
+
+            for key, value in values.items():
+                setattr(snapshot, key, value)
+            db.session.commit()
+
+            logger.info(f"Refreshed admin stats in {elapsed_ms}ms")
+            return snapshot
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def get_snapshot() -> Dict:
+        """
+        Current dashboard counts plus staleness information.
+
+        Computes synchronously only if no snapshot exists yet; a stale one is
+        returned as-is while a background refresh runs.
+
+        Returns:
+            Dict with 'stats', 'computed_at', 'age_seconds', 'compute_ms', 'refreshing'
+        """
+        snapshot = db.session.get(AdminStats, SNAPSHOT_ID)
+        if snapshot is None:
+            snapshot = AdminStatsService.refresh()
+
+        age = (datetime.utcnow() - snapshot.computed_at).total_seconds()
+        if age > AdminStatsService._refresh_interval:
+            AdminStatsService.refresh_in_background()
+
+        return {
+            'stats': json.loads(snapshot.data),
+            'computed_at': snapshot.computed_at,
+            'age_seconds': int(age),
+            'compute_ms': snapshot.compute_ms,
+            'refreshing': AdminStatsService._refreshing,
+        }
+
+    @staticmethod
+    def refresh_in_background() -> bool:
+        """
+        Start a refresh thread unless one is already running in this process.
+
+        Returns:
+            True if a refresh was started
+        """
+        app = AdminStatsService._app
+        if app is None:
+            return False
+
+        with AdminStatsService._lock:
+            if AdminStatsService._refreshing:
+                return False
+            AdminStatsService._refreshing = True
+
+        def run():
+            try:
+                with app.app_context():
+                    AdminStatsService.refresh()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"Background admin stats refresh failed: {e}", exc_info=True)
+            finally:
+                AdminStatsService._refreshing = False
+
+        threading.Thread(target=run, name='admin-stats-refresh', daemon=True).start()
+        return True
+
+    @staticmethod
+    def describe_age(seconds: Optional[int]) -> str:
+        """Human-readable snapshot age, e.g. '4 min ago'."""
+        if seconds is None:
+            return 'never'
+        if seconds < 60:
+            return 'just now'
+        if seconds < 3600:
+            return f'{seconds // 60} min ago'
+        if seconds < 86400:
+            return f'{seconds // 3600} h ago'
+        return f'{seconds // 86400} days ago'
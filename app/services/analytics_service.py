@@ -98,8 +98,9 @@ class AnalyticsService:
             db.session.rollback()
 
     @staticmethod
-    def track_page_view(path: str, method: str, status_code: int, response_time: float):
-        """Track a page view."""
+    def track_page_view(path: str, method: str, status_code: int, response_time: float,
+                        weight: float = 1.0, session_id: Optional[str] = None, is_bot: bool = False):
+        """Track a page view (``weight`` is 1 / sampling rate for sampled rows)."""
         try:
             view = PageView(
                 path=path[:500],
@@ -109,8 +110,10 @@ class AnalyticsService:
                 user_id=AnalyticsService.get_user_id(),
                 ip_address=AnalyticsService.get_ip_address(),
                 user_agent=request.user_agent.string[:500] if request.user_agent else None,
-                session_id=AnalyticsService.get_session_id(),
-                referrer=request.referrer[:500] if request.referrer else None
+                session_id=session_id or AnalyticsService.get_session_id(),
+                referrer=request.referrer[:500] if request.referrer else None,
+                weight=weight,
+                is_bot=is_bot
             )
             db.session.add(view)
             db.session.commit()
@@ -151,6 +154,34 @@ class AnalyticsService:
             logger.debug(f"Could not load top resources: {e}")
             return []
 
+    @staticmethod
+    def get_resource_view_counts(days: int = 90) -> Dict[str, int]:
+        """
+        Count views per resource name, for popularity ranking.
+
+        Args:
+            days: Look-back window in days
+
+        Returns:
+            Mapping of resource name to view count
+        """
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=days)
+
+            results = db.session.query(
+                ResourceView.resource_name,
+                func.count(ResourceView.id)
+            ).filter(
+                ResourceView.viewed_at >= cutoff
+            ).group_by(
+                ResourceView.resource_name
+            ).all()
+
+            return {name: count for name, count in results}
+        except Exception as e:
+            logger.debug(f"Could not load resource view counts: {e}")
+            return {}
+
     @staticmethod
     def get_top_categories(days: int = 7, limit: int = 10) -> List[Dict]:
         """Get most viewed categories."""
@@ -215,13 +246,19 @@ class AnalyticsService:
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
 
-            # Page views
-            total_page_views = PageView.query.filter(PageView.viewed_at >= cutoff).count()
+            # Page views (sampled rows count for 1 / sampling rate)
+            total_page_views = db.session.query(
+                func.coalesce(func.sum(PageView.weight), 0)
+            ).filter(PageView.viewed_at >= cutoff, PageView.is_bot == False).scalar()
 
-            # Unique sessions
+            # Unique sessions; sampling keeps or drops whole sessions, so each
+            # session found stands for its (largest) row weight
+            session_weights = db.session.query(
+                func.max(PageView.weight).label('weight')
+            ).filter(PageView.viewed_at >= cutoff, PageView.is_bot == False).group_by(PageView.session_id).subquery()
             unique_sessions = db.session.query(
-                func.count(func.distinct(PageView.session_id))
-            ).filter(PageView.viewed_at >= cutoff).scalar()
+                func.coalesce(func.sum(session_weights.c.weight), 0)
+            ).scalar()
 
             # Resource views
             total_resource_views = ResourceView.query.filter(ResourceView.viewed_at >= cutoff).count()
@@ -238,14 +275,20 @@ class AnalyticsService:
             # New submissions
             new_submissions = ResourceSubmission.query.filter(ResourceSubmission.created_at >= cutoff).count()
 
-            # Average response time
-            avg_response_time = db.session.query(
-                func.avg(PageView.response_time)
-            ).filter(PageView.viewed_at >= cutoff).scalar()
+            # Average response time, weighted like the page view counts
+            weighted_time, weight_total = db.session.query(
+                func.sum(PageView.response_time * PageView.weight),
+                func.sum(PageView.weight)
+            ).filter(
+                PageView.viewed_at >= cutoff,
+                PageView.is_bot == False,
+                PageView.response_time.isnot(None)
+            ).one()
+            avg_response_time = weighted_time / weight_total if weight_total else 0
 
             return {
-                'total_page_views': total_page_views,
-                'unique_sessions': unique_sessions or 0,
+                'total_page_views': int(round(total_page_views or 0)),
+                'unique_sessions': int(round(unique_sessions or 0)),
                 'total_resource_views': total_resource_views,
                 'total_searches': total_searches,
                 'new_users': new_users,
@@ -277,9 +320,10 @@ class AnalyticsService:
 
             results = db.session.query(
                 func.date(PageView.viewed_at).label('date'),
-                func.count(PageView.id).label('views')
+                func.sum(PageView.weight).label('views')
             ).filter(
-                PageView.viewed_at >= cutoff
+                PageView.viewed_at >= cutoff,
+                PageView.is_bot == False
             ).group_by(
                 func.date(PageView.viewed_at)
             ).order_by('date').all()
@@ -287,7 +331,7 @@ class AnalyticsService:
             return [
                 {
                     'date': r.date.strftime('%Y-%m-%d') if hasattr(r.date, 'strftime') else str(r.date),
-                    'views': r.views
+                    'views': int(round(r.views or 0))
                 }
                 for r in results
             ]
@@ -0,0 +1,263 @@
+"""
+Classroom Client - Cached, pooled Google Classroom API access.
+
+Building a discovery-based service per request re-parses the Classroom
+discovery document and opens fresh HTTPS connections every time. This
+factory instead:
+
+- parses the discovery document bundled with google-api-python-client once
+  per process (no network fetch),
+- reuses one httplib2 connection pool per thread (httplib2 is not
+  thread-safe, so pools are never shared across threads),
+- caches each user's Credentials and refreshes them proactively shortly
+  before expiry, persisting the new token,
+- exposes Google batch requests for sharing one resource to many courses,
+  and a long-lived bounded thread pool for the concurrent alternative (its
+  threads keep their connection pools between bulk shares).
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httplib2
+import google_auth_httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from flask import current_app
+
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+# Google caps a single batch request at 50 calls
+MAX_BATCH_SIZE = 50
+
+
+class ClassroomClient:
+    """Factory for Classroom API services with per-user credential caching."""
+
+    _discovery_doc: Optional[Dict] = None
+    _overridden_docs: Dict[str, Dict] = {}
+    _credentials: Dict[int, Credentials] = {}
+    _lock = threading.Lock()
+    _local = threading.local()
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def get_discovery_document(root_url: Optional[str] = None) -> Dict:
+        """
+        Return the parsed, bundled Classroom v1 discovery document.
+
+        Args:
+            root_url: Optional API root overriding https://classroom.googleapis.com/
+                      (e.g. the local fake server used for offline testing)
+        """
+        if ClassroomClient._discovery_doc is None:
+            doc = get_static_doc('classroom', 'v1')
+            if doc is None:
+                raise RuntimeError("Static Classroom discovery document not found in google-api-python-client")
+            ClassroomClient._discovery_doc = json.loads(doc)
+
+        if not root_url:
+            return ClassroomClient._discovery_doc
+
+        if root_url not in ClassroomClient._overridden_docs:
+            doc = dict(ClassroomClient._discovery_doc)
+            doc['rootUrl'] = root_url
+            doc['baseUrl'] = root_url + doc.get('servicePath', '')
+            ClassroomClient._overridden_docs[root_url] = doc
+        return ClassroomClient._overridden_docs[root_url]
+
+    @staticmethod
+    def _http(timeout: int = 20) -> httplib2.Http:
+        """Per-thread HTTP connection pool (keeps TLS connections alive between calls)."""
+        http = getattr(ClassroomClient._local, 'http', None)
+        if http is None:
+            http = httplib2.Http(timeout=timeout)
+            ClassroomClient._local.http = http
+        return http
+
+    @staticmethod
+    def get_credentials(user) -> Optional[Credentials]:
+        """
+        Get cached Credentials for a user, refreshing them if they expire soon.
+
+        Args:
+            user: User with stored Google tokens
+
+        Returns:
+            Valid Credentials, or None if the user has not connected Google
+        """
+        if not user.google_access_token:
+            return None
+
+        with ClassroomClient._lock:
+            creds = ClassroomClient._credentials.get(user.id)
+
+        if creds is None or creds.token != user.google_access_token:
+            creds = Credentials(
+                token=user.google_access_token,
+                refresh_token=user.google_refresh_token,
+                token_uri=current_app.config['GOOGLE_TOKEN_URI'],
+                client_id=current_app.config['GOOGLE_CLIENT_ID'],
+                client_secret=current_app.config['GOOGLE_CLIENT_SECRET'],
+                scopes=current_app.config['GOOGLE_SCOPES'],
+                expiry=user.google_token_expiry
+            )
+
+        margin = timedelta(seconds=current_app.config.get('GOOGLE_TOKEN_REFRESH_MARGIN', 300))
+        if creds.refresh_token and (creds.expiry is None or creds.expiry - margin <= datetime.utcnow()):
+            ClassroomClient._refresh(user, creds)
+
+        with ClassroomClient._lock:
+            ClassroomClient._credentials[user.id] = creds
+        return creds
+
+    @staticmethod
+    def _refresh(user, creds: Credentials):
+        """Refresh an access token and persist it on the user row."""
+        try:
+            creds.refresh(google_auth_httplib2.Request(
+                ClassroomClient._http(current_app.config.get('GOOGLE_API_TIMEOUT', 20))
+            ))
+            user.google_access_token = creds.token
+            user.google_token_expiry = creds.expiry
+            db.session.commit()
+            logger.debug(f"Refreshed Google token for user {user.id}")
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Could not refresh Google token for user {user.id}: {e}")
+
+    @staticmethod
+    def invalidate(user_id: int):
+        """Drop cached credentials (on connect/disconnect)."""
+        with ClassroomClient._lock:
+            ClassroomClient._credentials.pop(user_id, None)
+
+    @staticmethod
+    def for_user(user):
+        """
+        Build a Classroom service for a user from the cached discovery document.
+
+        Args:
+            user: User with stored Google tokens
+
+        Returns:
+            googleapiclient Resource, or None if the user has no credentials
+        """
+        creds = ClassroomClient.get_credentials(user)
+        if creds is None:
+            return None
+
+        return ClassroomClient.build_service(
+            creds,
+            root_url=current_app.config.get('GOOGLE_CLASSROOM_API_ROOT'),
+            timeout=current_app.config.get('GOOGLE_API_TIMEOUT', 20)
+        )
+
+    @staticmethod
+    def build_service(creds: Credentials, root_url: Optional[str] = None, timeout: int = 20):
+        """
+        Build a Classroom service bound to the calling thread's connection pool.
+
+        Needs no application context, so it is safe to call from worker threads.
+
+        Args:
+            creds: Valid user Credentials
+            root_url: Optional API root override
+            timeout: HTTP timeout in seconds
+
+        Returns:
+            googleapiclient Resource
+        """
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=ClassroomClient._http(timeout))
+        return build_from_document(ClassroomClient.get_discovery_document(root_url), http=http)
+
+    @staticmethod
+    def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+        """Shared bulk-share pool, created on first use with ``max_workers`` threads."""
+        with ClassroomClient._lock:
+            if ClassroomClient._executor is None:
+                ClassroomClient._executor = ThreadPoolExecutor(
+                    max_workers=max(1, max_workers), thread_name_prefix='classroom-share'
+                )
+            return ClassroomClient._executor
+
+    @staticmethod
+    def _create_request(service, course_id: str, kind: str, body: Dict):
+        """Build (but do not execute) an announcement or material create call."""
+        courses = service.courses()
+        if kind == 'material':
+            return courses.courseWorkMaterials().create(courseId=course_id, body=body)
+        return courses.announcements().create(courseId=course_id, body=body)
+
+    @staticmethod
+    def concurrent_create(creds: Credentials, course_ids: List[str], kind: str, body: Dict,
+                          max_workers: int = 4, root_url: Optional[str] = None,
+                          timeout: int = 20) -> Dict[str, Dict]:
+        """
+        Create the same announcement or material in many courses from a bounded thread pool.
+
+        The pool is shared by all requests in the process, so concurrent bulk
+        shares queue behind each other instead of each starting new threads.
+        Each pool thread builds its own service on its own (reused) connection pool.
+
+        Args:
+            creds: Valid user Credentials (refresh before calling)
+            course_ids: Target course IDs
+            kind: 'announcement' or 'material'
+            body: Request body sent to every course
+            max_workers: Maximum concurrent API calls (pool size, fixed on first use)
+            root_url: Optional API root override
+            timeout: HTTP timeout in seconds
+
+        Returns:
+            Mapping of course_id to {'success': bool, 'id' or 'error': str}
+        """
+        def create_one(course_id):
+            try:
+                service = ClassroomClient.build_service(creds, root_url=root_url, timeout=timeout)
+                response = ClassroomClient._create_request(service, course_id, kind, body).execute()
+                return course_id, {'success': True, 'id': response.get('id')}
+            except Exception as e:
+                logger.warning(f"Classroom create in course {course_id} failed: {e}")
+                return course_id, {'success': False, 'error': str(e)}
+
+        executor = ClassroomClient._get_executor(max_workers)
+        return dict(executor.map(create_one, course_ids))
+
+    @staticmethod
+    def batch_create(service, course_ids: List[str], kind: str, body: Dict) -> Dict[str, Dict]:
+        """
+        Create the same announcement or material in many courses using batch requests.
+
+        Args:
+            service: Service returned by for_user()
+            course_ids: Target course IDs
+            kind: 'announcement' or 'material'
+            body: Request body sent to every course
+
+        Returns:
+            Mapping of course_id to {'success': bool, 'id' or 'error': str}
+        """
+        results: Dict[str, Dict] = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                results[request_id] = {'success': False, 'error': str(exception)}
+            else:
+                results[request_id] = {'success': True, 'id': response.get('id')}
+
+        for start in range(0, len(course_ids), MAX_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=callback)
+            for course_id in course_ids[start:start + MAX_BATCH_SIZE]:
+                batch.add(ClassroomClient._create_request(service, course_id, kind, body),
+                          request_id=str(course_id))
+            batch.execute()
+
+        return results
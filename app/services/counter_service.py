@@ -0,0 +1,190 @@
+"""
+Counter Service - Buffered view/download counters for uploaded resources.
+
+Popular resources were taking a row lock plus a commit on every page view
+and download. This service accumulates increments in-process and flushes
+them periodically: one ``UPDATE ... SET col = col + :n`` per resource and
+a single batched insert for download log rows.
+
+Increments for resources deleted before the flush are discarded, and if a
+flush fails the download rows put back for the next attempt are capped at
+COUNTER_MAX_PENDING_ROWS, so one bad batch cannot grow the buffer forever.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select, update
+from app.models import db, UploadedResource, ResourceDownload
+
+logger = logging.getLogger(__name__)
+
+
+class CounterService:
+    """In-process accumulator for UploadedResource view/download counters."""
+
+    _lock = threading.Lock()
+    _views: Dict[int, int] = defaultdict(int)
+    _downloads: Dict[int, int] = defaultdict(int)
+    _download_rows: List[Dict] = []
+    _app = None
+    _flush_interval = 0
+    _max_pending_rows = 10000
+    _thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def init_app(app):
+        """
+        Start the background flusher for this process.
+
+        A ``COUNTER_FLUSH_INTERVAL`` of 0 (the default under testing) flushes
+        synchronously on every increment, which keeps counts exact.
+
+        Args:
+            app: Flask application instance
+        """
+        CounterService._app = app
+        CounterService._flush_interval = 0 if app.testing else app.config.get('COUNTER_FLUSH_INTERVAL', 10)
+        CounterService._max_pending_rows = app.config.get('COUNTER_MAX_PENDING_ROWS', 10000)
+
+        if CounterService._flush_interval and CounterService._thread is None:
+            thread = threading.Thread(target=CounterService._run, name='counter-flusher', daemon=True)
+            thread.start()
+            CounterService._thread = thread
+            atexit.register(CounterService._flush_with_context)
+
+        app.logger.info(f"Counter flusher configured (interval={CounterService._flush_interval}s)")
+
+    @staticmethod
+    def record_view(resource_id: int):
+        """Count a view of an uploaded resource."""
+        with CounterService._lock:
+            CounterService._views[resource_id] += 1
+        CounterService._maybe_flush_now()
+
+    @staticmethod
+    def record_download(resource_id: int, user_id: Optional[int], ip_address: Optional[str],
+                        user_agent: Optional[str], referrer: Optional[str]):
+        """Count a download and queue its ResourceDownload log row."""
+        row = {
+            'resource_id': resource_id,
+            'user_id': user_id,
+            'ip_address': ip_address[:45] if ip_address else None,
+            'user_agent': user_agent[:500] if user_agent else None,
+            'referrer': referrer[:500] if referrer else None,
+            'downloaded_at': datetime.utcnow()
+        }
+        with CounterService._lock:
+            CounterService._downloads[resource_id] += 1
+            CounterService._download_rows.append(row)
+        CounterService._maybe_flush_now()
+
+    @staticmethod
+    def pending_count() -> int:
+        """Number of buffered increments and log rows not yet written."""
+        with CounterService._lock:
+            return (sum(CounterService._views.values()) +
+                    sum(CounterService._downloads.values()) +
+                    len(CounterService._download_rows))
+
+    @staticmethod
+    def flush() -> int:
+        """
+        Write buffered counters to the database.
+
+        Must be called inside an application context. Increments for
+        deleted resources are dropped; on failure the rest are merged back
+        (download rows up to COUNTER_MAX_PENDING_ROWS).
+
+        Returns:
+            Number of resources whose counters were updated
+        """
+        with CounterService._lock:
+            views = dict(CounterService._views)
+            downloads = dict(CounterService._downloads)
+            rows = CounterService._download_rows
+            CounterService._views.clear()
+            CounterService._downloads.clear()
+            CounterService._download_rows = []
+
+        if not views and not downloads and not rows:
+            return 0
+
+        touched = set(views) | set(downloads) | {row['resource_id'] for row in rows}
+        try:
+            # A resource deleted since the increment would fail the whole batch (FK) on every retry
+            existing = set(db.session.execute(
+                select(UploadedResource.id).where(UploadedResource.id.in_(touched))
+            ).scalars())
+            if existing != touched:
+                missing = touched - existing
+                logger.warning(f"Discarding counter increments for {len(missing)} deleted resources")
+                views = {rid: n for rid, n in views.items() if rid in existing}
+                downloads = {rid: n for rid, n in downloads.items() if rid in existing}
+                rows = [row for row in rows if row['resource_id'] in existing]
+                touched = existing
+
+            for resource_id in touched:
+                values = {}
+                if views.get(resource_id):
+                    values['view_count'] = UploadedResource.view_count + views[resource_id]
+                if downloads.get(resource_id):
+                    values['download_count'] = UploadedResource.download_count + downloads[resource_id]
+                db.session.execute(
+                    update(UploadedResource)
+                    .where(UploadedResource.id == resource_id)
+                    .values(**values)
+                )
+
+            if rows:
+                db.session.execute(insert(ResourceDownload), rows)
+
+            db.session.commit()
+            logger.debug(f"Flushed counters for {len(touched)} resources, {len(rows)} downloads")
+            return len(touched)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error flushing resource counters: {e}")
+            with CounterService._lock:
+                for resource_id, n in views.items():
+                    CounterService._views[resource_id] += n
+                for resource_id, n in downloads.items():
+                    CounterService._downloads[resource_id] += n
+                merged = rows + CounterService._download_rows
+                overflow = len(merged) - CounterService._max_pending_rows
+                if overflow > 0:
+                    # Keep the counters (bounded by resource count) but shed the oldest log rows
+                    logger.error(f"Counter buffer over COUNTER_MAX_PENDING_ROWS; dropping {overflow} download rows")
+                    merged = merged[overflow:]
+                CounterService._download_rows = merged
+            return 0
+
+    @staticmethod
+    def _maybe_flush_now():
+        """Flush inline when buffering is disabled."""
+        if not CounterService._flush_interval:
+            CounterService.flush()
+
+    @staticmethod
+    def _flush_with_context():
+        """Flush from outside a request (background thread / interpreter exit)."""
+        if CounterService._app is None:
+            return
+        try:
+            with CounterService._app.app_context():
+                CounterService.flush()
+        except Exception as e:
+            logger.error(f"Counter flush failed: {e}")
+
+    @staticmethod
+    def _run():
+        """Background loop flushing every COUNTER_FLUSH_INTERVAL seconds."""
+        while True:
+            time.sleep(CounterService._flush_interval)
+            CounterService._flush_with_context()
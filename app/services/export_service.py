@@ -0,0 +1,285 @@
+"""
+Export Service - Incremental columnar exports of the raw analytics tables.
+
+Analysts used to pull page_views into pandas with ``SELECT *`` against
+production. ``flask analytics export`` instead streams each table through
+a server-side cursor in time order and writes compressed columnar files
+under ANALYTICS_EXPORT_DIR:
+
+    <dir>/<table>/<table>_<from>_<to>.parquet       (pyarrow installed)
+    <dir>/<table>/<table>_<from>_<to>.arrow         (--format arrow)
+    <dir>/<table>/<table>_<from>_<to>_0001.csv.gz   (fallback, with a
+                                                     <table>.schema.json)
+
+Each run exports [watermark, now - ANALYTICS_EXPORT_LAG) and then moves
+the table's watermark (stored in ``<dir>/_watermarks.json``) to the end of
+that range, so a nightly run only reads the new day's rows. The lag
+leaves room for buffered writes (e.g. download rows) to land first.
+Backfills with an explicit ``--since``/``--until`` only move a watermark
+forward, and only if their range continues from it.
+"""
+
+import csv
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, select
+
+from app.models import db
+from app.services.retention_service import RETENTION_TABLES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; without it exports are typed CSV chunks
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_FILE = '_watermarks.json'
+FILE_TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+
+def column_type(column) -> str:
+    """Portable type name for a column: int64, float64, bool, timestamp, date or string."""
+    kind = column.type
+    if isinstance(kind, Boolean):
+        return 'bool'
+    if isinstance(kind, Integer):
+        return 'int64'
+    if isinstance(kind, (Float, Numeric)):
+        return 'float64'
+    if isinstance(kind, DateTime):
+        return 'timestamp'
+    if isinstance(kind, Date):
+        return 'date'
+    return 'string'
+
+
+def _arrow_type(name: str):
+    return {
+        'bool': pa.bool_(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('us'),
+        'date': pa.date32(),
+        'string': pa.string(),
+    }[name]
+
+
+class ExportService:
+    """Streams analytics tables into columnar files with a per-table watermark."""
+
+    @staticmethod
+    def default_format() -> str:
+        return 'parquet' if pa is not None else 'csv'
+
+    # ------------------------------------------------------------------
+    # Watermarks
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def load_watermarks(export_dir: str) -> Dict[str, datetime]:
+        path = os.path.join(export_dir, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            return {table: datetime.fromisoformat(value) for table, value in json.load(f).items()}
+
+    @staticmethod
+    def save_watermark(export_dir: str, table: str, until: datetime):
+        watermarks = ExportService.load_watermarks(export_dir)
+        watermarks[table] = until
+        path = os.path.join(export_dir, WATERMARK_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({name: value.isoformat() for name, value in sorted(watermarks.items())}, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def export_table(table: str, export_dir: str, since: Optional[datetime], until: datetime,
+                     fmt: str, exclude: tuple = (), batch_size: int = 10000,
+                     rows_per_file: int = 500000) -> Dict:
+        """
+        Export rows of one table with ``since <= ts < until``.
+
+        Args:
+            table: Key of RETENTION_TABLES
+            export_dir: Root export directory
+            since: Lower bound (None = from the first row)
+            until: Upper bound (exclusive)
+            fmt: 'parquet', 'arrow' or 'csv'
+            exclude: Column names to leave out (e.g. ip_address)
+            batch_size: Rows fetched from the cursor at a time
+            rows_per_file: CSV chunk size
+
+        Returns:
+            Dict with 'table', 'rows' and 'files'
+        """
+        if fmt in ('parquet', 'arrow') and pa is None:
+            raise RuntimeError(f'{fmt} export needs pyarrow (pip install pyarrow)')
+
+        model, ts = RETENTION_TABLES[table]
+        core = model.__table__
+        columns = [column for column in core.columns if column.name not in exclude]
+        types = {column.name: column_type(column) for column in columns}
+
+        query = select(*columns).where(core.c[ts] < until).order_by(core.c[ts], core.c.id)
+        if since is not None:
+            query = query.where(core.c[ts] >= since)
+
+        directory = os.path.join(export_dir, table)
+        os.makedirs(directory, exist_ok=True)
+        start_label = since.strftime(FILE_TIME_FORMAT) if since else 'start'
+        base = os.path.join(directory, f'{table}_{start_label}_{until.strftime(FILE_TIME_FORMAT)}')
+
+        if fmt == 'csv':
+            # CSV has no types of its own; readers take them from the schema file
+            with open(os.path.join(directory, f'{table}.schema.json'), 'w', encoding='utf-8') as f:
+                json.dump({'columns': [{'name': name, 'type': kind} for name, kind in types.items()]}, f, indent=2)
+
+        # Server-side cursor: batches of rows stream instead of loading the whole range
+        result = db.session.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        try:
+            if fmt == 'csv':
+                rows, files = ExportService._write_csv(result, base, types, batch_size, rows_per_file)
+            else:
+                rows, files = ExportService._write_arrow(result, base, types, batch_size, fmt)
+        finally:
+            result.close()
+            db.session.rollback()
+
+        logger.info(f"Exported {rows} rows of {table} to {len(files)} {fmt} file(s)")
+        return {'table': table, 'rows': rows, 'files': files}
+
+    @staticmethod
+    def _write_arrow(result, base: str, types: Dict[str, str], batch_size: int, fmt: str):
+        """Write batches as Parquet row groups or Arrow IPC record batches."""
+        schema = pa.schema([(name, _arrow_type(kind)) for name, kind in types.items()])
+        path = f'{base}.{fmt}'
+        tmp_path = path + '.tmp'
+        rows = 0
+
+        if fmt == 'parquet':
+            writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+            write = writer.write_table
+        else:
+            sink = pa.OSFile(tmp_path, 'wb')
+            writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+            write = writer.write_batch
+
+        try:
+            for batch in result.partitions(batch_size):
+                columns = list(zip(*batch)) if batch else [[] for _ in types]
+                record = pa.record_batch([pa.array(values, type=field.type)
+                                          for values, field in zip(columns, schema)], schema=schema)
+                write(pa.Table.from_batches([record]) if fmt == 'parquet' else record)
+                rows += len(batch)
+        except Exception:
+            writer.close()
+            if fmt != 'parquet':
+                sink.close()
+            os.remove(tmp_path)
+            raise
+        writer.close()
+        if fmt != 'parquet':
+            sink.close()
+
+        if not rows:
+            os.remove(tmp_path)
+            return 0, []
+        os.replace(tmp_path, path)
+        return rows, [path]
+
+    @staticmethod
+    def _write_csv(result, base: str, types: Dict[str, str], batch_size: int, rows_per_file: int):
+        """Write gzip CSV chunks (header row first; None is written as an empty field)."""
+        files: List[str] = []
+        rows = 0
+        handle = writer = None
+        in_file = 0
+
+        try:
+            for batch in result.partitions(batch_size):
+                for row in batch:
+                    if handle is None or in_file >= rows_per_file:
+                        if handle is not None:
+                            handle.close()
+                        files.append(f'{base}_{len(files) + 1:04d}.csv.gz')
+                        handle = gzip.open(files[-1] + '.tmp', 'wt', encoding='utf-8', newline='')
+                        writer = csv.writer(handle)
+                        writer.writerow(types)
+                        in_file = 0
+                    writer.writerow(['' if value is None else
+                                     value.isoformat() if isinstance(value, datetime) else value
+                                     for value in row])
+                    in_file += 1
+                rows += len(batch)
+            if handle is not None:
+                handle.close()
+        except Exception:
+            # Leave no partial chunk set behind; the watermark has not moved, so the rerun redoes the range
+            if handle is not None:
+                handle.close()
+            for path in files:
+                if os.path.exists(path + '.tmp'):
+                    os.remove(path + '.tmp')
+            raise
+
+        # Chunks only get their final names once the whole range is written
+        for path in files:
+            os.replace(path + '.tmp', path)
+        return rows, files
+
+    @staticmethod
+    def run(app, tables: Optional[List[str]] = None, fmt: Optional[str] = None,
+            since: Optional[datetime] = None, until: Optional[datetime] = None,
+            export_dir: Optional[str] = None) -> List[Dict]:
+        """
+        Incrementally export analytics tables and advance their watermarks.
+
+        Args:
+            app: Flask application (for export settings)
+            tables: Subset of RETENTION_TABLES (default: all)
+            fmt: Output format (default: parquet if pyarrow is installed, else csv)
+            since: Override the stored watermark
+            until: Upper bound (default: now minus ANALYTICS_EXPORT_LAG)
+            export_dir: Override ANALYTICS_EXPORT_DIR
+
+        Returns:
+            One result dict per table
+        """
+        export_dir = str(export_dir or app.config.get('ANALYTICS_EXPORT_DIR'))
+        fmt = fmt or ExportService.default_format()
+        until = until or datetime.utcnow() - timedelta(seconds=app.config.get('ANALYTICS_EXPORT_LAG', 600))
+        exclude = tuple(app.config.get('ANALYTICS_EXPORT_EXCLUDE', ()))
+        batch_size = app.config.get('ANALYTICS_EXPORT_BATCH_SIZE', 10000)
+
+        os.makedirs(export_dir, exist_ok=True)
+        watermarks = ExportService.load_watermarks(export_dir)
+        results = []
+
+        for table in tables or list(RETENTION_TABLES):
+            start = since or watermarks.get(table)
+            if start is not None and start >= until:
+                results.append({'table': table, 'rows': 0, 'files': [], 'since': start, 'until': until})
+                continue
+
+            result = ExportService.export_table(table, export_dir, start, until, fmt, exclude, batch_size)
+            # Only advance once every file of the range is in place, and only when the range
+            # continues from the watermark: a backfill must not move it backwards or skip a gap
+            stored = watermarks.get(table)
+            if start is None or (stored is not None and start <= stored < until):
+                ExportService.save_watermark(export_dir, table, until)
+            result.update(since=start, until=until)
+            results.append(result)
+
+        return results
@@ -0,0 +1,165 @@
+"""
+Image Service - Responsive thumbnail derivatives for classroom photos.
+
+Originals can be up to 5MB, but profile galleries and discover cards only
+render them at a few hundred pixels wide. After upload, this service
+generates WebP and JPEG derivatives at fixed widths in a small background
+worker pool so the upload request is not blocked on image processing.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from app.models import db, ClassroomPhoto
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it photos are served full-size
+    Image = None
+    ImageOps = None
+
+
+class ImageService:
+    """Service for generating resized classroom photo derivatives."""
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _app = None
+
+    @staticmethod
+    def init_app(app):
+        """
+        Create the derivative worker pool for this process.
+
+        Args:
+            app: Flask application instance
+        """
+        ImageService._app = app
+        if Image is None:
+            app.logger.warning("Pillow not installed - classroom photo thumbnails disabled")
+            return
+
+        if ImageService._executor is None:
+            ImageService._executor = ThreadPoolExecutor(
+                max_workers=app.config.get('THUMBNAIL_WORKERS', 2),
+                thread_name_prefix='thumbnailer'
+            )
+
+    @staticmethod
+    def schedule_thumbnails(photo_id: int):
+        """
+        Queue derivative generation for an uploaded photo.
+
+        Returns immediately; the worker records the generated widths on the
+        ClassroomPhoto row once the files are on disk. When JOB_QUEUE_ENABLED
+        is set the work goes to the persistent job queue instead of the
+        in-process pool.
+
+        Args:
+            photo_id: ID of the ClassroomPhoto to process
+        """
+        if ImageService._app is not None and ImageService._app.config.get('JOB_QUEUE_ENABLED'):
+            from app.services.job_queue import JobQueue
+            JobQueue.enqueue('photos.generate_thumbnails', photo_id=photo_id)
+            return
+
+        if ImageService._executor is None:
+            return
+        ImageService._executor.submit(ImageService._process_with_context, photo_id)
+
+    @staticmethod
+    def process_photo(photo_id: int):
+        """
+        Generate derivatives for a photo and record them on its row.
+
+        Must be called inside an application context.
+
+        Args:
+            photo_id: ID of the ClassroomPhoto to process
+        """
+        if Image is None:
+            logger.warning(f"Pillow not installed - skipping thumbnails for photo {photo_id}")
+            return
+
+        photo = db.session.get(ClassroomPhoto, photo_id)
+        if not photo:
+            return
+
+        widths = ImageService.generate_thumbnails(photo)
+        photo.thumbnail_widths = ','.join(str(w) for w in widths)
+        db.session.commit()
+        logger.debug(f"Generated thumbnails {widths} for photo {photo_id}")
+
+    @staticmethod
+    def generate_thumbnails(photo: ClassroomPhoto) -> List[int]:
+        """
+        Generate WebP and JPEG derivatives for a photo.
+
+        Widths larger than the original are capped at the original width so
+        images are never upscaled; derivatives are named and recorded by the
+        width actually written, which keeps srcset ``w`` descriptors honest.
+
+        Args:
+            photo: ClassroomPhoto whose original is on disk
+
+        Returns:
+            List of distinct output widths that were generated
+        """
+        app = ImageService._app
+        source = os.path.join(app.root_path, photo.photo_path.lstrip('/'))
+        widths = app.config.get('THUMBNAIL_WIDTHS', [320, 640])
+        quality = app.config.get('THUMBNAIL_QUALITY', 80)
+
+        generated = []
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+            for width in sorted(widths):
+                target_width = min(width, image.width)
+                if target_width in generated:
+                    continue
+
+                height = max(1, round(image.height * target_width / image.width))
+                resized = image.resize((target_width, height), Image.LANCZOS)
+
+                webp_path = os.path.join(app.root_path, photo.thumbnail_url(target_width, 'webp').lstrip('/'))
+                jpeg_path = os.path.join(app.root_path, photo.thumbnail_url(target_width, 'jpeg').lstrip('/'))
+                os.makedirs(os.path.dirname(webp_path), exist_ok=True)
+
+                resized.save(webp_path, 'WEBP', quality=quality, method=4)
+                resized.convert('RGB').save(jpeg_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+                generated.append(target_width)
+
+        return generated
+
+    @staticmethod
+    def delete_thumbnails(photo: ClassroomPhoto):
+        """Remove any derivative files generated for a photo."""
+        app = ImageService._app
+        for width in photo.get_thumbnail_widths():
+            for fmt in ('webp', 'jpeg'):
+                path = os.path.join(app.root_path, photo.thumbnail_url(width, fmt).lstrip('/'))
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not delete thumbnail {path}: {e}")
+
+    @staticmethod
+    def _process_with_context(photo_id: int):
+        """Thread pool entry point: process a photo inside an app context."""
+        with ImageService._app.app_context():
+            try:
+                ImageService.process_photo(photo_id)
+
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error generating thumbnails for photo {photo_id}: {e}")
+
+            finally:
+                db.session.remove()
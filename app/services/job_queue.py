@@ -0,0 +1,272 @@
+"""
+Job Queue - Lightweight persistent background jobs backed by the app database.
+
+Any route module can push work out of the request thread:
+
+    from app.services.job_queue import JobQueue
+    JobQueue.enqueue('photos.generate_thumbnails', photo_id=photo.id)
+
+Jobs are rows in the ``jobs`` table. The ``flask worker`` command claims due
+jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` on PostgreSQL (SQLite ignores
+the locking clause and relies on a conditional UPDATE instead), runs them in
+a thread pool, and retries failures with exponential backoff. While a batch
+runs the worker refreshes ``locked_at`` on its jobs as a heartbeat, so only
+jobs whose worker died are treated as stale.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import case, update
+from app.models import db, Job
+
+logger = logging.getLogger(__name__)
+
+# Registered task functions by name
+_TASKS: Dict[str, Callable] = {}
+
+
+def task(name: str):
+    """
+    Decorator registering a function as a background task.
+
+    Task functions receive the enqueued keyword arguments and run inside an
+    application context.
+
+    Example:
+        @task('photos.generate_thumbnails')
+        def generate_thumbnails(photo_id):
+            ...
+    """
+    def decorator(f):
+        _TASKS[name] = f
+        return f
+    return decorator
+
+
+class JobQueue:
+    """Enqueue, claim, and execute persistent background jobs."""
+
+    @staticmethod
+    def enqueue(name: str, delay: int = 0, max_attempts: Optional[int] = None,
+                commit: bool = True, **payload) -> Job:
+        """
+        Add a job to the queue.
+
+        Args:
+            name: Registered task name
+            delay: Seconds to wait before the job becomes due
+            max_attempts: Retry limit (defaults to JOB_MAX_ATTEMPTS)
+            commit: Commit immediately; pass False to commit with the caller's transaction
+            **payload: JSON-serializable keyword arguments for the task
+
+        Returns:
+            The queued Job
+        """
+        from flask import current_app
+
+        job = Job(
+            name=name,
+            payload=json.dumps(payload),
+            run_at=datetime.utcnow() + timedelta(seconds=delay),
+            max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 5)
+        )
+        db.session.add(job)
+        if commit:
+            db.session.commit()
+
+        logger.debug(f"Enqueued job {name}")
+        return job
+
+    @staticmethod
+    def claim(worker_id: str, limit: int) -> List[int]:
+        """
+        Atomically claim up to ``limit`` due jobs for a worker.
+
+        Args:
+            worker_id: Identifier recorded on claimed rows
+            limit: Maximum number of jobs to claim
+
+        Returns:
+            IDs of the jobs now owned by this worker
+        """
+        now = datetime.utcnow()
+        candidates = db.session.query(Job.id).filter(
+            Job.status == 'queued',
+            Job.run_at <= now
+        ).order_by(Job.run_at).limit(limit).with_for_update(skip_locked=True).all()
+
+        claimed = []
+        for (job_id,) in candidates:
+            result = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == 'queued')
+                .values(status='running', locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+            )
+            if result.rowcount == 1:
+                claimed.append(job_id)
+
+        db.session.commit()
+        return claimed
+
+    @staticmethod
+    def run_job(job_id: int):
+        """
+        Execute a claimed job and record the outcome.
+
+        Failed jobs are re-queued with exponential backoff until
+        ``max_attempts`` is reached, then marked failed.
+        """
+        from flask import current_app
+
+        job = db.session.get(Job, job_id)
+        if not job:
+            return
+
+        try:
+            func = _TASKS.get(job.name)
+            if func is None:
+                raise LookupError(f"Unknown task: {job.name}")
+
+            func(**json.loads(job.payload or '{}'))
+
+            job.status = 'done'
+            job.finished_at = datetime.utcnow()
+            job.last_error = None
+            db.session.commit()
+            logger.info(f"Job {job.id} ({job.name}) completed")
+
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.last_error = str(e)[:2000]
+            job.locked_by = None
+
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                job.finished_at = datetime.utcnow()
+                logger.error(f"Job {job.id} ({job.name}) failed permanently: {e}", exc_info=True)
+            else:
+                base = current_app.config.get('JOB_RETRY_BACKOFF', 30)
+                job.status = 'queued'
+                job.run_at = datetime.utcnow() + timedelta(seconds=base * 2 ** (job.attempts - 1))
+                logger.warning(f"Job {job.id} ({job.name}) attempt {job.attempts} failed, retrying: {e}")
+
+            db.session.commit()
+
+    @staticmethod
+    def heartbeat(worker_id: str) -> int:
+        """
+        Refresh ``locked_at`` on the jobs a live worker is still running.
+
+        Args:
+            worker_id: Identifier the jobs were claimed with
+
+        Returns:
+            Number of jobs touched
+        """
+        result = db.session.execute(
+            update(Job)
+            .where(Job.status == 'running', Job.locked_by == worker_id)
+            .values(locked_at=datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def requeue_stale(timeout: int) -> int:
+        """
+        Return jobs stuck in 'running' (e.g. a worker was killed) to the queue.
+
+        Jobs that have already used all of their attempts are marked failed
+        instead, so a task that crashes its worker cannot retry forever.
+
+        Args:
+            timeout: Seconds without a heartbeat after which a running job is considered abandoned
+
+        Returns:
+            Number of jobs re-queued or failed
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=timeout)
+        exhausted = Job.attempts >= Job.max_attempts
+        result = db.session.execute(
+            update(Job)
+            .where(Job.status == 'running', Job.locked_at < cutoff)
+            .values(
+                status=case((exhausted, 'failed'), else_='queued'),
+                finished_at=case((exhausted, now), else_=Job.finished_at),
+                last_error=case((exhausted, 'Worker stopped responding on the final attempt'),
+                                else_=Job.last_error),
+                locked_by=None
+            )
+        )
+        db.session.commit()
+        if result.rowcount:
+            logger.warning(f"Recovered {result.rowcount} stale jobs")
+        return result.rowcount
+
+
+class Worker:
+    """Polling worker that runs claimed jobs in a thread pool."""
+
+    def __init__(self, app, threads: int = 4, poll_interval: float = 2.0):
+        self.app = app
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Ask the worker loop to exit after the current batch."""
+        self._stop.set()
+
+    def run(self, once: bool = False):
+        """
+        Poll for due jobs until stopped.
+
+        Args:
+            once: Process a single batch and return (useful for cron/tests)
+        """
+        # Make sure task modules have registered themselves
+        from app import tasks  # noqa: F401
+
+        stale_timeout = self.app.config.get('JOB_STALE_TIMEOUT', 600)
+        heartbeat_interval = max(1.0, stale_timeout / 3)
+        logger.info(f"Worker {self.worker_id} started with {self.threads} threads")
+
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='job') as executor:
+            while not self._stop.is_set():
+                with self.app.app_context():
+                    JobQueue.requeue_stale(stale_timeout)
+                    job_ids = JobQueue.claim(self.worker_id, self.threads)
+
+                if job_ids:
+                    pending = {executor.submit(self._run_in_context, job_id) for job_id in job_ids}
+                    while pending:
+                        _, pending = wait(pending, timeout=heartbeat_interval)
+                        if pending:
+                            # Long-running jobs must not look abandoned to other workers
+                            with self.app.app_context():
+                                JobQueue.heartbeat(self.worker_id)
+
+                if once:
+                    break
+                if not job_ids:
+                    self._stop.wait(self.poll_interval)
+
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def _run_in_context(self, job_id: int):
+        """Run one job inside its own application context and session."""
+        with self.app.app_context():
+            try:
+                JobQueue.run_job(job_id)
+            finally:
+                db.session.remove()
@@ -0,0 +1,172 @@
+"""
+Leaderboard Service - Precomputed rank tables per category and timeframe.
+
+The leaderboard used to sort every public user on each request and could
+only place the viewer if they were in the top 100. Each (category,
+timeframe) pair now has a RankTable rebuilt at most every
+LEADERBOARD_REFRESH_INTERVAL seconds: top-N is a slice and "your rank"
+is a dict lookup plus a binary search.
+
+All-time scores are the counters on User. Week and month scores are
+rolled up from the activities table using the points the routes award:
+10 per review, 5 per submission, 1 per follow given and 3 per follow
+received (helpful votes and approvals have no activity row, so windowed
+reputation slightly undercounts them).
+"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.models import db, User, Activity
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ('reputation', 'reviews', 'submissions')
+
+# Timeframe -> look-back window in days (None = all time)
+TIMEFRAMES = {'week': 7, 'month': 30, 'all': None}
+
+# All-time score column per category
+SCORE_COLUMNS = {
+    'reputation': User.reputation_score,
+    'reviews': User.total_reviews,
+    'submissions': User.total_submissions,
+}
+
+# Windowed points per activity type, per category
+ACTIVITY_POINTS = {
+    'reputation': {'review': 10, 'submission': 5, 'follow': 1},
+    'reviews': {'review': 1},
+    'submissions': {'submission': 1},
+}
+FOLLOWED_POINTS = 3
+
+
+class RankTable:
+    """Users ordered by score, with competition ranking (equal scores share a rank)."""
+
+    def __init__(self, scores: Dict[int, int]):
+        ordered = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        self.user_ids = [user_id for user_id, _ in ordered]
+        self.scores = [score for _, score in ordered]
+        self._negated = [-score for score in self.scores]
+        self._position = {user_id: index for index, user_id in enumerate(self.user_ids)}
+        self.built_at = time.time()
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def _rank(self, score: int) -> int:
+        return bisect.bisect_left(self._negated, -score) + 1
+
+    def top(self, limit: int) -> List[Tuple[int, int, int]]:
+        """First ``limit`` entries as (rank, user_id, score)."""
+        return [
+            (self._rank(score), user_id, score)
+            for user_id, score in zip(self.user_ids[:limit], self.scores[:limit])
+        ]
+
+    def rank_of(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """(rank, score) for a user, or None if they are not ranked."""
+        index = self._position.get(user_id)
+        if index is None:
+            return None
+        score = self.scores[index]
+        return self._rank(score), score
+
+
+class LeaderboardService:
+    """Builds and caches RankTables per (category, timeframe)."""
+
+    _tables: Dict[Tuple[str, str], RankTable] = {}
+    _lock = threading.Lock()
+    _refresh_interval = 300
+
+    @staticmethod
+    def init_app(app):
+        LeaderboardService._refresh_interval = app.config.get('LEADERBOARD_REFRESH_INTERVAL', 300)
+
+    @staticmethod
+    def get_table(category: str, timeframe: str) -> RankTable:
+        """
+        Return the rank table for a category and timeframe, rebuilding it when stale.
+
+        Args:
+            category: 'reputation', 'reviews' or 'submissions'
+            timeframe: 'week', 'month' or 'all'
+        """
+        key = (category, timeframe)
+        table = LeaderboardService._tables.get(key)
+        if table is not None and time.time() - table.built_at < LeaderboardService._refresh_interval:
+            return table
+
+        # One rebuild at a time; requests arriving meanwhile reuse the old table
+        if table is not None and not LeaderboardService._lock.acquire(blocking=False):
+            return table
+        if table is None:
+            LeaderboardService._lock.acquire()
+        try:
+            table = LeaderboardService._tables.get(key)
+            if table is None or time.time() - table.built_at >= LeaderboardService._refresh_interval:
+                started = time.perf_counter()
+                table = RankTable(LeaderboardService._compute_scores(category, timeframe))
+                LeaderboardService._tables[key] = table
+                logger.info(f"Built {category}/{timeframe} leaderboard with {len(table)} users "
+                            f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return table
+        finally:
+            LeaderboardService._lock.release()
+
+    @staticmethod
+    def _compute_scores(category: str, timeframe: str) -> Dict[int, int]:
+        """Scores of public users for a category and timeframe."""
+        days = TIMEFRAMES[timeframe]
+        if days is None:
+            rows = db.session.execute(
+                select(User.id, SCORE_COLUMNS[category]).where(User.profile_public == True)
+            ).all()
+            return {user_id: score or 0 for user_id, score in rows}
+
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        points = ACTIVITY_POINTS[category]
+        scores: Dict[int, int] = defaultdict(int)
+
+        rows = db.session.execute(
+            select(Activity.user_id, Activity.activity_type, func.count(Activity.id))
+            .join(User, User.id == Activity.user_id)
+            .where(
+                User.profile_public == True,
+                Activity.created_at >= cutoff,
+                Activity.activity_type.in_(list(points))
+            )
+            .group_by(Activity.user_id, Activity.activity_type)
+        ).all()
+        for user_id, activity_type, count in rows:
+            scores[user_id] += points[activity_type] * count
+
+        if category == 'reputation':
+            rows = db.session.execute(
+                select(Activity.related_user_id, func.count(Activity.id))
+                .join(User, User.id == Activity.related_user_id)
+                .where(
+                    User.profile_public == True,
+                    Activity.created_at >= cutoff,
+                    Activity.activity_type == 'follow'
+                )
+                .group_by(Activity.related_user_id)
+            ).all()
+            for user_id, count in rows:
+                scores[user_id] += FOLLOWED_POINTS * count
+
+        return {user_id: score for user_id, score in scores.items() if score > 0}
+
+    @staticmethod
+    def clear():
+        LeaderboardService._tables.clear()
@@ -0,0 +1,241 @@
+"""
+Metrics Service - In-process counters, histograms and gauges in Prometheus format.
+
+Code anywhere in the app can record metrics on the shared registry:
+
+    from app.services.metrics import metrics
+    metrics.inc('search_requests_total', {'mode': 'fuzzy'})
+    metrics.cache_access('search', hit=True)
+
+Gunicorn runs several worker processes and a scrape only reaches one of
+them, so with METRICS_MULTIPROC_DIR set every worker periodically writes
+its snapshot to ``<dir>/metrics_<pid>.json`` and /metrics sums the
+snapshots of all workers. Counters and histograms from exited workers are
+kept (they stay monotonic until the directory is cleared at deploy);
+gauges only count workers whose snapshot is fresh.
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: Iterable[Tuple[str, str]]) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in key) + '}'
+
+
+class MetricsRegistry:
+    """Thread-safe metric store for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[LabelKey, List]] = defaultdict(dict)
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._gauge_callbacks: List[Callable[[], Iterable[Tuple[str, Dict, float]]]] = []
+        self._multiproc_dir: Optional[str] = None
+        self._stale_after = 60.0
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: Optional[Tuple[float, ...]] = None):
+        """Register HELP/TYPE text (and histogram buckets) for a metric."""
+        self._help[name] = (kind, help_text)
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def inc(self, name: str, labels: Optional[Dict] = None, amount: float = 1.0):
+        """Increment a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            self._counters[name][key] += amount
+
+    def observe(self, name: str, value: float, labels: Optional[Dict] = None):
+        """Record one observation in a histogram."""
+        buckets = self._buckets.get(name, DEFAULT_BUCKETS)
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name].get(key)
+            if series is None:
+                series = self._histograms[name][key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def cache_access(self, cache: str, hit: bool):
+        """Count a hit or miss on a named application cache."""
+        self.inc('app_cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+    def register_gauge(self, callback: Callable[[], Iterable[Tuple[str, Dict, float]]]):
+        """
+        Register a callback sampled at snapshot time.
+
+        Args:
+            callback: Returns (name, labels, value) tuples for current gauge values
+        """
+        self._gauge_callbacks.append(callback)
+
+    # ------------------------------------------------------------------
+    # Snapshots and multiprocess aggregation
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict:
+        """Return this process's metrics as a JSON-serializable dict."""
+        gauges = []
+        for callback in self._gauge_callbacks:
+            try:
+                for name, labels, value in callback():
+                    gauges.append([name, _label_key(labels), float(value)])
+            except Exception as e:
+                logger.debug(f"Gauge callback failed: {e}")
+
+        with self._lock:
+            counters = [
+                [name, key, value]
+                for name, series in self._counters.items() for key, value in series.items()
+            ]
+            histograms = [
+                [name, key, list(data[0]), data[1], data[2]]
+                for name, series in self._histograms.items() for key, data in series.items()
+            ]
+
+        return {'pid': os.getpid(), 'time': time.time(), 'counters': counters,
+                'histograms': histograms, 'gauges': gauges}
+
+    def configure_multiprocess(self, directory: str, flush_interval: float):
+        """
+        Start writing this worker's snapshot to a shared directory.
+
+        Args:
+            directory: Directory shared by all workers of the deployment
+            flush_interval: Seconds between snapshot writes
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._multiproc_dir = directory
+        self._stale_after = max(flush_interval * 3, 15)
+
+        if self._thread is None and flush_interval > 0:
+            def run():
+                while True:
+                    time.sleep(flush_interval)
+                    self.write_snapshot()
+
+            self._thread = threading.Thread(target=run, name='metrics-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.write_snapshot)
+
+    def write_snapshot(self):
+        """Atomically write this process's snapshot to the multiprocess directory."""
+        if not self._multiproc_dir:
+            return
+        path = os.path.join(self._multiproc_dir, f'metrics_{os.getpid()}.json')
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def _collect_snapshots(self) -> List[Dict]:
+        if not self._multiproc_dir:
+            return [self.snapshot()]
+
+        self.write_snapshot()
+        snapshots = []
+        for name in os.listdir(self._multiproc_dir):
+            if not (name.startswith('metrics_') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self._multiproc_dir, name), encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    def render(self) -> str:
+        """
+        Render all metrics (aggregated across workers) in Prometheus text format.
+
+        Returns:
+            Exposition text for the /metrics endpoint
+        """
+        counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        histograms: Dict[str, Dict[LabelKey, List]] = defaultdict(dict)
+
+        now = time.time()
+        for snap in self._collect_snapshots():
+            for name, key, value in snap['counters']:
+                counters[name][tuple(map(tuple, key))] += value
+            for name, key, buckets, total, count in snap['histograms']:
+                key = tuple(map(tuple, key))
+                series = histograms[name].get(key)
+                if series is None or len(series[0]) != len(buckets):
+                    histograms[name][key] = [list(buckets), total, count]
+                else:
+                    series[0] = [a + b for a, b in zip(series[0], buckets)]
+                    series[1] += total
+                    series[2] += count
+            if now - snap['time'] <= self._stale_after:
+                for name, key, value in snap['gauges']:
+                    gauges[name][tuple(map(tuple, key))] += value
+
+        lines = []
+        for kind, store in (('counter', counters), ('gauge', gauges)):
+            for name in sorted(store):
+                lines.extend(self._header(name, kind))
+                for key, value in sorted(store[name].items()):
+                    lines.append(f'{name}{_format_labels(key)} {value:g}')
+
+        for name in sorted(histograms):
+            lines.extend(self._header(name, 'histogram'))
+            bounds = self._buckets.get(name, DEFAULT_BUCKETS)
+            for key, (buckets, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(list(bounds) + [float('inf')], buckets):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                    lines.append(f'{name}_bucket{_format_labels(key + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(key)} {total:g}')
+                lines.append(f'{name}_count{_format_labels(key)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _header(self, name: str, default_kind: str) -> List[str]:
+        kind, help_text = self._help.get(name, (default_kind, name))
+        return [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
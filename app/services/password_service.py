@@ -0,0 +1,132 @@
+"""
+Password Service - Bounded worker pool for password hashing and verification.
+
+Werkzeug's scrypt/PBKDF2 hashes deliberately take tens of milliseconds of
+CPU. During the login burst at the start of a school day, hashing directly
+in request threads tied up all of them. Hashes now run on a small pool
+with a fixed number of slots (workers plus a short queue); once every slot
+is taken, further logins and signups fail fast with a 503 and Retry-After
+instead of piling up behind each other.
+
+Stored hashes carry their method and parameters (e.g. ``scrypt:32768:8:1``).
+When PASSWORD_HASH_METHOD changes, needs_rehash() reports old hashes so the
+login route can re-hash the password it just verified.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional
+
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _method_prefix_for(method: str) -> str:
+    """
+    Method string werkzeug writes in front of hashes made with ``method``.
+
+    Fills in werkzeug's default parameters the same way generate_password_hash
+    does (e.g. 'scrypt' -> 'scrypt:32768:8:1') without hashing anything.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = args if len(args) == 3 else (2 ** 15, 8, 1)
+        return f'scrypt:{n}:{r}:{p}'
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    return method
+
+
+class HashingBusy(ServiceUnavailable):
+    """Every hashing slot is taken; the client should retry shortly."""
+
+    description = 'Too many sign-ins at once. Please try again in a few seconds.'
+
+
+class PasswordService:
+    """Runs password hashing on a bounded thread pool."""
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _in_flight = 0
+    _lock = threading.Lock()
+    _method = 'scrypt'
+    _method_prefix = _method_prefix_for('scrypt')
+    _timeout = 10.0
+    _retry_after = 2
+
+    @staticmethod
+    def init_app(app):
+        """
+        Create the hashing pool for this process.
+
+        Without init_app (scripts, migrations) hashing runs inline.
+        """
+        workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        queue_depth = app.config.get('PASSWORD_HASH_QUEUE_DEPTH', 8)
+
+        PasswordService._method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        PasswordService._method_prefix = _method_prefix_for(PasswordService._method)
+        PasswordService._timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10.0)
+        PasswordService._retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 2)
+
+        if PasswordService._executor is None:
+            PasswordService._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            PasswordService._slots = threading.BoundedSemaphore(workers + queue_depth)
+            app.logger.info(f"Password hashing pool started ({workers} workers, queue depth {queue_depth})")
+
+    @staticmethod
+    def _run(func: Callable, *args):
+        """Run ``func`` on the pool, or raise HashingBusy if every slot is taken."""
+        if PasswordService._executor is None:
+            return func(*args)
+
+        if not PasswordService._slots.acquire(blocking=False):
+            metrics.inc('password_hash_rejected_total')
+            logger.warning("Password hashing pool saturated; rejecting request")
+            raise HashingBusy(retry_after=PasswordService._retry_after)
+
+        with PasswordService._lock:
+            PasswordService._in_flight += 1
+        future = PasswordService._executor.submit(func, *args)
+        # The slot is held until the hash finishes, even if this request gives up waiting
+        future.add_done_callback(PasswordService._release)
+        try:
+            return future.result(timeout=PasswordService._timeout)
+        except FutureTimeout:
+            metrics.inc('password_hash_rejected_total')
+            logger.warning(f"Password hash took longer than {PasswordService._timeout}s; rejecting request")
+            raise HashingBusy(retry_after=PasswordService._retry_after)
+
+    @staticmethod
+    def _release(future):
+        with PasswordService._lock:
+            PasswordService._in_flight -= 1
+        PasswordService._slots.release()
+
+    @staticmethod
+    def hash_password(password: str) -> str:
+        """Hash a password with the configured method."""
+        return PasswordService._run(generate_password_hash, password, PasswordService._method)
+
+    @staticmethod
+    def verify_password(password_hash: str, password: str) -> bool:
+        """Check a password against a stored hash."""
+        return PasswordService._run(check_password_hash, password_hash, password)
+
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """True if a stored hash was made with a different method or parameters than configured."""
+        return password_hash.split('$', 1)[0] != PasswordService._method_prefix
+
+    @staticmethod
+    def in_flight() -> int:
+        """Hashes running or queued in this process."""
+        return PasswordService._in_flight
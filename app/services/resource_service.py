@@ -5,6 +5,7 @@ This service handles all data loading, caching, and resource retrieval operation
 Implements enterprise-grade patterns including caching, error handling, and logging.
 """
 
+import hashlib
 import json
 import logging
 from pathlib import Path
@@ -18,6 +19,13 @@ logger = logging.getLogger(__name__)
 class ResourceService:
     """Service for managing teaching resources data."""
 
+    # Content hash of the loaded catalog; derived indexes and caches key on it
+    _catalog_version: str = ''
+
+    # Flattened resources of the loaded catalog, rebuilt when the catalog changes
+    _flat_resources: List[Dict] = []
+    _flat_data: Optional[Dict] = None
+
     @staticmethod
     @lru_cache(maxsize=1)
     def _load_resources_data() -> Dict:
@@ -34,12 +42,16 @@ class ResourceService:
             FileNotFoundError: If resources.json is not found
             JSONDecodeError: If JSON is malformed
         """
+        ResourceService._catalog_version = ''
         try:
-            resources_file = Path(current_app.config['BASE_DIR']) / 'data' / 'resources.json'
+            resources_file = Path(current_app.config.get('RESOURCES_FILE') or
+                                  Path(current_app.config['BASE_DIR']) / 'data' / 'resources.json')
             logger.info(f"Loading resources from {resources_file}")
 
-            with open(resources_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(resources_file, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw.decode('utf-8'))
+            ResourceService._catalog_version = hashlib.sha1(raw).hexdigest()[:12]
 
             logger.info(f"Successfully loaded {len(data.get('categories', []))} categories")
             return data
@@ -56,6 +68,17 @@ class ResourceService:
             logger.error(f"Unexpected error loading resources: {e}")
             return {'categories': []}
 
+    @staticmethod
+    def get_catalog_version() -> str:
+        """
+        Identify the currently loaded catalog.
+
+        Returns:
+            Short content hash that changes whenever resources.json changes
+        """
+        ResourceService._load_resources_data()
+        return ResourceService._catalog_version
+
     @staticmethod
     def get_all_categories() -> List[Dict]:
         """
@@ -93,10 +116,17 @@ class ResourceService:
         """
         Get all resources flattened (for API/autocomplete).
 
+        The list is built once per loaded catalog and shared between
+        requests, so callers must copy a resource before modifying it.
+
         Returns:
             List of resource dictionaries with category info
         """
-        categories = ResourceService.get_all_categories()
+        data = ResourceService._load_resources_data()
+        if ResourceService._flat_data is data:
+            return ResourceService._flat_resources
+
+        categories = data.get('categories', [])
         all_resources = []
 
         for category in categories:
@@ -110,6 +140,8 @@ class ResourceService:
                     'url': resource.get('url')
                 })
 
+        ResourceService._flat_resources = all_resources
+        ResourceService._flat_data = data
         logger.debug(f"Flattened {len(all_resources)} resources")
         return all_resources
 
@@ -165,4 +197,6 @@ class ResourceService:
     def clear_cache():
         """Clear the resources data cache. Useful for testing or reloading data."""
         ResourceService._load_resources_data.cache_clear()
+        ResourceService._flat_data = None
+        ResourceService._flat_resources = []
         logger.info("Resources cache cleared")
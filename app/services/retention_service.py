@@ -0,0 +1,328 @@
+"""
+Retention Service - Partitioning, archival and expiry of raw analytics tables.
+
+page_views, resource_views, search_queries, category_views, profile_visits
+and resource_downloads grow by one row per hit. Rows older than the
+retention window are written to gzip-compressed NDJSON files under
+ANALYTICS_ARCHIVE_DIR/<table>/ and then removed. Archive files are never
+appended to or overwritten with different rows: each dropped partition
+gets ``<partition>.ndjson.gz`` and each deleted chunk gets
+``<table>_<YYYY-MM>_<first id>.ndjson.gz``, so re-running after a crash
+rewrites the same file instead of duplicating or losing rows.
+
+On PostgreSQL the tables can be converted to monthly range partitions
+(``flask analytics partition``). The existing table is kept as a
+``<table>_legacy`` partition covering everything before the first monthly
+partition; expired monthly partitions are archived and dropped whole (so
+retention is applied by whole months). Everywhere else (SQLite,
+unconverted tables, the legacy and default partitions) expired rows are
+archived and deleted in chunks so no single transaction holds locks for
+long.
+
+Driven by ``flask analytics retention [--dry-run]``.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import column, delete, select, table as table_clause, text
+
+from app.models import db, PageView, ResourceView, SearchQuery, CategoryView, ProfileVisit, ResourceDownload
+
+logger = logging.getLogger(__name__)
+
+# Table name -> (model, timestamp column name)
+RETENTION_TABLES = {
+    'page_views': (PageView, 'viewed_at'),
+    'resource_views': (ResourceView, 'viewed_at'),
+    'search_queries': (SearchQuery, 'searched_at'),
+    'category_views': (CategoryView, 'viewed_at'),
+    'profile_visits': (ProfileVisit, 'visited_at'),
+    'resource_downloads': (ResourceDownload, 'downloaded_at'),
+}
+
+PARTITION_PATTERN = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def month_start(day) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f'{table}_p{month.year:04d}_{month.month:02d}'
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class RetentionService:
+    """Archive and expire old analytics rows."""
+
+    @staticmethod
+    def is_postgres() -> bool:
+        return db.engine.dialect.name == 'postgresql'
+
+    @staticmethod
+    def retention_days(app, table: str) -> int:
+        """Days to keep for a table (ANALYTICS_RETENTION overrides ANALYTICS_RETENTION_DAYS)."""
+        return app.config.get('ANALYTICS_RETENTION', {}).get(table, app.config.get('ANALYTICS_RETENTION_DAYS', 395))
+
+    # ------------------------------------------------------------------
+    # PostgreSQL partitioning
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def is_partitioned(table: str) -> bool:
+        if not RetentionService.is_postgres():
+            return False
+        return db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table"
+        ), {'table': table}).first() is not None
+
+    @staticmethod
+    def list_partitions(table: str) -> List[Tuple[str, Optional[date]]]:
+        """Partitions of a table as (name, month); month is None for legacy/default partitions."""
+        rows = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ), {'table': table}).scalars().all()
+
+        partitions = []
+        for name in rows:
+            match = PARTITION_PATTERN.search(name)
+            month = date(int(match.group(1)), int(match.group(2)), 1) if match else None
+            partitions.append((name, month))
+        return partitions
+
+    @staticmethod
+    def convert_to_partitioned(table: str, dry_run: bool = False) -> List[str]:
+        """
+        Turn a plain table into a monthly range-partitioned one.
+
+        The old table becomes ``<table>_legacy``, attached for everything before
+        the first day of next month, plus a ``<table>_default`` partition for
+        rows no monthly partition covers. Foreign keys are not carried over.
+
+        Returns:
+            SQL statements run (or that would run with dry_run)
+        """
+        model, ts = RETENTION_TABLES[table]
+        boundary = add_months(month_start(datetime.utcnow()), 1)
+        legacy = f'{table}_legacy'
+
+        sequence = db.session.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': table}
+        ).scalar()
+
+        statements = [
+            f"UPDATE {table} SET {ts} = now() AT TIME ZONE 'utc' WHERE {ts} IS NULL",
+            f"ALTER TABLE {table} ALTER COLUMN {ts} SET NOT NULL",
+            f"ALTER TABLE {table} RENAME TO {legacy}",
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({ts})",
+            f"ALTER TABLE {table} ADD PRIMARY KEY (id, {ts})",
+        ]
+        if sequence:
+            # Keep the id sequence alive when the legacy partition is eventually dropped
+            statements.append(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        statements += [
+            f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_range CHECK ({ts} < '{boundary.isoformat()}')",
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')",
+            # Catches inserts if monthly partitions were not created in time
+            f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT",
+        ]
+        # Indexes on the parent cascade to partitions (existing equivalents on legacy are reused)
+        for index in model.__table__.indexes:
+            columns = ', '.join(column.name for column in index.columns)
+            statements.append(f"CREATE INDEX IF NOT EXISTS {index.name}_part ON {table} ({columns})")
+
+        if not dry_run:
+            try:
+                for statement in statements:
+                    db.session.execute(text(statement))
+                db.session.commit()
+                logger.info(f"Converted {table} to monthly partitions (legacy before {boundary})")
+            except Exception:
+                db.session.rollback()
+                raise
+        return statements
+
+    @staticmethod
+    def ensure_partitions(table: str, months_ahead: int = 3, dry_run: bool = False) -> List[str]:
+        """Create monthly partitions from the current month through ``months_ahead`` months ahead."""
+        existing = {name for name, _ in RetentionService.list_partitions(table)}
+        legacy_end = None
+        if f'{table}_legacy' in existing:
+            bound = db.session.execute(text(
+                "SELECT pg_get_expr(c.relpartbound, c.oid) FROM pg_class c WHERE c.relname = :name"
+            ), {'name': f'{table}_legacy'}).scalar() or ''
+            found = re.search(r"TO \('(\d{4}-\d{2}-\d{2})", bound)
+            legacy_end = date.fromisoformat(found.group(1)) if found else None
+
+        created = []
+        month = month_start(datetime.utcnow())
+        for _ in range(months_ahead + 1):
+            name = partition_name(table, month)
+            if name not in existing and (legacy_end is None or month >= legacy_end):
+                statement = (f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                             f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')")
+                created.append(statement)
+                if not dry_run:
+                    db.session.execute(text(statement))
+            month = add_months(month, 1)
+
+        if not dry_run and created:
+            db.session.commit()
+        return created
+
+    # ------------------------------------------------------------------
+    # Archival and expiry
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _archive_path(archive_dir: str, table: str, name: str) -> str:
+        directory = os.path.join(archive_dir, table)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'{name}.ndjson.gz')
+
+    @staticmethod
+    def _write_rows(path: str, rows: Iterable[Dict]) -> int:
+        """Write rows to a gzip NDJSON file via a temp file, replacing any earlier attempt."""
+        count = 0
+        tmp_path = path + '.tmp'
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps({key: _serialize(value) for key, value in row.items()}) + '\n')
+                    count += 1
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return count
+
+    @staticmethod
+    def drop_expired_partitions(table: str, cutoff: datetime, archive_dir: str,
+                                dry_run: bool = False) -> List[Dict]:
+        """Archive then drop monthly partitions that end on or before ``cutoff``."""
+        actions = []
+        for name, month in RetentionService.list_partitions(table):
+            if month is None or datetime.combine(add_months(month, 1), datetime.min.time()) > cutoff:
+                continue
+
+            rows = db.session.execute(text(f'SELECT count(*) FROM {name}')).scalar()
+            path = RetentionService._archive_path(archive_dir, table, name)
+            actions.append({'table': table, 'action': 'drop partition', 'target': name, 'rows': rows, 'archive': path})
+            if dry_run:
+                continue
+
+            result = db.session.execute(
+                text(f'SELECT * FROM {name}').execution_options(stream_results=True, yield_per=5000)
+            ).mappings()
+            RetentionService._write_rows(path, result)
+
+            db.session.execute(text(f'ALTER TABLE {table} DETACH PARTITION {name}'))
+            db.session.execute(text(f'DROP TABLE {name}'))
+            db.session.commit()
+            logger.info(f"Archived {rows} rows of {name} to {path} and dropped the partition")
+        return actions
+
+    @staticmethod
+    def delete_expired_rows(table: str, cutoff: datetime, archive_dir: str, chunk_size: int = 5000,
+                            dry_run: bool = False, source: Optional[str] = None) -> Dict:
+        """
+        Archive and delete rows older than ``cutoff`` in chunks of ``chunk_size``.
+
+        Chunks are taken in (timestamp, id) order and archived per month under
+        the chunk's first id, so a chunk that was archived but not deleted
+        before a crash is rewritten to the same file on the next run.
+
+        Args:
+            table: Key of RETENTION_TABLES (names the archive directory)
+            source: Physical table to delete from (e.g. a legacy partition); defaults to ``table``
+        """
+        model, ts = RETENTION_TABLES[table]
+        source = source or table
+        core = table_clause(source, *(column(c.name, c.type) for c in model.__table__.columns))
+        ts_column = core.c[ts]
+        target = f'{source}: {ts} < {cutoff:%Y-%m-%d}'
+
+        if dry_run:
+            rows = db.session.execute(
+                select(db.func.count()).select_from(core).where(ts_column < cutoff)
+            ).scalar()
+            return {'table': table, 'action': 'delete rows', 'target': target, 'rows': rows}
+
+        total = 0
+        while True:
+            rows = db.session.execute(
+                select(core).where(ts_column < cutoff).order_by(ts_column, core.c.id).limit(chunk_size)
+            ).mappings().all()
+            if not rows:
+                break
+
+            by_month: Dict[date, List[Dict]] = defaultdict(list)
+            for row in rows:
+                by_month[month_start(row[ts] or cutoff)].append(row)
+            for month, month_rows in by_month.items():
+                name = f"{table}_{month.year:04d}-{month.month:02d}_{month_rows[0]['id']}"
+                RetentionService._write_rows(RetentionService._archive_path(archive_dir, table, name), month_rows)
+
+            db.session.execute(delete(core).where(core.c.id.in_([row['id'] for row in rows])))
+            db.session.commit()
+            total += len(rows)
+
+        if total:
+            logger.info(f"Archived and deleted {total} rows from {source} older than {cutoff:%Y-%m-%d}")
+        return {'table': table, 'action': 'delete rows', 'target': target, 'rows': total}
+
+    @staticmethod
+    def apply_retention(app, tables: Optional[List[str]] = None, dry_run: bool = False) -> List[Dict]:
+        """
+        Archive and remove expired rows from each analytics table.
+
+        Args:
+            app: Flask application (for retention and archive settings)
+            tables: Subset of RETENTION_TABLES (default: all)
+            dry_run: Only report what would be archived and removed
+
+        Returns:
+            One action dict per dropped partition or chunked delete
+        """
+        archive_dir = str(app.config.get('ANALYTICS_ARCHIVE_DIR'))
+        chunk_size = app.config.get('ANALYTICS_DELETE_CHUNK_SIZE', 5000)
+        actions = []
+
+        for table in tables or list(RETENTION_TABLES):
+            cutoff = datetime.utcnow() - timedelta(days=RetentionService.retention_days(app, table))
+            if not RetentionService.is_partitioned(table):
+                actions.append(RetentionService.delete_expired_rows(table, cutoff, archive_dir, chunk_size, dry_run))
+                continue
+
+            for statement in RetentionService.ensure_partitions(table, dry_run=dry_run):
+                actions.append({'table': table, 'action': 'create partition', 'target': statement, 'rows': 0})
+            actions += RetentionService.drop_expired_partitions(table, cutoff, archive_dir, dry_run)
+            # Monthly partitions only go whole; rows-level expiry is limited to legacy/default
+            for name, month in RetentionService.list_partitions(table):
+                if month is None:
+                    actions.append(RetentionService.delete_expired_rows(
+                        table, cutoff, archive_dir, chunk_size, dry_run, source=name
+                    ))
+
+        return actions
@@ -0,0 +1,138 @@
+"""
+Search Cache Service - LRU cache of serialized search and listing responses.
+
+Popular queries ("math", "free", "reading") reach /api/v1/search and
+/api/v1/resources over and over with identical results until the catalog
+changes. Responses are cached as JSON bytes, keyed by endpoint, catalog
+version and the normalized request parameters, so "Math", " math " and
+"MATH" share one entry and a catalog reload retires every old entry.
+
+The cache is per process and bounded by entry count and total bytes;
+entries also expire after SEARCH_CACHE_TTL so popularity-blended rankings
+pick up fresh view counts.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Query words that must keep their case (boolean operators)
+OPERATORS = frozenset({'AND', 'OR'})
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace, keeping AND/OR operators uppercase."""
+    return ' '.join(word if word in OPERATORS else word.lower() for word in (text or '').split())
+
+
+def normalize_params(args, text_params: Iterable[str] = (), list_params: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    Canonical form of request parameters.
+
+    Args:
+        args: Request args (first value of each name is used)
+        text_params: Free-text params to lowercase and whitespace-collapse
+        list_params: Comma-separated params to normalize, de-duplicate and sort
+
+    Returns:
+        Dict of non-empty parameters in canonical form
+    """
+    text_params, list_params = set(text_params), set(list_params)
+    params = {}
+    for name, value in args.items():
+        if name in list_params:
+            value = ','.join(sorted({normalize_text(v) for v in value.split(',') if v.strip()}))
+        elif name in text_params:
+            value = normalize_text(value)
+        else:
+            value = value.strip()
+        if value:
+            params[name] = value
+    return params
+
+
+class SearchCache:
+    """Process-wide LRU of serialized API responses."""
+
+    _lock = threading.Lock()
+    _entries: 'OrderedDict[CacheKey, Tuple[bytes, float]]' = OrderedDict()
+    _bytes = 0
+    _max_entries = 1024
+    _max_bytes = 32 * 1024 * 1024
+    _ttl = 300
+    _stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def init_app(app):
+        """Apply size limits from config and drop anything cached before."""
+        SearchCache._max_entries = app.config.get('SEARCH_CACHE_MAX_ENTRIES', 1024)
+        SearchCache._max_bytes = app.config.get('SEARCH_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+        SearchCache._ttl = app.config.get('SEARCH_CACHE_TTL', 300)
+        SearchCache.clear()
+
+    @staticmethod
+    def make_key(endpoint: str, catalog_version: str, params: Dict[str, str]) -> CacheKey:
+        return endpoint, catalog_version, tuple(sorted(params.items()))
+
+    @staticmethod
+    def get(key: CacheKey) -> Optional[bytes]:
+        """Return the cached body for ``key``, or None on a miss."""
+        now = time.time()
+        with SearchCache._lock:
+            entry = SearchCache._entries.get(key)
+            if entry is not None and entry[1] < now:
+                SearchCache._discard(key)
+                entry = None
+            if entry is None:
+                SearchCache._stats['misses'] += 1
+            else:
+                SearchCache._entries.move_to_end(key)
+                SearchCache._stats['hits'] += 1
+
+        metrics.cache_access(key[0], hit=entry is not None)
+        return entry[0] if entry is not None else None
+
+    @staticmethod
+    def put(key: CacheKey, body: bytes):
+        """Store a serialized response, evicting least recently used entries past the limits."""
+        if not SearchCache._max_entries or len(body) > SearchCache._max_bytes:
+            return
+
+        with SearchCache._lock:
+            if key in SearchCache._entries:
+                SearchCache._discard(key)
+            SearchCache._entries[key] = (body, time.time() + SearchCache._ttl)
+            SearchCache._bytes += len(body)
+
+            while (len(SearchCache._entries) > SearchCache._max_entries
+                   or SearchCache._bytes > SearchCache._max_bytes):
+                oldest = next(iter(SearchCache._entries))
+                SearchCache._discard(oldest)
+                SearchCache._stats['evictions'] += 1
+                metrics.inc('app_cache_evictions_total', {'cache': oldest[0]})
+
+    @staticmethod
+    def _discard(key: CacheKey):
+        """Remove an entry; caller holds the lock."""
+        body, _ = SearchCache._entries.pop(key)
+        SearchCache._bytes -= len(body)
+
+    @staticmethod
+    def clear():
+        with SearchCache._lock:
+            SearchCache._entries.clear()
+            SearchCache._bytes = 0
+
+    @staticmethod
+    def stats() -> Dict:
+        """Hit/miss/eviction counts since start plus current size, for tuning the limits."""
+        with SearchCache._lock:
+            return dict(SearchCache._stats, entries=len(SearchCache._entries), bytes=SearchCache._bytes)
@@ -0,0 +1,561 @@
+"""
+Search Service - Keyword search and filtering over the resource catalog.
+
+Operates on the flattened resource list from
+ResourceService.get_all_resources_flat(), so it has no Flask dependency
+and can be benchmarked on synthetic catalogs.
+
+Fuzzy search uses a trigram index over the words in resource names, tags
+and category names. A query word is compared only with vocabulary words
+sharing at least one trigram with it, so cost grows with the number of
+candidates rather than the size of the catalog.
+
+Keyword search ranks with BM25F: per-field term frequencies are
+length-normalised and boosted, summed, then saturated once per term.
+Document frequencies, field lengths and normalised frequencies are
+precomputed per catalog version, so a query only walks the postings of
+its own terms.
+
+Autocomplete uses a sorted array of every word-suffix of names, tags and
+category names; a prefix lookup is two binary searches plus ranking of the
+matching range by popularity.
+"""
+
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_FIELDS = ('name', 'description', 'tags')
+
+# Minimum trigram similarity (0-1) for a fuzzy match, like pg_trgm's default
+DEFAULT_FUZZY_THRESHOLD = 0.3
+
+# How much a match in each field counts towards a fuzzy score
+FUZZY_FIELD_WEIGHTS = {'name': 1.0, 'tags': 0.8, 'category': 0.6}
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# BM25F field boosts for keyword search
+BM25_FIELD_BOOSTS = {'name': 3.0, 'tags': 1.5, 'description': 1.0}
+
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Dropped from queries so "games for kids" does not require "for"
+STOPWORDS = frozenset({'a', 'an', 'and', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of ``text``."""
+    return WORD_PATTERN.findall((text or '').lower())
+
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrams of a word padded like pg_trgm (two spaces before, one after)."""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram index over the words of a flattened resource list."""
+
+    def __init__(self, resources: List[Dict]):
+        self.resources = resources
+        self.words: List[str] = []
+        self.word_trigrams: List[Set[str]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        # word id -> {resource index: best field weight}
+        self.word_resources: List[Dict[int, float]] = []
+
+        word_ids: Dict[str, int] = {}
+        for index, resource in enumerate(resources):
+            fields = {
+                'name': tokenize(resource.get('name')),
+                'tags': [w for tag in resource.get('tags', []) for w in tokenize(tag)],
+                'category': tokenize(resource.get('category')),
+            }
+            for field, words in fields.items():
+                weight = FUZZY_FIELD_WEIGHTS[field]
+                for word in words:
+                    word_id = word_ids.get(word)
+                    if word_id is None:
+                        word_id = word_ids[word] = len(self.words)
+                        self.words.append(word)
+                        grams = trigrams(word)
+                        self.word_trigrams.append(grams)
+                        self.word_resources.append({})
+                        for gram in grams:
+                            self.postings[gram].append(word_id)
+                    matches = self.word_resources[word_id]
+                    if matches.get(index, 0) < weight:
+                        matches[index] = weight
+
+    def similar_words(self, word: str, threshold: float) -> Dict[int, float]:
+        """
+        Vocabulary words similar to ``word``.
+
+        Returns:
+            Mapping of word id to Jaccard similarity of their trigram sets
+        """
+        grams = trigrams(word)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for word_id in self.postings.get(gram, ()):
+                shared[word_id] += 1
+
+        similar = {}
+        for word_id, count in shared.items():
+            similarity = count / (len(grams) + len(self.word_trigrams[word_id]) - count)
+            if similarity >= threshold:
+                similar[word_id] = similarity
+        return similar
+
+    def search(self, query: str, threshold: float = DEFAULT_FUZZY_THRESHOLD, limit: int = 50) -> List[Dict]:
+        """
+        Rank resources by how well they match every word of ``query``.
+
+        A resource's score is the average over query words of its best
+        (similarity x field weight) match, so all words count.
+
+        Returns:
+            List of {'resource': ..., 'relevance_score': float}, best first
+        """
+        query_words = tokenize(query)
+        if not query_words:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for word in query_words:
+            best: Dict[int, float] = {}
+            for word_id, similarity in self.similar_words(word, threshold).items():
+                for index, weight in self.word_resources[word_id].items():
+                    score = similarity * weight
+                    if score > best.get(index, 0):
+                        best[index] = score
+            for index, score in best.items():
+                scores[index] += score
+
+        # Equal scores: shorter names first (the closest match to the query)
+        ranked = sorted(
+            ((score / len(query_words), index) for index, score in scores.items()
+             if score / len(query_words) >= threshold),
+            key=lambda item: (-item[0], len(self.resources[item[1]].get('name') or ''), item[1])
+        )
+        return [
+            {'resource': self.resources[index], 'relevance_score': round(score, 3)}
+            for score, index in ranked[:limit]
+        ]
+
+
+def parse_query(query: str, default_operator: str = 'and') -> List[List[str]]:
+    """
+    Split a query into clauses that must all match; each clause matches if any of its terms does.
+
+    Words are joined by ``default_operator`` unless an uppercase AND/OR sits
+    between them, e.g. ``math OR science games`` -> [['math', 'science'], ['games']].
+    Stopwords are ignored unless the query has nothing else.
+
+    Returns:
+        List of clauses, each a list of lowercase terms
+    """
+    clauses: List[List[str]] = []
+    operator = None
+    for raw in query.split():
+        if raw in ('AND', 'OR'):
+            operator = raw.lower()
+            continue
+        for term in tokenize(raw):
+            join = operator or default_operator
+            if clauses and join == 'or':
+                clauses[-1].append(term)
+            else:
+                clauses.append([term])
+            # Pieces of one word (k-12 -> k, 12) are always ANDed
+            operator = 'and'
+        operator = None
+
+    meaningful = [[t for t in clause if t not in STOPWORDS] for clause in clauses]
+    meaningful = [clause for clause in meaningful if clause]
+    return meaningful or clauses
+
+
+class BM25Index:
+    """BM25F term statistics over the name, description and tags of a flattened resource list."""
+
+    def __init__(self, resources: List[Dict], k1: float = BM25_K1, b: float = BM25_B):
+        self.resources = resources
+        self.k1 = k1
+        # field -> term -> [(resource index, length-normalised tf)]
+        self.postings: Dict[str, Dict[str, List[tuple]]] = {field: defaultdict(list) for field in BM25_FIELD_BOOSTS}
+        self.doc_freq: Dict[str, int] = defaultdict(int)
+
+        field_tokens = {field: [] for field in BM25_FIELD_BOOSTS}
+        for resource in resources:
+            field_tokens['name'].append(tokenize(resource.get('name')))
+            field_tokens['description'].append(tokenize(resource.get('description')))
+            field_tokens['tags'].append([w for tag in resource.get('tags', []) for w in tokenize(tag)])
+
+        doc_terms: List[Set[str]] = [set() for _ in resources]
+        for field, docs in field_tokens.items():
+            average = (sum(len(tokens) for tokens in docs) / len(docs)) if docs else 0
+            postings = self.postings[field]
+            for index, tokens in enumerate(docs):
+                if not tokens:
+                    continue
+                norm = 1 - b + b * len(tokens) / average
+                counts: Dict[str, int] = defaultdict(int)
+                for token in tokens:
+                    counts[token] += 1
+                for term, count in counts.items():
+                    postings[term].append((index, count / norm))
+                doc_terms[index].update(counts)
+
+        for terms in doc_terms:
+            for term in terms:
+                self.doc_freq[term] += 1
+
+        total = len(resources)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in self.doc_freq.items()
+        }
+
+    def term_weights(self, term: str, fields) -> Dict[int, float]:
+        """Boosted, length-normalised frequency of ``term`` per resource across ``fields``."""
+        weights: Dict[int, float] = defaultdict(float)
+        for field in fields:
+            boost = BM25_FIELD_BOOSTS.get(field)
+            if boost is None:
+                continue
+            for index, tf in self.postings[field].get(term, ()):
+                weights[index] += boost * tf
+        return weights
+
+    def score(self, clauses: List[List[str]], fields=DEFAULT_SEARCH_FIELDS) -> Dict[int, float]:
+        """
+        BM25F scores of resources matching every clause.
+
+        Returns:
+            Mapping of resource index to score
+        """
+        term_weights = {
+            term: self.term_weights(term, fields)
+            for clause in clauses for term in clause
+        }
+
+        # Intersect the smallest clauses first
+        matched: Optional[Set[int]] = None
+        for clause in sorted(clauses, key=lambda c: sum(len(term_weights[t]) for t in c)):
+            clause_docs = set().union(*(term_weights[t].keys() for t in clause))
+            matched = clause_docs if matched is None else matched & clause_docs
+            if not matched:
+                return {}
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weights in term_weights.items():
+            idf = self.idf.get(term, 0.0)
+            for index, weight in weights.items():
+                if index in matched:
+                    scores[index] += idf * weight / (self.k1 + weight)
+        return scores
+
+
+class SuggestIndex:
+    """Prefix index over resource names, tags and category names."""
+
+    # Preferred order when popularity ties
+    TYPE_RANK = {'resource': 0, 'category': 1, 'tag': 2}
+
+    def __init__(self, resources: List[Dict]):
+        self.entries: List[Dict] = []
+        self.members: List[List[str]] = []
+        self.scores: List[int] = []
+        self.view_counts: Optional[Dict[str, int]] = None
+
+        entry_ids: Dict[tuple, int] = {}
+
+        def add(kind: str, text: str, resource_name: str, **extra):
+            key = (kind, text.lower())
+            entry_id = entry_ids.get(key)
+            if entry_id is None:
+                entry_id = entry_ids[key] = len(self.entries)
+                self.entries.append(dict({'text': text, 'type': kind}, **extra))
+                self.members.append([])
+            self.members[entry_id].append(resource_name)
+
+        for resource in resources:
+            name = resource.get('name') or ''
+            if not name:
+                continue
+            add('resource', name, name, category=resource.get('category'), icon=resource.get('category_icon'))
+            if resource.get('category'):
+                add('category', resource['category'], name, icon=resource.get('category_icon'))
+            for tag in resource.get('tags', []):
+                add('tag', tag, name)
+
+        pairs = []
+        for entry_id, entry in enumerate(self.entries):
+            words = entry['text'].lower().split()
+            for start in range(len(words)):
+                pairs.append((' '.join(words[start:]), entry_id))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.ids = [entry_id for _, entry_id in pairs]
+        self.scores = [0] * len(self.entries)
+
+    def set_popularity(self, view_counts: Dict[str, int]):
+        """
+        Rank entries by views: a resource by its own, a tag or category by its most viewed resource.
+        """
+        self.scores = [
+            max((view_counts.get(name, 0) for name in members), default=0)
+            for members in self.members
+        ]
+        self.view_counts = view_counts
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """
+        Entries with a word starting with ``prefix``, most popular first.
+
+        Returns:
+            Up to ``limit`` entry dicts (text, type and, where known, category/icon)
+        """
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + '\uffff', lo)
+        candidates = set(self.ids[lo:hi])
+
+        best = heapq.nsmallest(limit, candidates, key=lambda i: (
+            -self.scores[i],
+            self.TYPE_RANK[self.entries[i]['type']],
+            -len(self.members[i]),
+            len(self.entries[i]['text'])
+        ))
+        return [self.entries[i] for i in best]
+
+
+class SearchService:
+    """Service for searching and filtering resources."""
+
+    _trigram_index: Optional[TrigramIndex] = None
+    _trigram_version: Optional[str] = None
+    _suggest_index: Optional[SuggestIndex] = None
+    _suggest_version: Optional[str] = None
+    _bm25_index: Optional[BM25Index] = None
+    _bm25_version: Optional[str] = None
+    _index_lock = threading.Lock()
+
+    _view_counts: Dict[str, int] = {}
+    _view_counts_loaded_at = 0.0
+
+    @staticmethod
+    def get_view_counts(loader: Callable[[], Dict[str, int]], ttl: int = 300) -> Dict[str, int]:
+        """
+        Resource view counts for popularity ranking, reloaded at most every ``ttl`` seconds.
+
+        Args:
+            loader: Returns {resource name: views}
+            ttl: Seconds to reuse the last result
+        """
+        if time.time() - SearchService._view_counts_loaded_at > ttl:
+            # Claim the refresh so concurrent requests keep using the current counts
+            SearchService._view_counts_loaded_at = time.time()
+            SearchService._view_counts = loader()
+        return SearchService._view_counts
+
+    @staticmethod
+    def get_bm25_index(resources: List[Dict], catalog_version: str) -> BM25Index:
+        """Return the BM25 term statistics for a catalog version, building them on first use."""
+        with SearchService._index_lock:
+            if SearchService._bm25_version != catalog_version or SearchService._bm25_index is None:
+                SearchService._bm25_index = BM25Index(resources)
+                SearchService._bm25_version = catalog_version
+                logger.info(f"Built BM25 index over {len(SearchService._bm25_index.idf)} terms "
+                            f"for catalog {catalog_version}")
+            return SearchService._bm25_index
+
+    @staticmethod
+    def bm25_search(resources: List[Dict], query: str, catalog_version: str, fields=DEFAULT_SEARCH_FIELDS,
+                    limit: int = 50, default_operator: str = 'and', sort: str = 'relevance',
+                    view_counts: Optional[Dict[str, int]] = None, popularity_weight: float = 0.0) -> List[Dict]:
+        """
+        Keyword search ranked by BM25F with field boosts.
+
+        Args:
+            resources: Flattened resource dictionaries
+            query: Search text; words are ANDed unless joined by OR
+            catalog_version: Version of the catalog ``resources`` came from
+            fields: Fields to search (name, description, tags)
+            limit: Maximum number of results
+            default_operator: 'and' or 'or' between words without an explicit operator
+            sort: 'relevance' (BM25, optionally blended with popularity) or 'popularity' (views, then BM25)
+            view_counts: {resource name: views}, needed for popularity blending or sorting
+            popularity_weight: Share of the relevance score that may come from popularity (0-1)
+
+        Returns:
+            List of {'resource': ..., 'relevance_score': float}, best first
+        """
+        clauses = parse_query(query, default_operator)
+        if not clauses:
+            return []
+
+        index = SearchService.get_bm25_index(resources, catalog_version)
+        scores = index.score(clauses, fields)
+        view_counts = view_counts or {}
+
+        def views(i: int) -> int:
+            return view_counts.get(resources[i].get('name'), 0)
+
+        if sort == 'popularity':
+            best = heapq.nlargest(limit, scores, key=lambda i: (views(i), scores[i]))
+        else:
+            if popularity_weight and view_counts:
+                # log-scaled so a few heavily viewed resources do not swamp relevance
+                scale = math.log1p(max(view_counts.values()) or 1)
+                for i in scores:
+                    scores[i] *= 1 - popularity_weight + popularity_weight * math.log1p(views(i)) / scale
+            best = heapq.nlargest(limit, scores, key=scores.get)
+
+        logger.debug(f"BM25 search '{query}' matched {len(scores)} resources")
+        return [
+            {'resource': resources[i], 'relevance_score': round(scores[i], 4)}
+            for i in best
+        ]
+
+    @staticmethod
+    def get_suggest_index(catalog_version: str, load_resources: Callable[[], List[Dict]]) -> SuggestIndex:
+        """
+        Return the autocomplete index for a catalog version, building it on first use.
+
+        Args:
+            catalog_version: ResourceService.get_catalog_version()
+            load_resources: Returns the flattened resources; only called when (re)building
+        """
+        # Lock-free fast path for every keystroke (index is assigned before version)
+        if SearchService._suggest_version == catalog_version:
+            index = SearchService._suggest_index
+            if index is not None:
+                return index
+
+        with SearchService._index_lock:
+            if SearchService._suggest_version != catalog_version or SearchService._suggest_index is None:
+                SearchService._suggest_index = SuggestIndex(load_resources())
+                SearchService._suggest_version = catalog_version
+                logger.info(f"Built suggest index with {len(SearchService._suggest_index.keys)} keys "
+                            f"for catalog {catalog_version}")
+            return SearchService._suggest_index
+
+    @staticmethod
+    def suggest(load_resources: Callable[[], List[Dict]], prefix: str, catalog_version: str, limit: int = 8,
+                view_counts_loader: Optional[Callable[[], Dict[str, int]]] = None,
+                popularity_ttl: int = 300) -> List[Dict]:
+        """
+        Autocomplete suggestions for a typed prefix.
+
+        Args:
+            load_resources: Returns the flattened resources; only called to build the index
+            prefix: Text typed so far
+            catalog_version: Version of the catalog ``load_resources`` returns
+            limit: Maximum suggestions
+            view_counts_loader: Returns {resource name: views}; refreshed every ``popularity_ttl`` seconds
+            popularity_ttl: Seconds between popularity refreshes
+
+        Returns:
+            List of suggestion dicts, most popular first
+        """
+        index = SearchService.get_suggest_index(catalog_version, load_resources)
+
+        if view_counts_loader:
+            view_counts = SearchService.get_view_counts(view_counts_loader, popularity_ttl)
+            if index.view_counts is not view_counts:
+                index.set_popularity(view_counts)
+
+        return index.suggest(prefix, limit)
+
+    @staticmethod
+    def get_trigram_index(resources: List[Dict], catalog_version: str) -> TrigramIndex:
+        """
+        Return the trigram index for a catalog version, building it on first use.
+
+        Args:
+            resources: Flattened resource dictionaries
+            catalog_version: ResourceService.get_catalog_version() for ``resources``
+        """
+        with SearchService._index_lock:
+            if SearchService._trigram_version != catalog_version or SearchService._trigram_index is None:
+                SearchService._trigram_index = TrigramIndex(resources)
+                SearchService._trigram_version = catalog_version
+                logger.info(f"Built trigram index over {len(SearchService._trigram_index.words)} words "
+                            f"for catalog {catalog_version}")
+            return SearchService._trigram_index
+
+    @staticmethod
+    def fuzzy_search(resources: List[Dict], query: str, catalog_version: str,
+                     threshold: float = DEFAULT_FUZZY_THRESHOLD, limit: int = 50) -> List[Dict]:
+        """
+        Typo-tolerant search over names, tags and category names.
+
+        Args:
+            resources: Flattened resource dictionaries
+            query: Search text
+            catalog_version: Version of the catalog ``resources`` came from
+            threshold: Minimum similarity (0-1) for a match
+            limit: Maximum number of results
+
+        Returns:
+            List of {'resource': ..., 'relevance_score': float}, best first
+        """
+        index = SearchService.get_trigram_index(resources, catalog_version)
+        return index.search(query, threshold, limit)
+
+    @staticmethod
+    def filter_resources(resources: List[Dict], category: Optional[str] = None, grade: Optional[str] = None,
+                         subject: Optional[str] = None, cost: Optional[str] = None,
+                         search: Optional[str] = None) -> List[Dict]:
+        """
+        Filter resources by the /api/v1/resources query parameters.
+
+        Args:
+            resources: Flattened resource dictionaries
+            category: Exact category name
+            grade: Substring of the grades field
+            subject: Substring of the subject field
+            cost: Substring of the cost field
+            search: Substring of name or description
+
+        Returns:
+            Matching resources in catalog order
+        """
+        filtered = resources
+
+        if category:
+            filtered = [r for r in filtered if r.get('category') == category]
+
+        if grade:
+            filtered = [r for r in filtered if grade.lower() in r.get('grades', '').lower()]
+
+        if subject:
+            filtered = [r for r in filtered if subject.lower() in r.get('subject', '').lower()]
+
+        if cost:
+            filtered = [r for r in filtered if cost.lower() in r.get('cost', '').lower()]
+
+        if search:
+            search = search.lower()
+            filtered = [r for r in filtered if
+                        search in (r.get('name') or '').lower() or
+                        search in (r.get('description') or '').lower()]
+
+        return filtered
@@ -3,17 +3,143 @@ Statistics Service - Calculates various statistics for resources.
 
 This service handles all statistical calculations for resources and categories,
 keeping business logic separate from routes.
+
+Related categories come from a table built once per catalog version (and
+refreshed every RELATED_CATEGORIES_REFRESH_INTERVAL for new favorites):
+cosine similarity of TF-IDF tag vectors, blended with how often the same
+teachers favorite resources in both categories.
 """
 
 import logging
-from typing import Dict, List
+import math
+import threading
+import time
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Set
 
 logger = logging.getLogger(__name__)
 
 
+def _normalize_tag(tag) -> str:
+    return str(tag).strip().lower()
+
+
+def _tag_similarity(categories: List[Dict]) -> Dict[str, Dict[str, float]]:
+    """
+    Cosine similarity between categories' TF-IDF tag vectors.
+
+    Term frequency is the share of a category's resources carrying the tag;
+    tags found in every category (e.g. 'free') get zero weight.
+    """
+    vectors: Dict[str, Dict[str, float]] = {}
+    for category in categories:
+        resources = category.get('resources', [])
+        if not resources:
+            continue
+        counts: Dict[str, int] = defaultdict(int)
+        for resource in resources:
+            for tag in {_normalize_tag(tag) for tag in resource.get('tags', [])}:
+                counts[tag] += 1
+        vectors[category['name']] = {tag: count / len(resources) for tag, count in counts.items()}
+
+    document_frequency: Dict[str, int] = defaultdict(int)
+    for vector in vectors.values():
+        for tag in vector:
+            document_frequency[tag] += 1
+    idf = {tag: math.log(len(vectors) / df) for tag, df in document_frequency.items()}
+
+    # Weighted, unit-length vectors indexed by tag so only categories sharing a tag are compared
+    postings: Dict[str, List] = defaultdict(list)
+    for name, vector in vectors.items():
+        weighted = {tag: tf * idf[tag] for tag, tf in vector.items() if idf[tag] > 0}
+        norm = math.sqrt(sum(value * value for value in weighted.values()))
+        if not norm:
+            continue
+        for tag, value in weighted.items():
+            postings[tag].append((name, value / norm))
+
+    similarity: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for entries in postings.values():
+        for (a, weight_a), (b, weight_b) in combinations(entries, 2):
+            similarity[a][b] += weight_a * weight_b
+            similarity[b][a] += weight_a * weight_b
+    return similarity
+
+
+def _cofavorite_similarity(favoriters: Dict[str, Set[int]]) -> Dict[str, Dict[str, float]]:
+    """Users favoriting in both categories over the geometric mean of each category's users."""
+    by_user: Dict[int, Set[str]] = defaultdict(set)
+    for name, users in favoriters.items():
+        for user_id in users:
+            by_user[user_id].add(name)
+
+    shared: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for names in by_user.values():
+        for a, b in combinations(sorted(names), 2):
+            shared[a][b] += 1
+            shared[b][a] += 1
+
+    return {
+        a: {b: count / math.sqrt(len(favoriters[a]) * len(favoriters[b])) for b, count in row.items()}
+        for a, row in shared.items()
+    }
+
+
+class RelatedCategories:
+    """Precomputed related-category summaries per category name."""
+
+    def __init__(self, categories: List[Dict], favoriters: Optional[Dict[str, Set[int]]] = None,
+                 cofavorite_weight: float = 0.3, limit: int = 8):
+        names = [category['name'] for category in categories]
+        position = {name: index for index, name in enumerate(names)}
+        summaries = {category['name']: StatsService._summarize(category) for category in categories}
+
+        tags = _tag_similarity(categories)
+        cofavorites = _cofavorite_similarity(
+            {name: users for name, users in (favoriters or {}).items() if name in position}
+        )
+
+        self.related: Dict[str, List[Dict]] = {}
+        for index, name in enumerate(names):
+            scores = defaultdict(float)
+            for other, value in tags.get(name, {}).items():
+                scores[other] += (1 - cofavorite_weight) * value
+            for other, value in cofavorites.get(name, {}).items():
+                scores[other] += cofavorite_weight * value
+
+            ranked = sorted((other for other, score in scores.items() if score > 0),
+                            key=lambda other: (-scores[other], position[other]))[:limit]
+            # Categories with little overlap are topped up with their list neighbours
+            for offset in (-1, 1, -2, 2, -3, 3, -4, 4):
+                if len(ranked) >= limit:
+                    break
+                neighbour = index + offset
+                if 0 <= neighbour < len(names) and names[neighbour] not in ranked and neighbour != index:
+                    ranked.append(names[neighbour])
+
+            self.related[name] = [summaries[other] for other in ranked]
+
+        self.built_at = time.time()
+
+    def get(self, name: str, count: int) -> List[Dict]:
+        return self.related.get(name, [])[:count]
+
+
 class StatsService:
     """Service for calculating resource statistics."""
 
+    _related: Optional[RelatedCategories] = None
+    _related_version: Optional[str] = None
+    _related_lock = threading.Lock()
+    _related_refresh_interval = 3600
+    _cofavorite_weight = 0.3
+
+    @staticmethod
+    def init_app(app):
+        StatsService._related_refresh_interval = app.config.get('RELATED_CATEGORIES_REFRESH_INTERVAL', 3600)
+        StatsService._cofavorite_weight = app.config.get('RELATED_CATEGORIES_COFAVORITE_WEIGHT', 0.3)
+
     @staticmethod
     def calculate_homepage_stats(categories: List[Dict]) -> Dict:
         """
@@ -132,42 +258,77 @@ class StatsService:
         return count
 
     @staticmethod
-    def get_related_categories(categories: List[Dict], current_category: Dict, count: int = 4) -> List[Dict]:
+    def _summarize(category: Dict) -> Dict:
+        return {
+            'name': category['name'],
+            'icon': category['icon'],
+            'description': category['description'],
+            'count': len(category.get('resources', []))
+        }
+
+    @staticmethod
+    def _load_favoriters() -> Dict[str, Set[int]]:
+        """Users who favorited at least one resource, per category name."""
+        from app.models import db, Favorite
+
+        favoriters: Dict[str, Set[int]] = defaultdict(set)
+        try:
+            rows = db.session.query(Favorite.resource_category, Favorite.user_id).distinct().all()
+        except Exception as e:
+            logger.debug(f"Co-favorite data unavailable: {e}")
+            db.session.rollback()
+            return {}
+        for category_name, user_id in rows:
+            favoriters[category_name].add(user_id)
+        return favoriters
+
+    @staticmethod
+    def get_related_table(categories: List[Dict], catalog_version: str) -> RelatedCategories:
         """
-        Find related categories (currently based on alphabetical proximity).
+        Return the related-categories table for a catalog version.
+
+        Rebuilt when the catalog changes or the table is older than
+        RELATED_CATEGORIES_REFRESH_INTERVAL; requests arriving during a
+        refresh keep using the previous table.
+        """
+        table = StatsService._related
+        fresh = (table is not None and StatsService._related_version == catalog_version and
+                 time.time() - table.built_at < StatsService._related_refresh_interval)
+        if fresh:
+            return table
+
+        stale_but_usable = table is not None and StatsService._related_version == catalog_version
+        if not StatsService._related_lock.acquire(blocking=not stale_but_usable):
+            return table
+        try:
+            if StatsService._related is table:
+                started = time.perf_counter()
+                StatsService._related = RelatedCategories(
+                    categories, StatsService._load_favoriters(), StatsService._cofavorite_weight
+                )
+                StatsService._related_version = catalog_version
+                logger.info(f"Built related categories for catalog {catalog_version} "
+                            f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+            return StatsService._related
+        finally:
+            StatsService._related_lock.release()
+
+    @staticmethod
+    def get_related_categories(categories: List[Dict], current_category: Dict, count: int = 4,
+                               catalog_version: str = '') -> List[Dict]:
+        """
+        Find related categories by shared tags and co-favoriting.
 
         Args:
             categories: List of all categories
             current_category: The current category
             count: Number of related categories to return
+            catalog_version: Version of the catalog ``categories`` came from
 
         Returns:
             List of related category dictionaries
         """
-        try:
-            current_index = categories.index(current_category)
-        except ValueError:
-            logger.warning("Current category not found in categories list")
-            return []
-
-        related = []
-
-        # Get categories before and after (2 each)
-        start = max(0, current_index - 2)
-        end = min(len(categories), current_index + 3)
-
-        for i in range(start, end):
-            if i != current_index and categories[i] not in related:
-                related.append({
-                    'name': categories[i]['name'],
-                    'icon': categories[i]['icon'],
-                    'description': categories[i]['description'],
-                    'count': len(categories[i].get('resources', []))
-                })
-
-        # Limit to requested count
-        related = related[:count]
-
+        related = StatsService.get_related_table(categories, catalog_version).get(current_category['name'], count)
         logger.debug(f"Found {len(related)} related categories")
         return related
 
@@ -183,15 +344,7 @@ class StatsService:
         Returns:
             List of category summary dictionaries
         """
-        summary = [
-            {
-                'name': cat['name'],
-                'icon': cat['icon'],
-                'description': cat['description'],
-                'count': len(cat.get('resources', []))
-            }
-            for cat in categories[:limit]
-        ]
+        summary = [StatsService._summarize(cat) for cat in categories[:limit]]
 
         logger.debug(f"Generated summary for {len(summary)} categories")
         return summary
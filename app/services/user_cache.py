@@ -0,0 +1,150 @@
+"""
+User Cache Service - Cached Flask-Login principal for authenticated requests.
+
+The Flask-Login user loader used to fetch the whole ``users`` row (bio,
+about me, teaching philosophy, OAuth tokens, ...) on every authenticated
+request, although most requests only need the id, username and role
+flags. The loader now returns a CachedUser built from a slim snapshot held
+per process for USER_CACHE_TTL seconds. Any other attribute, method or
+assignment loads the full ORM User on first use within the request.
+
+Snapshots are invalidated in-process whenever a User row is updated or
+deleted through the ORM (profile edits, bans, role changes); other
+gunicorn workers pick the change up when their TTL expires.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.models import db, User
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in the snapshot: identity, role flags and what the nav bar shows
+SNAPSHOT_FIELDS = (
+    'id', 'username', 'display_name', 'profile_picture',
+    'is_admin', 'is_moderator', 'is_verified_teacher', 'is_banned',
+)
+
+
+class CachedUser(UserMixin):
+    """
+    Principal backed by a cached snapshot, loading the full User lazily.
+
+    Reads of snapshot fields are served from the cache until the full User
+    has been loaded; after that every read goes to the ORM object so a
+    request sees its own changes. Assignments always go to the ORM object.
+    """
+
+    def __init__(self, snapshot: Dict):
+        object.__setattr__(self, '_snapshot', snapshot)
+        object.__setattr__(self, '_user', None)
+
+    @property
+    def user(self) -> User:
+        """The full ORM User, loaded on first access."""
+        if self._user is None:
+            user = db.session.get(User, self._snapshot['id'])
+            if user is None:
+                raise LookupError(f"User {self._snapshot['id']} no longer exists")
+            object.__setattr__(self, '_user', user)
+        return self._user
+
+    def get_id(self):
+        return str(self._snapshot['id'])
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._user is None and name in self._snapshot:
+            return self._snapshot[name]
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.user, name, value)
+
+    def __repr__(self):
+        return f'<CachedUser {self._snapshot["username"]}>'
+
+
+class UserCache:
+    """Per-process TTL cache of user snapshots keyed by user id."""
+
+    _lock = threading.Lock()
+    _snapshots: Dict[int, Tuple[Dict, float]] = {}
+    _ttl = 30
+    _max_entries = 10000
+    _listening = False
+
+    @staticmethod
+    def init_app(app):
+        """Apply config and invalidate snapshots when User rows change."""
+        UserCache._ttl = app.config.get('USER_CACHE_TTL', 30)
+        UserCache._max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', 10000)
+
+        if not UserCache._listening:
+            for name in ('after_update', 'after_delete'):
+                event.listen(User, name, UserCache._on_user_flush)
+            event.listen(Session, 'after_commit', UserCache._on_commit)
+            UserCache._listening = True
+
+    @staticmethod
+    def _on_user_flush(mapper, connection, target):
+        UserCache.invalidate(target.id)
+        # A concurrent request may re-cache the old row before this commits; forget it again after
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('user_cache_invalidate', set()).add(target.id)
+
+    @staticmethod
+    def _on_commit(session):
+        for user_id in session.info.pop('user_cache_invalidate', ()):
+            UserCache.invalidate(user_id)
+
+    @staticmethod
+    def load(user_id: int) -> Optional[CachedUser]:
+        """
+        Return the principal for a user id, or None if the user does not exist.
+
+        Args:
+            user_id: Id stored in the session by Flask-Login
+        """
+        now = time.time()
+        with UserCache._lock:
+            entry = UserCache._snapshots.get(user_id)
+        hit = entry is not None and entry[1] > now
+        metrics.cache_access('user_loader', hit)
+        if hit:
+            return CachedUser(entry[0])
+
+        columns = [getattr(User, field) for field in SNAPSHOT_FIELDS]
+        row = db.session.execute(select(*columns).where(User.id == user_id)).first()
+        if row is None:
+            UserCache.invalidate(user_id)
+            return None
+
+        snapshot = dict(zip(SNAPSHOT_FIELDS, row))
+        with UserCache._lock:
+            if len(UserCache._snapshots) >= UserCache._max_entries:
+                # Drop the oldest insertion to stay bounded
+                UserCache._snapshots.pop(next(iter(UserCache._snapshots)))
+            UserCache._snapshots[user_id] = (snapshot, now + UserCache._ttl)
+        return CachedUser(snapshot)
+
+    @staticmethod
+    def invalidate(user_id: int):
+        """Forget a user's snapshot after a profile, role or ban change."""
+        with UserCache._lock:
+            UserCache._snapshots.pop(user_id, None)
+
+    @staticmethod
+    def clear():
+        with UserCache._lock:
+            UserCache._snapshots.clear()
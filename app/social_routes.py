@@ -7,6 +7,7 @@ Allows teachers to follow each other, view activity feeds, and discover other te
 from flask import render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
 from app.models import db, User, Follow, Activity, Review, Favorite, TeachingJourneyEvent, ClassroomPhoto, FavoriteLesson
+from app.services.leaderboard_service import LeaderboardService, CATEGORIES, TIMEFRAMES
 from sqlalchemy import or_, desc, func
 from datetime import datetime, timedelta
 import logging
@@ -62,7 +63,7 @@ def register_social_routes(bp):
             sort_by = request.args.get('sort', 'active')  # active, reviews, followers
 
             # Base query
-            teachers = User.query.filter(
+            teachers = User.query.options(User.card_options()).filter(
                 User.profile_public == True
             )
 
@@ -259,7 +260,7 @@ def register_social_routes(bp):
             user = User.query.filter_by(username=username).first_or_404()
 
             # Get followers
-            followers = db.session.query(User).join(
+            followers = db.session.query(User).options(User.card_options()).join(
                 Follow, Follow.follower_id == User.id
             ).filter(
                 Follow.followed_id == user.id
@@ -287,7 +288,7 @@ def register_social_routes(bp):
             user = User.query.filter_by(username=username).first_or_404()
 
             # Get following
-            following = db.session.query(User).join(
+            following = db.session.query(User).options(User.card_options()).join(
                 Follow, Follow.followed_id == User.id
             ).filter(
                 Follow.follower_id == user.id
@@ -315,42 +316,50 @@ def register_social_routes(bp):
             # Get filter
             timeframe = request.args.get('timeframe', 'all')  # all, month, week
             category = request.args.get('category', 'reputation')  # reputation, reviews, submissions
-
-            # Base query
-            users = User.query.filter(User.profile_public == True)
-
-            # Order by category
-            if category == 'reviews':
-                users = users.order_by(User.total_reviews.desc())
-            elif category == 'submissions':
-                users = users.order_by(User.total_submissions.desc())
-            else:  # reputation
-                users = users.order_by(User.reputation_score.desc())
-
-            # Limit to top 100
-            top_users = users.limit(100).all()
-
-            # Calculate ranks
-            users_with_ranks = []
-            for rank, user in enumerate(top_users, 1):
-                users_with_ranks.append({
-                    'rank': rank,
-                    'user': user
-                })
-
-            # Find current user's rank if authenticated
-            current_user_rank = None
+            if timeframe not in TIMEFRAMES:
+                timeframe = 'all'
+            if category not in CATEGORIES:
+                category = 'reputation'
+
+            # Precomputed ranks, refreshed every LEADERBOARD_REFRESH_INTERVAL seconds
+            table = LeaderboardService.get_table(category, timeframe)
+            top = table.top(100)
+
+            users_by_id = {
+                user.id: user for user in User.query.options(User.card_options()).filter(
+                    User.id.in_([user_id for _, user_id, _ in top])
+                )
+            }
+
+            following_ids = set()
+            if current_user.is_authenticated:
+                following_ids = {f.followed_id for f in current_user.following.all()}
+
+            leaders = []
+            for rank, user_id, score in top:
+                user = users_by_id.get(user_id)
+                if user is None:
+                    continue
+                user.leaderboard_rank = rank
+                user.leaderboard_score = score
+                user.is_following = user_id in following_ids
+                leaders.append(user)
+
+            # Current user's rank, wherever they are in the table
+            current_user_position = None
+            current_user_score = 0
             if current_user.is_authenticated:
-                for item in users_with_ranks:
-                    if item['user'].id == current_user.id:
-                        current_user_rank = item['rank']
-                        break
+                position = table.rank_of(current_user.id)
+                if position:
+                    current_user_position, current_user_score = position
 
             return render_template('social/leaderboard.html',
-                                 users=users_with_ranks,
-                                 category=category,
+                                 leaders=leaders,
+                                 tab=category,
                                  timeframe=timeframe,
-                                 current_user_rank=current_user_rank)
+                                 ranked_count=len(table),
+                                 current_user_position=current_user_position,
+                                 current_user_score=current_user_score)
 
         except Exception as e:
             logger.error(f"Error loading leaderboard: {e}", exc_info=True)
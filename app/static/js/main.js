@@ -60,17 +60,9 @@ function initHomepageSearch() {
 
     if (!heroSearchInput || !heroSearchBtn) return;
 
-    let allResources = [];
     let selectedIndex = -1;
-
-    // Fetch resources data on page load
-    fetch('/api/resources')
-        .then(response => response.json())
-        .then(data => {
-            allResources = data.resources || [];
-            console.log(`Loaded ${allResources.length} resources for autocomplete`);
-        })
-        .catch(error => console.error('Error loading resources:', error));
+    let suggestTimer = null;
+    let suggestController = null;
 
     // Function to navigate to resources with search
     function navigateToResources(searchTerm = null) {
@@ -82,53 +74,57 @@ function initHomepageSearch() {
         }
     }
 
-    // Function to show autocomplete results
-    function showAutocomplete(searchTerm) {
-        if (!searchTerm || searchTerm.length < 2) {
-            hideAutocomplete();
-            return;
-        }
+    // Fetch suggestions for the typed prefix, cancelling any request still in flight
+    function fetchSuggestions(searchTerm) {
+        if (suggestController) suggestController.abort();
+        suggestController = new AbortController();
 
-        const lowerSearch = searchTerm.toLowerCase();
-        const matches = allResources.filter(resource => {
-            return resource.name.toLowerCase().includes(lowerSearch) ||
-                   resource.description.toLowerCase().includes(lowerSearch) ||
-                   resource.category.toLowerCase().includes(lowerSearch) ||
-                   resource.tags.some(tag => tag.toLowerCase().includes(lowerSearch));
-        });
+        fetch(`/api/v1/suggest?q=${encodeURIComponent(searchTerm)}&limit=8`, { signal: suggestController.signal })
+            .then(response => response.json())
+            .then(data => {
+                if (heroSearchInput.value.trim() === searchTerm) {
+                    showAutocomplete(searchTerm, data.suggestions || []);
+                }
+            })
+            .catch(error => {
+                if (error.name !== 'AbortError') console.error('Error loading suggestions:', error);
+            });
+    }
 
-        if (matches.length === 0) {
+    // Function to show autocomplete results
+    function showAutocomplete(searchTerm, suggestions) {
+        if (suggestions.length === 0) {
             hideAutocomplete();
             return;
         }
 
-        // Show top 8 matches
-        const topMatches = matches.slice(0, 8);
         autocompleteResults.innerHTML = '';
 
-        topMatches.forEach((resource, index) => {
+        suggestions.forEach((suggestion, index) => {
             const item = document.createElement('div');
             item.className = 'autocomplete-item';
             item.setAttribute('data-index', index);
 
             // Highlight matching text
-            const nameParts = highlightMatch(resource.name, searchTerm);
+            const nameParts = highlightMatch(suggestion.text, searchTerm);
+            const label = suggestion.type === 'resource' ? (suggestion.category || '') :
+                          suggestion.type === 'category' ? 'Category' : 'Tag';
+            const icon = suggestion.icon || (suggestion.type === 'tag' ? '🏷️' : '🔎');
 
             item.innerHTML = `
-                <div class="autocomplete-item-icon">${resource.category_icon}</div>
+                <div class="autocomplete-item-icon">${escapeHtml(icon)}</div>
                 <div class="autocomplete-item-content">
                     <div class="autocomplete-item-name">${nameParts}</div>
-                    <div class="autocomplete-item-category">${resource.category}</div>
-                </div>
-                <div class="autocomplete-item-tags">
-                    ${resource.tags.slice(0, 2).map(tag =>
-                        `<span class="autocomplete-tag">${tag}</span>`
-                    ).join('')}
+                    <div class="autocomplete-item-category">${escapeHtml(label)}</div>
                 </div>
             `;
 
             item.addEventListener('click', () => {
-                navigateToResources(resource.name);
+                if (suggestion.type === 'category') {
+                    window.location.href = `/category/${encodeURIComponent(suggestion.text)}`;
+                } else {
+                    navigateToResources(suggestion.text);
+                }
             });
 
             item.addEventListener('mouseenter', () => {
@@ -139,18 +135,9 @@ function initHomepageSearch() {
             autocompleteResults.appendChild(item);
         });
 
-        // Show "See all X results" footer
-        if (matches.length > 8) {
-            autocompleteCount.textContent = `See all ${matches.length} results →`;
-            autocompleteFooter.style.display = 'block';
-            autocompleteFooter.onclick = () => navigateToResources(searchTerm);
-        } else if (matches.length > 1) {
-            autocompleteCount.textContent = `${matches.length} resources found →`;
-            autocompleteFooter.style.display = 'block';
-            autocompleteFooter.onclick = () => navigateToResources(searchTerm);
-        } else {
-            autocompleteFooter.style.display = 'none';
-        }
+        autocompleteCount.textContent = `Search all resources for "${searchTerm}" →`;
+        autocompleteFooter.style.display = 'block';
+        autocompleteFooter.onclick = () => navigateToResources(searchTerm);
 
         autocompleteDropdown.style.display = 'block';
         selectedIndex = -1;
@@ -161,9 +148,18 @@ function initHomepageSearch() {
         selectedIndex = -1;
     }
 
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
     function highlightMatch(text, search) {
-        const regex = new RegExp(`(${search})`, 'gi');
-        return text.replace(regex, '<strong>$1</strong>');
+        const pattern = search.trim().replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+        if (!pattern) return escapeHtml(text);
+        return text.split(new RegExp(`(${pattern})`, 'gi'))
+            .map((part, i) => i % 2 ? `<strong>${escapeHtml(part)}</strong>` : escapeHtml(part))
+            .join('');
     }
 
     function updateSelectedItem() {
@@ -179,7 +175,14 @@ function initHomepageSearch() {
 
     // Input event for live search
     heroSearchInput.addEventListener('input', function() {
-        showAutocomplete(this.value);
+        const searchTerm = this.value.trim();
+        clearTimeout(suggestTimer);
+        if (searchTerm.length < 2) {
+            if (suggestController) suggestController.abort();
+            hideAutocomplete();
+            return;
+        }
+        suggestTimer = setTimeout(() => fetchSuggestions(searchTerm), 150);
     });
 
     // Keyboard navigation
@@ -0,0 +1,50 @@
+"""
+Background tasks run by the `flask worker` command.
+
+Each task is registered by name with the job queue and can be enqueued from
+any route module with ``JobQueue.enqueue('<name>', **kwargs)``.
+"""
+
+import logging
+from sqlalchemy import func, update
+from app.models import db, UploadedResource, ResourceDownload
+from app.services.job_queue import task
+
+logger = logging.getLogger(__name__)
+
+
+@task('photos.generate_thumbnails')
+def generate_photo_thumbnails(photo_id):
+    """Generate responsive derivatives for an uploaded classroom photo."""
+    from app.services.image_service import ImageService
+    ImageService.process_photo(photo_id)
+
+
+@task('admin.refresh_stats')
+def refresh_admin_stats():
+    """Recompute the materialized admin dashboard counts (e.g. from cron)."""
+    from app.services.admin_stats_service import AdminStatsService
+    AdminStatsService.refresh()
+
+
+@task('counters.repair_downloads')
+def repair_download_counts():
+    """Recompute UploadedResource.download_count from the download log."""
+    counts = dict(db.session.query(
+        ResourceDownload.resource_id,
+        func.count(ResourceDownload.id)
+    ).group_by(ResourceDownload.resource_id).all())
+
+    repaired = 0
+    for resource_id, download_count in db.session.query(UploadedResource.id, UploadedResource.download_count):
+        actual = counts.get(resource_id, 0)
+        if download_count != actual:
+            db.session.execute(
+                update(UploadedResource)
+                .where(UploadedResource.id == resource_id)
+                .values(download_count=actual)
+            )
+            repaired += 1
+
+    db.session.commit()
+    logger.info(f"Repaired download counts for {repaired} resources")
@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the Teaching Resources Hub.
+
+- ``datasets``: reproducible synthetic catalogs and seeded databases
+- ``routes``: latency/query/memory benchmark of hot routes via the test client
+- ``micro``: per-function timings of the catalog services with a regression gate
+
+See BENCHMARKS.md for usage.
+"""
@@ -0,0 +1,103 @@
+"""
+Shared helpers for benchmark scripts: statistics, run metadata and result files.
+"""
+
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import Config
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(timings: List[float]) -> Dict:
+    """Latency summary in milliseconds."""
+    return {
+        'count': len(timings),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3) if timings else 0.0,
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3) if timings else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Config.BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(**extra) -> Dict:
+    """Describe the environment a result was produced in."""
+    return dict({
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+    }, **extra)
+
+
+def write_results(path: str, results: Dict):
+    """Write a results document as indented JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict], metric: str,
+            threshold_pct: float) -> List[Dict]:
+    """
+    Compare one metric between two result sets.
+
+    Args:
+        baseline: Mapping of benchmark name to stats from a previous run
+        current: Mapping of benchmark name to stats from this run
+        metric: Stat to compare (e.g. 'p95_ms')
+        threshold_pct: Increase over baseline, in percent, counted as a regression
+
+    Returns:
+        One row per benchmark present in both runs with old, new, change_pct, regressed
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        old = baseline[name].get(metric)
+        new = current[name].get(metric)
+        if old is None or new is None:
+            continue
+        change = ((new - old) / old * 100) if old else 0.0
+        rows.append({
+            'name': name,
+            'old': old,
+            'new': new,
+            'change_pct': round(change, 1),
+            'regressed': change > threshold_pct,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict], metric: str):
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>9}")
+    for row in rows:
+        flag = '  REGRESSED' if row['regressed'] else ''
+        print(f"{row['name']:<55} {row['old']:>12.3f} {row['new']:>12.3f} {row['change_pct']:>8.1f}%{flag}  ({metric})")
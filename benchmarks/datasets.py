@@ -0,0 +1,251 @@
+"""
+Reproducible synthetic datasets for benchmarks.
+
+Everything is derived from a seeded ``random.Random`` so two runs with the
+same arguments produce identical catalogs and databases, which is what makes
+results comparable between commits.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from config import Config
+
+BASE_CATALOG = Config.BASE_DIR / 'data' / 'resources.json'
+
+GRADE_LEVELS = ['Elementary', 'Middle School', 'High School', 'K-12', 'College']
+SUBJECTS = ['Math', 'Science', 'English', 'History', 'Art', 'Music', 'Computer Science',
+            'Spanish', 'Physical Education', 'Special Education']
+FILLER_WORDS = ['interactive', 'printable', 'standards-aligned', 'collaborative', 'adaptive',
+                'hands-on', 'project-based', 'differentiated', 'assessment', 'lesson',
+                'worksheet', 'simulation', 'video', 'quiz', 'rubric', 'unit', 'activity']
+
+DEFAULT_VOLUMES = {
+    'users': 2000,
+    'follows_per_user': 15,
+    'favorites_per_user': 10,
+    'reviews_per_user': 3,
+    'activities_per_user': 5,
+    'page_views': 50000,
+    'resource_views': 20000,
+}
+
+# Every seeded user has this password
+BENCHMARK_PASSWORD = 'benchmark123'
+
+INSERT_CHUNK = 5000
+
+
+def generate_catalog(resource_count: int, category_count: int = 55, seed: int = 42) -> Dict:
+    """
+    Build a resources.json-shaped catalog by scaling up the real one.
+
+    Category names, icons and tag vocabulary come from data/resources.json;
+    resources are synthesized from real templates with unique names and URLs.
+
+    Args:
+        resource_count: Total number of resources to generate
+        category_count: Number of categories (extra ones reuse real names with a suffix)
+        seed: Random seed
+
+    Returns:
+        Dict with a ``categories`` list, like data/resources.json
+    """
+    rng = random.Random(seed)
+    with open(BASE_CATALOG, encoding='utf-8') as f:
+        base = json.load(f)['categories']
+
+    templates = [r for c in base for r in c.get('resources', [])]
+    tags = sorted({t for r in templates for t in r.get('tags', [])})
+
+    categories = []
+    for i in range(category_count):
+        source = base[i % len(base)]
+        suffix = f' {i // len(base) + 1}' if i >= len(base) else ''
+        categories.append({
+            'name': source['name'] + suffix,
+            'icon': source.get('icon', ''),
+            'description': source.get('description', ''),
+            'resources': []
+        })
+
+    for i in range(resource_count):
+        template = rng.choice(templates)
+        category = categories[i % category_count]
+        extra = ' '.join(rng.sample(FILLER_WORDS, 4))
+        category['resources'].append({
+            'name': f"{template['name']} {i}",
+            'url': f"https://example.org/resources/{i}",
+            'description': f"{template.get('description', '')} {extra}",
+            'tags': sorted(set(template.get('tags', [])) | set(rng.sample(tags, 2)))
+        })
+
+    return {'categories': categories}
+
+
+def write_catalog(path, resource_count: int, category_count: int = 55, seed: int = 42) -> Path:
+    """Generate a catalog and write it to ``path``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_catalog(resource_count, category_count, seed), f)
+    return path
+
+
+def make_config(database_url: str, resources_file):
+    """
+    Build a Config subclass for benchmarking.
+
+    Background threads, sampling profilers and slow-query logging are turned
+    off so they do not distort timings.
+    """
+    class BenchmarkConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = database_url
+        RESOURCES_FILE = str(resources_file)
+        PROFILING_SAMPLE_RATE = 0
+        METRICS_MULTIPROC_DIR = None
+        JOB_QUEUE_ENABLED = False
+        SLOW_REQUEST_QUERY_COUNT = 10 ** 9
+        SLOW_REQUEST_DB_TIME = float('inf')
+
+    return BenchmarkConfig
+
+
+def _bulk_insert(db, model, rows: List[Dict]):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(insert(model), rows[start:start + INSERT_CHUNK])
+    db.session.commit()
+
+
+def seed_database(catalog: Dict, volumes: Dict = None, seed: int = 42) -> Dict:
+    """
+    Populate the current app's database with synthetic social data.
+
+    Must run inside an application context on an empty database.
+
+    Args:
+        catalog: Catalog returned by generate_catalog (favorites/reviews reference it)
+        volumes: Overrides for DEFAULT_VOLUMES
+        seed: Random seed
+
+    Returns:
+        Dict of row counts inserted per table
+    """
+    from app.models import db, User, Follow, Favorite, Review, Activity, PageView, ResourceView
+
+    volumes = dict(DEFAULT_VOLUMES, **(volumes or {}))
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(BENCHMARK_PASSWORD)
+
+    resources = [(c['name'], r) for c in catalog['categories'] for r in c['resources']]
+    user_count = volumes['users']
+
+    def recent(days=180):
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    users = [{
+        'id': i,
+        'username': f'teacher{i}',
+        'email': f'teacher{i}@example.org',
+        'password_hash': password_hash,
+        'display_name': f'Teacher {i}',
+        'bio': ' '.join(rng.choices(FILLER_WORDS, k=30)),
+        'school': f'School {i % 300}',
+        'grade_level': rng.choice(GRADE_LEVELS),
+        'subjects_taught': ', '.join(rng.sample(SUBJECTS, 2)),
+        'years_teaching': rng.randrange(1, 35),
+        'about_me': ' '.join(rng.choices(FILLER_WORDS, k=120)),
+        'teaching_philosophy': ' '.join(rng.choices(FILLER_WORDS, k=80)),
+        'reputation_score': rng.randrange(0, 500),
+        'total_reviews': volumes['reviews_per_user'],
+        'profile_public': True,
+        'created_at': recent(720),
+        'last_login': recent(30),
+    } for i in range(1, user_count + 1)]
+    _bulk_insert(db, User, users)
+
+    follows = []
+    for follower in range(1, user_count + 1):
+        for followed in rng.sample(range(1, user_count + 1), min(volumes['follows_per_user'], user_count - 1)):
+            if followed != follower:
+                follows.append({'follower_id': follower, 'followed_id': followed, 'created_at': recent()})
+    _bulk_insert(db, Follow, follows)
+
+    favorites, reviews, activities = [], [], []
+    for user_id in range(1, user_count + 1):
+        for category, resource in rng.sample(resources, min(volumes['favorites_per_user'], len(resources))):
+            favorites.append({
+                'user_id': user_id,
+                'resource_name': resource['name'],
+                'resource_category': category,
+                'resource_url': resource['url'],
+                'resource_description': resource['description'],
+                'resource_tags': ','.join(resource['tags']),
+                'created_at': recent(),
+            })
+        for category, resource in rng.sample(resources, min(volumes['reviews_per_user'], len(resources))):
+            reviews.append({
+                'user_id': user_id,
+                'resource_name': resource['name'],
+                'resource_category': category,
+                'resource_url': resource['url'],
+                'rating': rng.randint(1, 5),
+                'title': 'Benchmark review',
+                'review_text': ' '.join(rng.choices(FILLER_WORDS, k=40)),
+                'helpful_votes': rng.randrange(0, 20),
+                'created_at': recent(),
+            })
+        for _ in range(volumes['activities_per_user']):
+            category, resource = rng.choice(resources)
+            activities.append({
+                'user_id': user_id,
+                'activity_type': rng.choice(['review', 'favorite', 'follow']),
+                'activity_data': json.dumps({'category': category}),
+                'related_resource_name': resource['name'],
+                'related_resource_url': resource['url'],
+                'is_public': True,
+                'created_at': recent(),
+            })
+    _bulk_insert(db, Favorite, favorites)
+    _bulk_insert(db, Review, reviews)
+    _bulk_insert(db, Activity, activities)
+
+    paths = ['/', '/resources', '/discover', '/feed', '/leaderboard'] + [
+        f"/category/{c['name']}" for c in catalog['categories'][:20]
+    ]
+    _bulk_insert(db, PageView, [{
+        'path': rng.choice(paths),
+        'method': 'GET',
+        'status_code': 200,
+        'response_time': rng.random() / 5,
+        'user_id': rng.choice([None, rng.randrange(1, user_count + 1)]),
+        'session_id': f'session{rng.randrange(volumes["page_views"] // 5 + 1)}',
+        'viewed_at': recent(90),
+    } for _ in range(volumes['page_views'])])
+
+    _bulk_insert(db, ResourceView, [{
+        'resource_name': resource['name'],
+        'resource_category': category,
+        'resource_url': resource['url'],
+        'user_id': rng.choice([None, rng.randrange(1, user_count + 1)]),
+        'session_id': f'session{rng.randrange(1000)}',
+        'viewed_at': recent(90),
+    } for category, resource in (rng.choice(resources) for _ in range(volumes['resource_views']))])
+
+    return {
+        'users': len(users),
+        'follows': len(follows),
+        'favorites': len(favorites),
+        'reviews': len(reviews),
+        'activities': len(activities),
+        'page_views': volumes['page_views'],
+        'resource_views': volumes['resource_views'],
+    }
@@ -0,0 +1,496 @@
+"""
+Load-test harness.
+
+Runs virtual teachers against a real WSGI server over HTTP and reports
+throughput, latency percentiles and error rates per request type.
+
+By default it seeds a synthetic dataset (see benchmarks.datasets) and boots
+the app itself, either in-process on the threaded Werkzeug server or as a
+gunicorn subprocess with the production layout (2 workers x 4 threads).
+--url targets an already running deployment instead; its users must
+include teacher1..teacherN with the benchmark password.
+
+Usage:
+    python -m benchmarks.load_test --server gunicorn --concurrency 32 --duration 60
+    python -m benchmarks.load_test --mix browse=70,search=30 --concurrency 8
+    python -m benchmarks.load_test --replay traffic.jsonl --speed 2
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --duration 30
+
+Replay files are JSON lines, one request per line:
+    {"method": "GET", "path": "/resources", "offset_ms": 1200}
+    {"method": "POST", "path": "/api/favorite/add", "json": {...}, "user": "teacher4"}
+Optional keys: offset_ms (time since start of recording), json, form,
+headers, user (log in as this user first), name (label in the report).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+from queue import Empty, Queue
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlparse
+
+from benchmarks.common import run_metadata, summarize, write_results
+from benchmarks.datasets import BENCHMARK_PASSWORD, DEFAULT_VOLUMES
+from config import Config
+
+SEARCH_TERMS = ['math', 'science', 'reading', 'free', 'video', 'quiz', 'history', 'coding', 'art', 'assessment']
+
+
+class Stats:
+    """Thread-safe collection of request samples by label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, name: str, elapsed: float, status):
+        with self._lock:
+            self.timings[name].append(elapsed)
+            self.statuses[name][str(status)] += 1
+
+    def report(self, wall_time: float) -> Dict:
+        """Summarize per label and overall."""
+        per_name = {}
+        all_timings, totals = [], Counter()
+        for name in sorted(self.timings):
+            statuses = self.statuses[name]
+            total = sum(statuses.values())
+            errors = sum(n for s, n in statuses.items() if not s.isdigit() or int(s) >= 500)
+            client_errors = sum(n for s, n in statuses.items() if s.isdigit() and 400 <= int(s) < 500)
+            per_name[name] = dict(summarize(self.timings[name]), **{
+                'error_rate': round(errors / total, 4) if total else 0.0,
+                'client_error_rate': round(client_errors / total, 4) if total else 0.0,
+                'statuses': dict(statuses),
+            })
+            all_timings.extend(self.timings[name])
+            totals.update(statuses)
+
+        total = sum(totals.values())
+        errors = sum(n for s, n in totals.items() if not s.isdigit() or int(s) >= 500)
+        return {
+            'total': dict(summarize(all_timings), **{
+                'requests': total,
+                'wall_time_s': round(wall_time, 2),
+                'throughput_rps': round(total / wall_time, 2) if wall_time else 0.0,
+                'error_rate': round(errors / total, 4) if total else 0.0,
+                'statuses': dict(totals),
+            }),
+            'requests': per_name,
+        }
+
+
+class HttpSession:
+    """One virtual user: a keep-alive connection plus a cookie jar. Not thread-safe."""
+
+    def __init__(self, base_url: str, stats: Stats, timeout: float = 30.0):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        self.connection_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies: Dict[str, str] = {}
+        self._conn = None
+
+    def request(self, method: str, path: str, name: str, body: Optional[bytes] = None,
+                headers: Optional[Dict] = None) -> Tuple[int, bytes]:
+        """Send one request (redirects are not followed) and record its latency."""
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+
+        start = time.perf_counter()
+        try:
+            if self._conn is None:
+                self._conn = self.connection_class(self.host, self.port, timeout=self.timeout)
+            self._conn.request(method, path, body=body, headers=headers)
+            response = self._conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.stats.record(name, time.perf_counter() - start, type(e).__name__)
+            self.close()
+            return 0, b''
+
+        self.stats.record(name, time.perf_counter() - start, response.status)
+        for header in response.headers.get_all('Set-Cookie') or []:
+            cookie = SimpleCookie()
+            cookie.load(header)
+            for key, morsel in cookie.items():
+                self.cookies[key] = morsel.value
+        if response.getheader('Connection', '').lower() == 'close':
+            self.close()
+        return response.status, data
+
+    def get(self, path: str, name: str):
+        return self.request('GET', path, name)
+
+    def post_form(self, path: str, fields: Dict, name: str):
+        return self.request('POST', path, name, urlencode(fields).encode(),
+                            {'Content-Type': 'application/x-www-form-urlencoded'})
+
+    def post_json(self, path: str, payload: Dict, name: str):
+        return self.request('POST', path, name, json.dumps(payload).encode(), {'Content-Type': 'application/json'})
+
+    def post_multipart(self, path: str, fields: Dict, file_field: str, filename: str, content: bytes, name: str):
+        boundary = uuid.uuid4().hex
+        parts = [
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+            for key, value in fields.items()
+        ]
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+        )
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return self.request('POST', path, name, b''.join(parts),
+                            {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+    def login(self, username: str, password: str = BENCHMARK_PASSWORD) -> bool:
+        status, _ = self.post_form('/login', {'username': username, 'password': password}, 'login')
+        return status == 302 and 'session' in self.cookies
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+# name -> (function(session, catalog, rng, users), needs login)
+SCENARIOS: Dict[str, Tuple[Callable, bool]] = {}
+
+DEFAULT_MIX = 'browse=50,search=25,favorite=8,follow=7,review=5,upload=5'
+
+
+def scenario(name: str, login: bool = False):
+    """Register a user journey."""
+    def decorator(f):
+        SCENARIOS[name] = (f, login)
+        return f
+    return decorator
+
+
+@scenario('browse')
+def browse(s: HttpSession, catalog: List[Dict], rng: random.Random, users: int):
+    s.get('/', 'GET /')
+    s.get('/resources', 'GET /resources')
+    s.get(f"/category/{quote(rng.choice(catalog)['category'])}", 'GET /category/<name>')
+    s.get('/discover', 'GET /discover')
+    s.get(f'/profile/teacher{rng.randint(1, users)}', 'GET /profile/<username>')
+
+
+@scenario('search')
+def search(s, catalog, rng, users):
+    s.get(f'/api/v1/search?q={quote(rng.choice(SEARCH_TERMS))}', 'GET /api/v1/search')
+
+
+@scenario('favorite', login=True)
+def favorite(s, catalog, rng, users):
+    resource = rng.choice(catalog)
+    s.post_json('/api/favorite/add', {
+        'resource_name': resource['name'],
+        'resource_category': resource['category'],
+        'resource_url': resource['url'],
+    }, 'POST /api/favorite/add')
+    s.get('/favorites', 'GET /favorites')
+
+
+@scenario('follow', login=True)
+def follow(s, catalog, rng, users):
+    username = f'teacher{rng.randint(1, users)}'
+    s.post_json(f'/user/{username}/follow', {}, 'POST /user/<username>/follow')
+    s.get('/feed', 'GET /feed')
+    s.post_json(f'/user/{username}/unfollow', {}, 'POST /user/<username>/unfollow')
+
+
+@scenario('review', login=True)
+def review(s, catalog, rng, users):
+    resource = rng.choice(catalog)
+    s.post_form(f"/review/write/{quote(resource['name'], safe='')}", {
+        'rating': rng.randint(1, 5),
+        'title': 'Load test review',
+        'review_text': 'Used this with my class for a week; students stayed engaged throughout.',
+        'resource_url': resource['url'],
+        'resource_category': resource['category'],
+    }, 'POST /review/write/<name>')
+
+
+@scenario('upload', login=True)
+def upload(s, catalog, rng, users):
+    s.post_multipart('/upload-resource', {
+        'title': f'Load test worksheet {rng.randrange(10 ** 6)}',
+        'description': 'Generated by the load-test harness',
+        'category': rng.choice(catalog)['category'],
+        'grade_level': 'Middle School',
+        'tags': 'worksheet,load-test',
+    }, 'file', 'worksheet.txt', os.urandom(2048), 'POST /upload-resource')
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def fetch_catalog(base_url: str, stats: Stats) -> List[Dict]:
+    """Sample resources from the target so scenarios use real names."""
+    session = HttpSession(base_url, stats)
+    status, body = session.get('/api/v1/resources?limit=2000', 'setup')
+    session.close()
+    if status != 200:
+        raise SystemExit(f"Could not load catalog from {base_url} (status {status})")
+    return json.loads(body)['resources']
+
+
+# ---------------------------------------------------------------------------
+# Runners
+# ---------------------------------------------------------------------------
+
+def run_scenarios(base_url: str, mix: Dict[str, float], concurrency: int, duration: float,
+                  ramp_up: float, think_time: float, users: int, seed: int) -> Dict:
+    """Run ``concurrency`` virtual users picking weighted scenarios until ``duration`` elapses."""
+    stats = Stats()
+    catalog = fetch_catalog(base_url, Stats())
+    needs_login = any(SCENARIOS[name][1] for name in mix)
+
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def virtual_user(index: int):
+        rng = random.Random(seed + index)
+        time.sleep(ramp_up * index / max(concurrency, 1))
+        session = HttpSession(base_url, stats)
+        logged_in = needs_login and session.login(f'teacher{index % users + 1}')
+
+        # Without a session, fall back to the anonymous scenarios
+        allowed = {name: weight for name, weight in mix.items() if logged_in or not SCENARIOS[name][1]}
+        names, weights = list(allowed), list(allowed.values())
+
+        while names and time.perf_counter() < deadline:
+            func, _ = SCENARIOS[rng.choices(names, weights)[0]]
+            func(session, catalog, rng, users)
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+        session.close()
+
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return stats.report(time.perf_counter() - start)
+
+
+def load_replay(path: str) -> List[Dict]:
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.sort(key=lambda e: e.get('offset_ms', 0))
+    return entries
+
+
+def run_replay(base_url: str, entries: List[Dict], concurrency: int, speed: float) -> Dict:
+    """
+    Replay recorded requests.
+
+    With ``speed`` > 0 each request is issued at its recorded offset divided
+    by ``speed``; with 0 the file is replayed as fast as the workers allow.
+    """
+    stats = Stats()
+    queue: Queue = Queue()
+    for entry in entries:
+        queue.put(entry)
+
+    start = time.perf_counter()
+
+    def worker():
+        sessions: Dict[Optional[str], HttpSession] = {}
+        while True:
+            try:
+                entry = queue.get_nowait()
+            except Empty:
+                break
+
+            if speed and entry.get('offset_ms'):
+                delay = start + entry['offset_ms'] / 1000 / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            user = entry.get('user')
+            session = sessions.get(user)
+            if session is None:
+                session = sessions[user] = HttpSession(base_url, stats)
+                if user:
+                    session.login(user, entry.get('password', BENCHMARK_PASSWORD))
+
+            method = entry.get('method', 'GET').upper()
+            name = entry.get('name') or f"{method} {entry['path'].split('?')[0]}"
+            headers = entry.get('headers')
+            if 'json' in entry:
+                session.request(method, entry['path'], name, json.dumps(entry['json']).encode(),
+                                dict(headers or {}, **{'Content-Type': 'application/json'}))
+            elif 'form' in entry:
+                session.request(method, entry['path'], name, urlencode(entry['form']).encode(),
+                                dict(headers or {}, **{'Content-Type': 'application/x-www-form-urlencoded'}))
+            else:
+                session.request(method, entry['path'], name, headers=headers)
+
+        for session in sessions.values():
+            session.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return stats.report(time.perf_counter() - start)
+
+
+# ---------------------------------------------------------------------------
+# Servers
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(base_url: str, timeout: float = 30.0):
+    parsed = urlparse(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((parsed.hostname, parsed.port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Server at {base_url} did not start within {timeout:.0f}s")
+
+
+def start_server(args):
+    """
+    Seed the dataset and boot the app on a free port.
+
+    Returns:
+        (base_url, stop callable)
+    """
+    from benchmarks.routes import build_app
+
+    app, _ = build_app(args)
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    os.chdir(args.workdir)  # uploads and logs land in the work directory
+
+    if args.server == 'gunicorn':
+        if shutil.which('gunicorn') is None:
+            raise SystemExit('gunicorn is not installed; use --server werkzeug')
+        env = dict(os.environ,
+                   DATABASE_URL=app.config['SQLALCHEMY_DATABASE_URI'],
+                   RESOURCES_FILE=app.config['RESOURCES_FILE'],
+                   METRICS_MULTIPROC_DIR=os.path.join(args.workdir, 'metrics'))
+        process = subprocess.Popen([
+            'gunicorn', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(args.workers), '--threads', str(args.threads), '--timeout', '60',
+            '--pythonpath', str(Config.BASE_DIR), '--log-level', 'warning', 'run:app'
+        ], env=env)
+        _wait_for(base_url)
+        return base_url, process.terminate
+
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return base_url, server.shutdown
+
+
+def print_report(report: Dict):
+    total = report['total']
+    print(f"\n{total['requests']} requests in {total['wall_time_s']}s: "
+          f"{total['throughput_rps']} req/s, error rate {total['error_rate']:.2%}, "
+          f"p50 {total['p50_ms']}ms p95 {total['p95_ms']}ms p99 {total['p99_ms']}ms\n")
+    print(f"{'request':<36} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'5xx':>7} {'4xx':>7}")
+    for name, r in report['requests'].items():
+        print(f"{name:<36} {r['count']:>7} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+              f"{r['max_ms']:>9.1f} {r['error_rate']:>7.2%} {r['client_error_rate']:>7.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the app with mixed scenarios or recorded traffic')
+    parser.add_argument('--url', help='Target a running deployment instead of booting one')
+    parser.add_argument('--server', choices=['werkzeug', 'gunicorn'], default='werkzeug')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--concurrency', type=int, default=16, help='Virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run scenarios')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which virtual users start')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between scenarios (seconds)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Scenario weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--replay', help='Replay a JSON-lines traffic file instead of scenarios')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed multiplier (0 = as fast as possible)')
+    parser.add_argument('--resources', type=int, default=10000)
+    parser.add_argument('--categories', type=int, default=55)
+    parser.add_argument('--users', type=int, default=DEFAULT_VOLUMES['users'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', help='Directory for the dataset, uploads and logs')
+    parser.add_argument('--database-url', help='Seed and serve this database instead of SQLite')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate tables before seeding')
+    parser.add_argument('--output', help='Write the report JSON here')
+    args = parser.parse_args()
+
+    stop = None
+    base_url = args.url
+    if not base_url:
+        args.workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='loadtest-'))
+        base_url, stop = start_server(args)
+        print(f"Serving on {base_url} ({args.server}), data in {args.workdir}", file=sys.stderr)
+
+    try:
+        if args.replay:
+            entries = load_replay(args.replay)
+            report = run_replay(base_url, entries, args.concurrency, args.speed)
+            mode = {'replay': args.replay, 'speed': args.speed, 'entries': len(entries)}
+        else:
+            report = run_scenarios(base_url, parse_mix(args.mix), args.concurrency, args.duration,
+                                   args.ramp_up, args.think_time, args.users, args.seed)
+            mode = {'mix': args.mix, 'duration': args.duration, 'think_time': args.think_time}
+    finally:
+        if stop:
+            stop()
+
+    print_report(report)
+
+    if args.output:
+        write_results(args.output, {
+            'meta': run_metadata(benchmark='load_test', target=args.url or args.server,
+                                 concurrency=args.concurrency, workers=args.workers,
+                                 threads=args.threads, **mode),
+            'results': report,
+        })
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Micro-benchmarks for the catalog services.
+
+Times ResourceService, StatsService and SearchService functions on
+synthetic catalogs of several sizes. Each case is calibrated like
+pytest-benchmark: the loop count is raised until one round takes at least
+--min-time, then several rounds are timed and min/median/mean/stddev per
+call are reported.
+
+Usage:
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --compare baseline.json --threshold 10
+
+--compare exits non-zero if any case's median regressed by more than
+--threshold percent.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+from flask import Flask
+
+from app.services.resource_service import ResourceService
+from app.services.search_service import SearchService
+from app.services.stats_service import RelatedCategories, StatsService
+from benchmarks.common import compare, load_results, print_comparison, run_metadata, write_results
+from benchmarks.datasets import write_catalog
+
+DEFAULT_SIZES = (500, 10000, 100000)
+
+# name -> factory(context) returning the zero-argument callable to time
+CASES: Dict[str, Callable[[Dict], Callable]] = {}
+
+
+def case(name: str):
+    """Register a benchmark case factory."""
+    def decorator(factory):
+        CASES[name] = factory
+        return factory
+    return decorator
+
+
+@case('resource_service.get_all_resources_flat')
+def _flat(ctx):
+    return ResourceService.get_all_resources_flat
+
+
+@case('resource_service.get_category_by_name')
+def _category_by_name(ctx):
+    name = ctx['categories'][-1]['name']
+    return lambda: ResourceService.get_category_by_name(name)
+
+
+@case('resource_service.get_featured_resources')
+def _featured(ctx):
+    names = [c['name'] for c in ctx['categories'][-6:]]
+    return lambda: ResourceService.get_featured_resources(names, count=6)
+
+
+@case('stats_service.calculate_category_stats')
+def _category_stats(ctx):
+    resources = ctx['largest']['resources']
+    return lambda: StatsService.calculate_category_stats(resources)
+
+
+@case('stats_service.get_related_categories')
+def _related(ctx):
+    categories, current, version = ctx['categories'], ctx['categories'][-1], ctx['version']
+    # Build the related-categories table outside the timed loop
+    StatsService.get_related_table(categories, version)
+    return lambda: StatsService.get_related_categories(categories, current, count=4, catalog_version=version)
+
+
+@case('stats_service.related_categories_build')
+def _related_build(ctx):
+    categories = ctx['categories']
+    return lambda: RelatedCategories(categories)
+
+
+@case('search_service.bm25_search')
+def _bm25_search(ctx):
+    flat, version = ctx['flat'], ctx['version']
+    # Build the term statistics outside the timed loop
+    SearchService.get_bm25_index(flat, version)
+    return lambda: SearchService.bm25_search(flat, 'math games', version)
+
+
+@case('search_service.filter_resources')
+def _filter(ctx):
+    flat, category = ctx['flat'], ctx['categories'][0]['name']
+    return lambda: SearchService.filter_resources(flat, category=category, search='free')
+
+
+def measure(func: Callable, rounds: int, min_time: float) -> Dict:
+    """Time ``func`` and return per-call statistics in microseconds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_call.append((time.perf_counter() - start) / loops * 1e6)
+
+    return {
+        'loops': loops,
+        'rounds': rounds,
+        'min_us': round(min(per_call), 2),
+        'median_us': round(statistics.median(per_call), 2),
+        'mean_us': round(statistics.mean(per_call), 2),
+        'stddev_us': round(statistics.stdev(per_call), 2) if rounds > 1 else 0.0,
+    }
+
+
+def run(args) -> Dict:
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench-')
+    selected = set(args.cases.split(',')) if args.cases else None
+    results = {}
+
+    for size in args.sizes:
+        catalog_path = os.path.join(workdir, f'resources_{size}_{args.seed}.json')
+        if not os.path.exists(catalog_path):
+            write_catalog(catalog_path, size, seed=args.seed)
+
+        app = Flask(__name__)
+        app.config.update(BASE_DIR=workdir, RESOURCES_FILE=catalog_path)
+
+        with app.app_context():
+            ResourceService.clear_cache()
+            categories = ResourceService.get_all_categories()
+            ctx = {
+                'categories': categories,
+                'flat': ResourceService.get_all_resources_flat(),
+                'largest': max(categories, key=lambda c: len(c.get('resources', []))),
+                'version': ResourceService.get_catalog_version(),
+            }
+
+            for name, factory in CASES.items():
+                if selected and name not in selected:
+                    continue
+                key = f'{name}[{size}]'
+                results[key] = measure(factory(ctx), args.rounds, args.min_time)
+                r = results[key]
+                print(f"{key:<55} median {r['median_us']:>12.2f}us  min {r['min_us']:>12.2f}us  "
+                      f"stddev {r['stddev_us']:>10.2f}us  ({r['loops']} loops x {r['rounds']})")
+
+        ResourceService.clear_cache()
+
+    return {
+        'meta': run_metadata(benchmark='micro', sizes=list(args.sizes), seed=args.seed),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark catalog services')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--cases', help='Comma-separated subset of: ' + ','.join(CASES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rounds', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.05, help='Minimum seconds per round')
+    parser.add_argument('--workdir', help='Cache generated catalogs here')
+    parser.add_argument('--save', help='Write results JSON here (e.g. a new baseline)')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Allowed median slowdown in percent before --compare fails')
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.save:
+        write_results(args.save, results)
+        print(f"\nResults written to {args.save}")
+
+    if args.compare:
+        rows = compare(load_results(args.compare)['results'], results['results'], 'median_us', args.threshold)
+        print_comparison(rows, 'median_us')
+        regressed = [row['name'] for row in rows if row['regressed']]
+        if regressed:
+            print(f"\n{len(regressed)} benchmark(s) regressed by more than {args.threshold}%", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Hot-route benchmark.
+
+Seeds a database and a synthetic catalog, then drives the busiest pages
+through the Flask test client and reports latency percentiles, SQL
+statements per request and peak memory allocated per request.
+
+Usage:
+    python -m benchmarks.routes --resources 10000 --users 2000 --output results.json
+    python -m benchmarks.routes --resources 100000 --compare results.json --max-regression 15
+
+Pass --database-url postgresql://... to benchmark against PostgreSQL
+(with --reset to drop and recreate its tables first).
+"""
+
+import argparse
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from urllib.parse import quote
+
+from benchmarks.common import compare, load_results, print_comparison, run_metadata, summarize, write_results
+from benchmarks.datasets import DEFAULT_VOLUMES, generate_catalog, make_config, seed_database, write_catalog
+
+# Session cookies are Secure, so requests must look like HTTPS
+BASE_URL = 'https://localhost'
+
+# (name, path template, needs login)
+ROUTES = [
+    ('home', '/', False),
+    ('resources', '/resources', False),
+    ('category', '/category/{category}', False),
+    ('api_search', '/api/v1/search?q={query}', False),
+    ('discover', '/discover', False),
+    ('feed', '/feed', True),
+    ('profile', '/profile/{username}', False),
+]
+
+
+def build_app(args):
+    """Create the app on a seeded database and return (app, workdir)."""
+    from app import create_app
+    from app.models import db, User
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench-')
+    os.makedirs(workdir, exist_ok=True)
+    catalog_path = os.path.join(workdir, f'resources_{args.resources}_{args.seed}.json')
+    if not os.path.exists(catalog_path):
+        write_catalog(catalog_path, args.resources, args.categories, args.seed)
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, f'bench_{args.users}_{args.seed}.db')}"
+    app = create_app(make_config(database_url, catalog_path))
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.create_all()
+        if User.query.count() == 0:
+            print(f"Seeding database ({args.users} users)...", file=sys.stderr)
+            start = time.perf_counter()
+            counts = seed_database(generate_catalog(args.resources, args.categories, args.seed),
+                                   dict(DEFAULT_VOLUMES, users=args.users), args.seed)
+            print(f"Seeded {counts} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return app, workdir
+
+
+def bench_route(client, path, iterations, warmup):
+    """Time one route; returns latency summary plus queries, memory and statuses."""
+    from app.middleware.query_stats import query_budget
+
+    for _ in range(warmup):
+        client.get(path, base_url=BASE_URL)
+
+    timings, query_counts, statuses = [], [], Counter()
+    for _ in range(iterations):
+        with query_budget() as statements:
+            start = time.perf_counter()
+            response = client.get(path, base_url=BASE_URL)
+            timings.append(time.perf_counter() - start)
+        query_counts.append(len(statements))
+        statuses[str(response.status_code)] += 1
+
+    tracemalloc.start()
+    client.get(path, base_url=BASE_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(timings)
+    result.update({
+        'path': path,
+        'queries_per_request': round(sum(query_counts) / len(query_counts), 2),
+        'max_queries': max(query_counts),
+        'peak_alloc_kb': round(peak / 1024, 1),
+        'statuses': dict(statuses),
+    })
+    return result
+
+
+def run(args):
+    app, workdir = build_app(args)
+    logging.getLogger('app').setLevel(logging.WARNING)
+    app.logger.setLevel(logging.WARNING)
+
+    with app.app_context():
+        from app.services.resource_service import ResourceService
+        categories = ResourceService.get_all_categories()
+
+    values = {'category': quote(categories[0]['name']), 'query': quote(args.query), 'username': 'teacher1'}
+    selected = set(args.routes.split(',')) if args.routes else None
+
+    results = {}
+    anonymous = app.test_client()
+    teacher = app.test_client()
+    with teacher.session_transaction(base_url=BASE_URL) as session:
+        session['_user_id'] = '1'
+        session['_fresh'] = True
+
+    for name, template, needs_login in ROUTES:
+        if selected and name not in selected:
+            continue
+        path = template.format(**values)
+        results[name] = bench_route(teacher if needs_login else anonymous, path, args.iterations, args.warmup)
+        r = results[name]
+        print(f"{name:<12} p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  p99 {r['p99_ms']:>9.2f}ms  "
+              f"{r['queries_per_request']:>6} q/req  {r['peak_alloc_kb']:>9.1f}KB  {r['statuses']}")
+
+    return {
+        'meta': run_metadata(
+            benchmark='routes',
+            resources=args.resources,
+            categories=args.categories,
+            users=args.users,
+            seed=args.seed,
+            iterations=args.iterations,
+            database=args.database_url.split(':')[0] if args.database_url else 'sqlite',
+            workdir=workdir,
+            max_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        ),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hot routes on a synthetic dataset')
+    parser.add_argument('--resources', type=int, default=10000, help='Catalog size (e.g. 10000-100000)')
+    parser.add_argument('--categories', type=int, default=55)
+    parser.add_argument('--users', type=int, default=DEFAULT_VOLUMES['users'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--query', default='math', help='Search term for /api/v1/search')
+    parser.add_argument('--routes', help='Comma-separated subset of: ' + ','.join(r[0] for r in ROUTES))
+    parser.add_argument('--workdir', help='Reuse catalog and SQLite database from this directory')
+    parser.add_argument('--database-url', help='Benchmark against this database instead of SQLite')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate tables before seeding')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--metric', default='p95_ms', help='Stat compared against the baseline')
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help='Exit non-zero if any route regresses by more than this percent')
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.output:
+        write_results(args.output, results)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        rows = compare(load_results(args.compare)['results'], results['results'], args.metric,
+                       args.max_regression if args.max_regression is not None else float('inf'))
+        print_comparison(rows, args.metric)
+        if args.max_regression is not None and any(row['regressed'] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -52,6 +52,14 @@ class Config:
         'https://www.googleapis.com/auth/classroom.coursework.students',
         'https://www.googleapis.com/auth/classroom.announcements'
     ]
+    GOOGLE_TOKEN_URI = os.environ.get('GOOGLE_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+    # Override the Classroom API root, e.g. http://127.0.0.1:8765/ for fake_classroom_server.py
+    GOOGLE_CLASSROOM_API_ROOT = os.environ.get('GOOGLE_CLASSROOM_API_ROOT')
+    GOOGLE_API_TIMEOUT = 20  # Seconds per Classroom API HTTP call
+    GOOGLE_TOKEN_REFRESH_MARGIN = 300  # Refresh access tokens this many seconds before expiry
+    GOOGLE_BULK_SHARE_MODE = 'threads'  # 'threads' (bounded pool) or 'batch' (Google batch API)
+    GOOGLE_BULK_SHARE_WORKERS = 4  # Concurrent API calls per bulk share
+    GOOGLE_BULK_SHARE_MAX_COURSES = 50
 
     # Performance settings
     COMPRESS_MIMETYPES = [
@@ -67,9 +75,92 @@ class Config:
     COMPRESS_LEVEL = 6  # Compression level (1-9, 6 is good balance)
     COMPRESS_MIN_SIZE = 500  # Only compress responses larger than 500 bytes
 
+    # Uploaded resource view/download counters are buffered in-process and
+    # flushed every N seconds (0 = write through on every hit)
+    COUNTER_FLUSH_INTERVAL = int(os.environ.get('COUNTER_FLUSH_INTERVAL', 10))
+    COUNTER_MAX_PENDING_ROWS = 10000  # Download log rows kept for retry after failed flushes
+
+    # Classroom photo thumbnails (requires Pillow)
+    THUMBNAIL_WIDTHS = [320, 640]  # Derivative widths in pixels, served via srcset
+    THUMBNAIL_QUALITY = 80
+    THUMBNAIL_WORKERS = 2  # Background threads per process
+
+    # Background job queue (run workers with `flask --app run:app worker`)
+    JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED', 'False').lower() == 'true'
+    JOB_WORKER_THREADS = 4
+    JOB_POLL_INTERVAL = 2.0  # Seconds between polls when the queue is empty
+    JOB_MAX_ATTEMPTS = 5
+    JOB_RETRY_BACKOFF = 30  # Base retry delay in seconds, doubled per attempt
+    JOB_STALE_TIMEOUT = 600  # Re-queue jobs whose worker stopped heartbeating (every timeout/3)
+
+    # Request profiling (admin page: /admin/profiles)
+    PROFILING_SAMPLE_RATE = int(os.environ.get('PROFILING_SAMPLE_RATE', 0))  # Profile 1 in N requests (0 = off)
+    PROFILING_INTERVAL = 0.005  # Seconds between stack samples
+    PROFILING_DIR = 'logs/profiles'  # Relative to BASE_DIR
+    PROFILING_MAX_FILES = 200  # Oldest captures are deleted beyond this
+
+    # Per-request SQL statistics - requests over either limit are logged with their queries
+    SLOW_REQUEST_QUERY_COUNT = int(os.environ.get('SLOW_REQUEST_QUERY_COUNT', 30))
+    SLOW_REQUEST_DB_TIME = float(os.environ.get('SLOW_REQUEST_DB_TIME', 0.5))  # Seconds
+
+    # Prometheus metrics at /metrics (off unless enabled with a token)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Required: scrapes send "Authorization: Bearer <token>"
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')  # Shared by gunicorn workers
+    METRICS_FLUSH_INTERVAL = 5  # Seconds between per-worker snapshot writes
+
     # Analytics settings
     GOOGLE_ANALYTICS_ID = os.environ.get('GOOGLE_ANALYTICS_ID', '')  # e.g., G-XXXXXXXXXX
 
+    # Raw analytics retention (`flask analytics retention`); expired rows are archived first
+    ANALYTICS_RETENTION_DAYS = int(os.environ.get('ANALYTICS_RETENTION_DAYS', 395))  # ~13 months
+    ANALYTICS_RETENTION = {}  # Per-table overrides, e.g. {'page_views': 90}
+    ANALYTICS_ARCHIVE_DIR = os.environ.get('ANALYTICS_ARCHIVE_DIR') or BASE_DIR / 'archive' / 'analytics'
+    ANALYTICS_DELETE_CHUNK_SIZE = 5000  # Rows per transaction when deleting without partitions
+    # Incremental columnar exports (`flask analytics export`)
+    ANALYTICS_EXPORT_DIR = os.environ.get('ANALYTICS_EXPORT_DIR') or BASE_DIR / 'exports' / 'analytics'
+    ANALYTICS_EXPORT_LAG = 600  # Seconds; rows newer than this wait for the next run
+    ANALYTICS_EXPORT_BATCH_SIZE = 10000  # Rows fetched per server-side cursor batch
+    ANALYTICS_EXPORT_EXCLUDE = ('ip_address',)  # Columns left out of exports
+
+    # Page view sampling; kept rows store weight = 1 / rate so dashboards stay unbiased
+    ANALYTICS_SAMPLE_RATE = float(os.environ.get('ANALYTICS_SAMPLE_RATE', 1.0))  # 1.0 = record every page view
+    ANALYTICS_ROUTE_SAMPLE_RATES = {}  # Endpoint name or path prefix -> rate, e.g. {'main.index': 0.1, '/api/': 0.05}
+    ANALYTICS_ALWAYS_KEEP_SLOW = 1.0  # Requests slower than this (seconds) and errors are always recorded
+    ANALYTICS_BOT_SAMPLE_RATE = float(os.environ.get('ANALYTICS_BOT_SAMPLE_RATE', 0.0))  # Share of crawler hits still recorded
+
+    # Password hashing runs on a bounded pool; logins beyond workers + queue get a 503
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')  # Werkzeug method, e.g. 'pbkdf2:sha256:600000'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_DEPTH = int(os.environ.get('PASSWORD_HASH_QUEUE_DEPTH', 8))
+    PASSWORD_HASH_TIMEOUT = 10  # Seconds to wait for a slot's result
+    PASSWORD_HASH_RETRY_AFTER = 2  # Retry-After seconds on a 503
+
+    # Slim user snapshots returned by the Flask-Login loader (per worker process)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))  # Seconds other workers may serve a stale profile/role
+    USER_CACHE_MAX_ENTRIES = 10000
+
+    # Admin dashboard counts are served from a snapshot refreshed in the background once older than this (seconds)
+    ADMIN_STATS_REFRESH_INTERVAL = int(os.environ.get('ADMIN_STATS_REFRESH_INTERVAL', 300))
+
+    # Leaderboard rank tables are rebuilt at most this often per worker (seconds)
+    LEADERBOARD_REFRESH_INTERVAL = int(os.environ.get('LEADERBOARD_REFRESH_INTERVAL', 300))
+
+    # Related categories: rebuilt per catalog version and at most this often for new favorites
+    RELATED_CATEGORIES_REFRESH_INTERVAL = 3600
+    RELATED_CATEGORIES_COFAVORITE_WEIGHT = 0.3  # Share of the score from co-favoriting (rest: tag similarity)
+
+    # Resource catalog (benchmarks point this at a synthetic catalog)
+    RESOURCES_FILE = os.environ.get('RESOURCES_FILE') or BASE_DIR / 'data' / 'resources.json'
+
+    # Catalog search
+    SEARCH_FUZZY_THRESHOLD = 0.3  # Minimum trigram similarity for /api/v1/search?fuzzy=1
+    SEARCH_POPULARITY_TTL = 300  # Seconds between reloads of resource view counts for ranking
+    SEARCH_POPULARITY_WEIGHT = float(os.environ.get('SEARCH_POPULARITY_WEIGHT', 0.2))  # 0 = pure BM25 relevance
+    SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 1024))  # 0 disables the result cache
+    SEARCH_CACHE_MAX_BYTES = int(os.environ.get('SEARCH_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # Per worker process
+    SEARCH_CACHE_TTL = 300  # Seconds; bounds staleness of popularity-blended rankings
+
     # Application settings
     APP_NAME = "Teaching Resources Hub"
     APP_VERSION = "1.2.0"
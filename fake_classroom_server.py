@@ -0,0 +1,193 @@
+"""
+Fake Google Classroom API server for offline development and testing.
+
+Implements just enough of the Classroom v1 REST surface used by the app:
+courses.list, announcements.create, courseWorkMaterials.create, the
+multipart batch endpoint and the OAuth token endpoint (refresh grants).
+
+Usage:
+    python fake_classroom_server.py --port 8765 --courses 8 --latency 200
+
+Then point the app at it:
+    GOOGLE_CLASSROOM_API_ROOT=http://127.0.0.1:8765/
+    GOOGLE_TOKEN_URI=http://127.0.0.1:8765/token
+
+Everything created is kept in memory and can be inspected at GET /_state.
+"""
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+CREATE_PATH = re.compile(r'^/v1/courses/([^/]+)/(announcements|courseWorkMaterials)$')
+
+
+class FakeClassroom:
+    """In-memory Classroom state shared by all request handler threads."""
+
+    def __init__(self, course_count=8, latency=0.0, failing_courses=()):
+        self.courses = {
+            str(1000 + i): {
+                'id': str(1000 + i),
+                'name': f'Period {i + 1}',
+                'section': f'Section {chr(65 + i % 26)}',
+                'room': f'Room {100 + i}',
+                'courseState': 'ACTIVE',
+                'enrollmentCode': f'code{i}'
+            }
+            for i in range(course_count)
+        }
+        self.latency = latency
+        self.failing_courses = set(failing_courses)
+        self.created = []
+        self.request_count = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def handle(self, method, path, body):
+        """
+        Route one API call.
+
+        Returns:
+            (status, response_dict)
+        """
+        with self._lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = urlparse(path).path
+
+        if method == 'GET' and path == '/v1/courses':
+            return 200, {'courses': list(self.courses.values())}
+
+        match = CREATE_PATH.match(path)
+        if method == 'POST' and match:
+            course_id, kind = match.groups()
+            if course_id not in self.courses:
+                return 404, _error(404, 'Requested entity was not found.', 'NOT_FOUND')
+            if course_id in self.failing_courses:
+                return 403, _error(403, 'The caller does not have permission', 'PERMISSION_DENIED')
+
+            with self._lock:
+                item = dict(body or {}, id=str(next(self._ids)), courseId=course_id, kind=kind)
+                self.created.append(item)
+            return 200, item
+
+        return 404, _error(404, f'Unknown path {path}', 'NOT_FOUND')
+
+
+def _error(code, message, status):
+    return {'error': {'code': code, 'message': message, 'status': status}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """HTTP handler delegating to the shared FakeClassroom."""
+
+    protocol_version = 'HTTP/1.1'
+    classroom: FakeClassroom = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, payload, content_type='application/json'):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/_state':
+            self._send(200, {
+                'requests': self.classroom.request_count,
+                'created': self.classroom.created
+            })
+            return
+        self._send(*self.classroom.handle('GET', self.path, None))
+
+    def do_POST(self):
+        raw = self._read_body()
+        path = urlparse(self.path).path
+
+        if path == '/token':
+            self._send(200, {'access_token': f'fake-token-{time.time():.0f}', 'expires_in': 3600,
+                             'token_type': 'Bearer'})
+        elif path == '/batch':
+            self._handle_batch(raw)
+        else:
+            body = json.loads(raw) if raw else None
+            self._send(*self.classroom.handle('POST', self.path, body))
+
+    def _handle_batch(self, raw):
+        """Answer a multipart/mixed batch request, one HTTP response part per call."""
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8')
+        message = BytesParser(policy=HTTP).parsebytes(header + raw)
+
+        boundary = 'fake_batch_boundary'
+        parts = []
+        for part in message.iter_parts():
+            content_id = part['Content-ID'].strip('<>')
+            request_text = part.get_payload(decode=True).decode('utf-8')
+            head, _, body_text = request_text.partition('\r\n\r\n')
+            method, target, _ = head.split('\r\n', 1)[0].split(' ', 2)
+
+            status, payload = self.classroom.handle(method, target, json.loads(body_text) if body_text.strip() else None)
+            reason = 'OK' if status == 200 else 'Error'
+            parts.append(
+                f'--{boundary}\r\n'
+                f'Content-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status} {reason}\r\n'
+                f'Content-Type: application/json\r\n\r\n'
+                f'{json.dumps(payload)}\r\n'
+            )
+        parts.append(f'--{boundary}--\r\n')
+
+        self._send(200, ''.join(parts).encode('utf-8'), f'multipart/mixed; boundary={boundary}')
+
+
+def serve(port=8765, course_count=8, latency=0.0, failing_courses=()):
+    """Start the fake server and block until interrupted."""
+    server = make_server(port, course_count, latency, failing_courses)
+    print(f"Fake Classroom API listening on http://127.0.0.1:{server.server_port}/")
+    server.serve_forever()
+
+
+def make_server(port=0, course_count=8, latency=0.0, failing_courses=()):
+    """Create (but do not start) a fake server; port 0 picks a free port."""
+    classroom = FakeClassroom(course_count, latency, failing_courses)
+    handler = type('FakeClassroomHandler', (Handler,), {'classroom': classroom})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.classroom = classroom
+    return server
+
+
+def run_in_thread(**kwargs):
+    """Start a fake server on a background thread and return it (call .shutdown() when done)."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Google Classroom API server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--courses', type=int, default=8, help='Number of ACTIVE courses to expose')
+    parser.add_argument('--latency', type=int, default=0, help='Artificial per-call latency in milliseconds')
+    parser.add_argument('--fail', nargs='*', default=[], help='Course IDs that reject creates with 403')
+    args = parser.parse_args()
+
+    serve(args.port, args.courses, args.latency / 1000.0, args.fail)
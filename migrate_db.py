@@ -202,4 +202,55 @@ with app.app_context():
             print(f"[ERROR] {err}")
             raise
 
+    # Classroom photo thumbnail derivatives
+
+    try:
+        with db.engine.connect() as conn:
+            result = conn.execute(text("SELECT thumbnail_widths FROM classroom_photos LIMIT 1"))
+            print("[INFO] thumbnail_widths column already exists")
+    except Exception as e:
+        print("[INFO] Adding thumbnail_widths column...")
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE classroom_photos ADD COLUMN thumbnail_widths VARCHAR(50)"))
+                conn.commit()
+            print("[OK] thumbnail_widths added!")
+        except Exception as err:
+            print(f"[ERROR] {err}")
+            raise
+
+    # Page view sampling weight
+
+    try:
+        with db.engine.connect() as conn:
+            result = conn.execute(text("SELECT weight FROM page_views LIMIT 1"))
+            print("[INFO] page_views.weight column already exists")
+    except Exception as e:
+        print("[INFO] Adding page_views.weight column...")
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE page_views ADD COLUMN weight FLOAT NOT NULL DEFAULT 1.0"))
+                conn.commit()
+            print("[OK] page_views.weight added!")
+        except Exception as err:
+            print(f"[ERROR] {err}")
+            raise
+
+    # Sampled crawler page views
+
+    try:
+        with db.engine.connect() as conn:
+            result = conn.execute(text("SELECT is_bot FROM page_views LIMIT 1"))
+            print("[INFO] page_views.is_bot column already exists")
+    except Exception as e:
+        print("[INFO] Adding page_views.is_bot column...")
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE page_views ADD COLUMN is_bot BOOLEAN NOT NULL DEFAULT FALSE"))
+                conn.commit()
+            print("[OK] page_views.is_bot added!")
+        except Exception as err:
+            print(f"[ERROR] {err}")
+            raise
+
     print("\n[SUCCESS] Database migration completed!")
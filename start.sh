@@ -5,5 +5,9 @@
 echo "Running database migrations..."
 python migrate_db.py
 
+# Per-worker metrics snapshots are aggregated at /metrics; start each deploy fresh
+export METRICS_MULTIPROC_DIR=${METRICS_MULTIPROC_DIR:-/tmp/teaching-hub-metrics}
+rm -rf "$METRICS_MULTIPROC_DIR" && mkdir -p "$METRICS_MULTIPROC_DIR"
+
 echo "Starting Gunicorn server..."
 gunicorn --bind 0.0.0.0:$PORT --workers 2 --threads 4 --timeout 60 run:app